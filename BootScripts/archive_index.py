@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Driver Archive Index
+Content-addressed, persistent index of DriverArchive/ so lookups never walk the disk
+"""
+
+import hashlib
+import json
+import os
+import plistlib
+import shutil
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+INDEX_VERSION = 1
+INDEX_NAME = "archive_index.json"
+
+# Top-level archive folder -> OS key used everywhere else
+OS_DIRS = {
+    'macOS': 'macos',
+    'Windows': 'windows',
+    'Linux': 'linux'
+}
+
+WINDOWS_SUFFIXES = ('.exe', '.inf', '.sys', '.dll')
+LINUX_SUFFIXES = ('.ko', '.ko.zst', '.ko.xz', '.ko.gz')
+SKIP_DIRS = ('__MACOSX',)
+
+_loaded = {}
+_load_lock = threading.Lock()
+
+def driver_key(name):
+    """Normalize 'Lilu.kext', 'e1000e.ko.zst', 'Intel_WiFi.exe' to a lookup key"""
+    for suffix in ('.kext',) + LINUX_SUFFIXES + WINDOWS_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+def hash_file(path, h=None):
+    """SHA-256 a single file"""
+    h = h or hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h
+
+def bundle_files(path):
+    """All files in a bundle, relative and sorted for stable hashing"""
+    files = []
+    for root, dirs, names in os.walk(path):
+        dirs.sort()
+        for name in sorted(names):
+            full = Path(root) / name
+            files.append((full.relative_to(path).as_posix(), full))
+    return files
+
+def content_hash(path):
+    """Hash a file, or a bundle directory as a tree of (relative path, file hash)"""
+    path = Path(path)
+    if path.is_file():
+        return hash_file(path).hexdigest()
+
+    h = hashlib.sha256()
+    for rel, full in bundle_files(path):
+        h.update(rel.encode() + b'\0')
+        h.update(hash_file(full).digest())
+    return h.hexdigest()
+
+def stat_signature(path):
+    """Cheap (size, mtime) signature; for bundles aggregated over every file"""
+    path = Path(path)
+    if path.is_file():
+        st = path.stat()
+        return [st.st_size, st.st_mtime_ns]
+
+    size = 0
+    mtime = 0
+    count = 0
+    for _, full in bundle_files(path):
+        st = full.stat()
+        size += st.st_size
+        mtime = max(mtime, st.st_mtime_ns)
+        count += 1
+    return [size, mtime, count]
+
+def kext_version(path):
+    """Read CFBundleShortVersionString from a kext bundle"""
+    info_plist = Path(path) / "Contents" / "Info.plist"
+    try:
+        with open(info_plist, 'rb') as f:
+            plist = plistlib.load(f)
+        return plist.get('CFBundleShortVersionString') or plist.get('CFBundleVersion')
+    except Exception:
+        return None
+
+def merge_tree(source, dest):
+    """
+    Move source to dest the way extractall would: folders are merged, while
+    payloads (files and kext bundles) already at dest are replaced as a whole
+    """
+    source, dest = Path(source), Path(dest)
+    if source.is_dir() and dest.is_dir() and not source.name.endswith('.kext'):
+        for child in sorted(source.iterdir()):
+            merge_tree(child, dest / child.name)
+        return
+
+    if dest.is_dir() and not dest.is_symlink():
+        shutil.rmtree(dest)
+    elif dest.exists() or dest.is_symlink():
+        dest.unlink()
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    shutil.move(str(source), str(dest))
+
+class ArchiveIndex:
+    def __init__(self, archive_dir):
+        self.archive_dir = Path(archive_dir)
+        self.index_file = self.archive_dir / INDEX_NAME
+        self.entries = {}
+        self.dirs = {}
+        self.by_name = {}
+        self.by_hash = {}
+
+    @classmethod
+    def load(cls, archive_dir):
+        """Load the index once per process, building it if it's missing or stale"""
+        archive_dir = Path(archive_dir).resolve()
+        # The boot menu counts drivers from background threads, build only once
+        with _load_lock:
+            if archive_dir in _loaded:
+                return _loaded[archive_dir]
+
+            # Trust the persisted index unless a payload was added or removed
+            # behind its back, walking the whole archive costs seconds on a USB ESP
+            index = cls(archive_dir)
+            if not index.read() or index.dirs != index.dir_signature():
+                index.refresh()
+            _loaded[archive_dir] = index
+            return index
+
+    def read(self):
+        """Read the persisted index, returns False if missing or outdated"""
+        try:
+            with open(self.index_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if data.get('version') != INDEX_VERSION:
+            return False
+
+        self.entries = data.get('entries', {})
+        self.dirs = data.get('dirs', {})
+        self._rebuild_lookups()
+        return True
+
+    def save(self):
+        """Atomically write the index next to the archive"""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self.dirs = self.dir_signature()
+        data = {'version': INDEX_VERSION, 'entries': self.entries, 'dirs': self.dirs}
+        fd, tmp = tempfile.mkstemp(dir=self.archive_dir, prefix=".index-")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, separators=(',', ':'), sort_keys=True)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, self.index_file)
+
+    def dir_signature(self):
+        """mtimes of the OS and section folders, adding or removing a payload by hand touches one"""
+        signature = {}
+        for os_dir in OS_DIRS:
+            top = self.archive_dir / os_dir
+            if not top.is_dir():
+                continue
+            signature[os_dir] = top.stat().st_mtime_ns
+            for entry in os.scandir(top):
+                if entry.is_dir() and not entry.name.endswith('.kext'):
+                    signature[f"{os_dir}/{entry.name}"] = entry.stat().st_mtime_ns
+        return signature
+
+    def _rebuild_lookups(self):
+        """Hash indexes over the flat entry table"""
+        self.by_name = {}
+        self.by_hash = {}
+        for rel in sorted(self.entries):
+            entry = self.entries[rel]
+            self.by_name.setdefault((entry['os'], entry['name']), []).append(rel)
+            self.by_hash.setdefault(entry['hash'], rel)
+
+    def classify(self, rel_path):
+        """Describe an archive-relative path, or None if it isn't a driver payload"""
+        parts = Path(rel_path).parts
+        if len(parts) < 2 or parts[0] not in OS_DIRS:
+            return None
+        if any(part in SKIP_DIRS for part in parts):
+            return None
+
+        os_name = OS_DIRS[parts[0]]
+        filename = parts[-1]
+        section = parts[1] if len(parts) > 2 else ''
+
+        if os_name == 'macos' and not filename.endswith('.kext'):
+            return None
+        if os_name == 'windows' and not filename.lower().endswith(WINDOWS_SUFFIXES):
+            return None
+        if os_name == 'linux' and not filename.endswith(LINUX_SUFFIXES):
+            return None
+
+        if os_name == 'linux':
+            arch = 'arm64' if section == 'Asahi' else 'x86_64'
+        elif os_name == 'windows':
+            arch = 'arm64' if section == 'ARM_Drivers' else 'x86_64'
+        else:
+            arch = 'x86_64'
+
+        return {
+            'os': os_name,
+            'name': driver_key(filename),
+            'file': filename,
+            'section': section,
+            'arch': arch
+        }
+
+    def scan(self, under=None):
+        """Walk the archive (or one folder of it) once, yielding relative paths of driver payloads"""
+        tops = [self.archive_dir / os_dir for os_dir in OS_DIRS] if under is None else [Path(under)]
+        for top in tops:
+            if not top.exists():
+                continue
+            for root, dirs, files in os.walk(top):
+                rel_root = Path(root).relative_to(self.archive_dir)
+                # Kext bundles are leaves, never index their plugins separately
+                for d in list(dirs):
+                    if d in SKIP_DIRS or d.endswith('.dSYM'):
+                        dirs.remove(d)
+                    elif d.endswith('.kext'):
+                        dirs.remove(d)
+                        yield (rel_root / d).as_posix()
+                for name in files:
+                    if self.classify((rel_root / name).as_posix()):
+                        yield (rel_root / name).as_posix()
+
+    def update_path(self, rel_path, signature=None):
+        """(Re)index a single archive-relative path, rehashing only if it changed"""
+        info = self.classify(rel_path)
+        full = self.archive_dir / rel_path
+        if info is None or not full.exists():
+            return self.entries.pop(rel_path, None) is not None
+
+        signature = signature or stat_signature(full)
+        current = self.entries.get(rel_path)
+        if current and current.get('sig') == signature:
+            return False
+
+        info['sig'] = signature
+        info['hash'] = content_hash(full)
+        info['version'] = kext_version(full) if info['os'] == 'macos' else None
+        self.entries[rel_path] = info
+        return True
+
+    def refresh(self):
+        """Incrementally sync the index with the disk and persist it"""
+        seen = set()
+        changed = 0
+        for rel in self.scan():
+            seen.add(rel)
+            if self.update_path(rel):
+                changed += 1
+
+        for rel in set(self.entries) - seen:
+            del self.entries[rel]
+            changed += 1
+
+        self._rebuild_lookups()
+        if changed or not self.index_file.exists() or self.dirs != self.dir_signature():
+            self.save()
+        return changed
+
+    def add(self, source, os_dir, section):
+        """
+        Store a driver payload by content. If an identical payload is already
+        archived, nothing is copied and the existing path is returned.
+        """
+        source = Path(source)
+        digest = content_hash(source)
+        existing = self.by_hash.get(digest)
+        if existing:
+            return self.archive_dir / existing, False
+
+        dest = self.archive_dir / os_dir / section / source.name
+        merge_tree(source, dest)
+
+        # A container folder (ex. a release zip's Kexts/) holds the payloads,
+        # index each of them rather than the folder itself
+        rel = dest.relative_to(self.archive_dir).as_posix()
+        payloads = [rel] if self.classify(rel) else list(self.scan(dest))
+        for payload in payloads:
+            self.update_path(payload)
+        self._rebuild_lookups()
+        self.save()
+        return dest, True
+
+    def digest(self):
+        """Hash of the whole index; changes whenever any payload is added, removed or modified"""
+        h = hashlib.sha256()
+        for rel in sorted(self.entries):
+            h.update(f"{rel}\0{self.entries[rel]['hash']}\n".encode())
+        return h.hexdigest()
+
+    def find(self, os_name, name, sections=None):
+        """Path of a driver by name; sections are tried in priority order"""
+        rels = self.by_name.get((os_name, driver_key(name)), [])
+        if sections is None:
+            return self.archive_dir / rels[0] if rels else None
+
+        for section in sections:
+            for rel in rels:
+                if self.entries[rel]['section'] == section:
+                    return self.archive_dir / rel
+        return None
+
+    def entries_for(self, os_name, sections=None, suffixes=None):
+        """All entries for an OS, optionally limited to sections and file suffixes"""
+        result = []
+        for rel, entry in self.entries.items():
+            if entry['os'] != os_name:
+                continue
+            if sections is not None and entry['section'] not in sections:
+                continue
+            if suffixes is not None and not entry['file'].lower().endswith(suffixes):
+                continue
+            result.append((rel, entry))
+        return result
+
+    def search(self, os_name, text, sections=None):
+        """Entries whose name contains text (like rglob('*text*'), but in memory)"""
+        return [(rel, e) for rel, e in self.entries_for(os_name, sections) if text in e['file']]
+
+    def count(self, os_name, sections=None, suffixes=None):
+        """Number of distinct payloads (by hash)"""
+        return len({e['hash'] for _, e in self.entries_for(os_name, sections, suffixes)})
+
+def main():
+    """Rebuild the archive index and print a summary"""
+    archive_dir = Path(__file__).parent.parent / "DriverArchive"
+
+    print("=" * 60)
+    print("Driver Archive Index")
+    print("=" * 60)
+
+    index = ArchiveIndex(archive_dir)
+    index.read()
+    changed = index.refresh()
+
+    print(f"\n✅ Index: {index.index_file} ({changed} changes)")
+    for os_name in ('macos', 'windows', 'linux'):
+        entries = index.entries_for(os_name)
+        print(f"   {os_name}: {len(entries)} entries, {index.count(os_name)} unique payloads")
+
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
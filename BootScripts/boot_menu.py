@@ -6,15 +6,128 @@ This runs at boot time and presents the user with OS choices
 
 import sys
 import os
+import json
+import threading
+import time
 from pathlib import Path
 
+_started = time.perf_counter()
+
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from detect_hardware import detect_all
-from driver_mapper import generate_manifest
+# Only light imports up here - detection, the archive index and the injectors
+# are imported when first needed so the menu shows up right after power-on
 from universal_wrapper import UniversalWrapper
-import json
+
+BASE_DIR = Path(__file__).parent.parent
+
+# Time from interpreter start to first menu render on a known machine
+STARTUP_BUDGET_MS = 150
+
+# Injector module, class and "what's needed" method per OS
+INJECTORS = {
+    'macos': ('opencore_injector', 'OpenCoreInjector', 'get_required_kexts'),
+    'windows': ('windows_injector', 'WindowsInjector', 'get_required_drivers'),
+    'linux': ('linux_injector', 'LinuxInjector', 'get_required_modules')
+}
+
+def load_hardware(refresh=False):
+    """Cached profile for a known machine, full detection otherwise"""
+    from detect_hardware import detect_all, quick_fingerprint
+    from driver_mapper import generate_manifest
+    from profile_cache import ProfileCache
+    
+    cache = ProfileCache()
+    
+    if not refresh:
+        entry = cache.lookup(quick_fingerprint())
+        if entry:
+            cache.activate(entry)
+            return entry['profile']
+    
+    hardware = detect_all()
+    manifest = generate_manifest(hardware)
+    cache.store(hardware, manifest)
+    cache.activate({'profile': hardware, 'manifest': manifest})
+    return hardware
+
+def read_current_profile():
+    """Last activated profile, good enough to draw the menu while it's being verified"""
+    try:
+        with open(BASE_DIR / "HardwareProfiles" / "current.json", 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def load_injector(os_choice):
+    """Import the injector for the chosen OS only"""
+    import importlib
+    
+    module_name, class_name, _ = INJECTORS[os_choice]
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)()
+
+class BackgroundStatus:
+    """Results of slow checks, filled in by daemon threads while the menu is up"""
+    
+    def __init__(self):
+        self.values = {}
+        self.threads = {}
+        self.listener = None
+        self.lock = threading.Lock()
+    
+    def start(self, key, func):
+        thread = threading.Thread(target=self._run, args=(key, func), daemon=True)
+        self.threads[key] = thread
+        thread.start()
+    
+    def _run(self, key, func):
+        try:
+            value = func()
+        except Exception as e:
+            value = e
+        
+        with self.lock:
+            self.values[key] = value
+            listener = self.listener
+        if listener:
+            listener(key, value)
+    
+    def ready(self, key):
+        return key in self.values
+    
+    def get(self, key, wait=False):
+        """Result for key (an Exception if the check failed), None while pending"""
+        if wait and key in self.threads:
+            self.threads[key].join()
+        return self.values.get(key)
+
+class MenuScreen:
+    """Menu lines, with named slots that background results rewrite in place"""
+    
+    def __init__(self):
+        self.lines = []
+        self.slots = {}
+        self.live = False
+    
+    def add(self, text="", slot=None):
+        self.lines.extend(text.split("\n"))
+        if slot:
+            self.slots[slot] = len(self.lines) - 1
+    
+    def show(self):
+        print("\n".join(self.lines))
+        self.live = sys.stdout.isatty()
+    
+    def update(self, slot, text):
+        """Rewrite a line above the input prompt, keeping the cursor where the user types"""
+        if not self.live or slot not in self.slots:
+            return
+        # The prompt sits one blank line below the last menu line
+        rows_up = len(self.lines) + 1 - self.slots[slot]
+        sys.stdout.write(f"\0337\033[{rows_up}A\r\033[2K{text}\0338")
+        sys.stdout.flush()
 
 def clear_screen():
     """Clear terminal"""
@@ -26,86 +139,118 @@ def print_header():
     print("    🔥 UNIVERSAL MULTIBOOT - GENESIS")
     print("="*60)
 
-def show_hardware_info(hardware):
+def show_hardware_info(hardware, screen):
     """Display detected hardware"""
-    print(f"\n💻 Detected Hardware:")
-    print(f"   CPU: {hardware.get('cpu', {}).get('name', 'Unknown')}")
-    print(f"   Platform: {hardware.get('platform', 'Unknown')}")
-    print(f"   Firmware: {hardware.get('firmware', 'Unknown')}")
+    screen.add(f"\n💻 Detected Hardware:")
+    screen.add(f"   CPU: {hardware.get('cpu', {}).get('name', 'Unknown')}")
+    screen.add(f"   Platform: {hardware.get('platform', 'Unknown')}")
+    screen.add(f"   Firmware: {hardware.get('firmware', 'Unknown')}")
     
     gpus = hardware.get('gpu', [])
     if gpus:
-        print(f"   GPU: {gpus[0].get('manufacturer', 'Unknown')} - {gpus[0].get('description', '')[:50]}")
+        screen.add(f"   GPU: {gpus[0].get('manufacturer', 'Unknown')} - {gpus[0].get('description', '')[:50]}")
     
     networks = hardware.get('network', [])
     wifi = [n for n in networks if n.get('type') == 'WiFi']
     if wifi:
-        print(f"   WiFi: {wifi[0].get('description', '')[:50]}")
+        screen.add(f"   WiFi: {wifi[0].get('description', '')[:50]}")
+
+def archive_line(status, os_choice):
+    """Archive count for the menu, or a placeholder while it's still being counted"""
+    if not status.ready(os_choice):
+        return "     Archive: counting..."
+    count = status.get(os_choice)
+    if isinstance(count, Exception):
+        return "     Archive: unavailable"
+    return f"     Archive: {count} drivers/modules available"
 
-def show_os_menu(wrapper, hardware):
+def show_os_menu(wrapper, hardware, screen, status):
     """Show OS selection menu"""
     computer_type = wrapper.detect_computer_type()
     
-    print(f"\n🖥️  Computer Type: {computer_type}")
-    print("\n📋 Available Operating Systems:")
-    print("\n  1. macOS")
+    screen.add(f"\n🖥️  Computer Type: {computer_type}")
+    screen.add("\n📋 Available Operating Systems:")
     
-    strategy = wrapper.get_boot_strategy(computer_type, 'macos')
-    print(f"     Method: {strategy.get('description', 'N/A')}")
+    for i, (os_choice, label) in enumerate([('macos', 'macOS'), ('windows', 'Windows'), ('linux', 'Linux (Ubuntu)')], 1):
+        strategy = wrapper.get_boot_strategy(computer_type, os_choice)
+        screen.add(f"\n  {i}. {label}")
+        screen.add(f"     Method: {strategy.get('description', 'N/A')}")
+        screen.add(archive_line(status, os_choice), slot=os_choice)
     
-    print("\n  2. Windows")
-    strategy = wrapper.get_boot_strategy(computer_type, 'windows')
-    print(f"     Method: {strategy.get('description', 'N/A')}")
+    screen.add("\n  4. Refresh Hardware Detection")
+    screen.add("  5. Advanced Options")
+    screen.add("  6. Reboot")
+    screen.add("  7. Power Off")
+
+def count_linux_modules(modules_dir=Path("/lib/modules")):
+    """Count .ko modules per installed kernel, from modules.dep instead of walking the tree"""
+    if not modules_dir.exists():
+        return 0
     
-    print("\n  3. Linux (Ubuntu)")
-    strategy = wrapper.get_boot_strategy(computer_type, 'linux')
-    print(f"     Method: {strategy.get('description', 'N/A')}")
+    count = 0
+    for kernel in os.scandir(modules_dir):
+        if not kernel.is_dir():
+            continue
+        
+        dep_file = Path(kernel.path) / "modules.dep"
+        if dep_file.exists():
+            with open(dep_file, 'rb') as f:
+                count += sum(1 for line in f if line.partition(b':')[0].endswith(b'.ko'))
+            continue
+        
+        # No depmod output (kernel not installed properly), fall back to a walk
+        for _, _, files in os.walk(kernel.path):
+            count += sum(1 for name in files if name.endswith('.ko'))
     
-    print("\n  4. Refresh Hardware Detection")
-    print("  5. Advanced Options")
-    print("  6. Reboot")
-    print("  7. Power Off")
+    return count
 
 def check_archive_status(os_choice):
     """Check if drivers are in archive"""
-    base_dir = Path(__file__).parent.parent
-    archive_dir = base_dir / "DriverArchive"
+    from archive_index import ArchiveIndex
+    
+    archive_dir = BASE_DIR / "DriverArchive"
     
     if os_choice == 'macos':
-        kext_dirs = [
-            archive_dir / "macOS" / "Universal",
-            archive_dir / "macOS" / "PC_Specific"
-        ]
-        total = 0
-        for kdir in kext_dirs:
-            if kdir.exists():
-                total += len(list(kdir.rglob("*.kext")))
-        return total
+        index = ArchiveIndex.load(archive_dir)
+        return index.count('macos', sections=['Universal', 'PC_Specific'])
     
     elif os_choice == 'windows':
-        driver_dir = archive_dir / "Windows" / "PC_Drivers"
-        if driver_dir.exists():
-            return len(list(driver_dir.rglob("*.exe"))) + len(list(driver_dir.rglob("*.inf")))
-        return 0
+        index = ArchiveIndex.load(archive_dir)
+        return index.count('windows', sections=['PC_Drivers'], suffixes=('.exe', '.inf'))
     
     elif os_choice == 'linux':
-        return len(list(Path("/lib/modules").rglob("*.ko"))) if Path("/lib/modules").exists() else 0
+        return count_linux_modules()
     
     return 0
 
-def boot_os(os_choice, wrapper):
+def start_background_checks(status, verify_profile=True):
+    """Kick off archive counts, module scan and profile verification"""
+    for os_choice in ('macos', 'windows', 'linux'):
+        status.start(os_choice, lambda os_choice=os_choice: check_archive_status(os_choice))
+    if verify_profile:
+        status.start('profile', load_hardware)
+
+def boot_os(os_choice, wrapper, status=None):
     """Boot selected OS"""
     print(f"\n{'='*60}")
     print(f"🚀 Preparing to boot {os_choice.upper()}...")
     print(f"{'='*60}")
     
-    # Check archive
-    driver_count = check_archive_status(os_choice)
+    # Check archive (the background count may already have it)
+    driver_count = status.get(os_choice, wait=True) if status else None
+    if driver_count is None or isinstance(driver_count, Exception):
+        driver_count = check_archive_status(os_choice)
     print(f"\n📦 Archive Status: {driver_count} drivers/modules available")
     
     # Configure boot
     config = wrapper.configure_boot(os_choice)
     
+    injector = load_injector(os_choice)
+    required = getattr(injector, INJECTORS[os_choice][2])(config['computer_type'])
+    if isinstance(required, tuple):
+        required = required[0]
+    print(f"💉 {type(injector).__name__}: {len(required)} drivers to inject")
+    
     print(f"\n⚙️  Configuration complete!")
     print(f"\n🔄 Booting {os_choice.upper()} in 3 seconds...")
     print(f"    (Press Ctrl+C to cancel)")
@@ -133,40 +278,66 @@ def boot_os(os_choice, wrapper):
     
     return True
 
-def main_menu():
+def main_menu(fast=True):
     """Main boot menu loop"""
     clear_screen()
     print_header()
     
-    print("\n🔍 Detecting hardware...")
+    status = BackgroundStatus()
+    hardware = read_current_profile() if fast else None
     
-    # Detect hardware
-    hardware = detect_all()
+    if hardware is None:
+        print("\n🔍 Detecting hardware...")
+        
+        # Detect hardware (skipped for machines we've seen before)
+        hardware = load_hardware()
+        start_background_checks(status, verify_profile=False)
+    else:
+        # Draw from the last profile now, verify it against this machine meanwhile
+        start_background_checks(status)
+    
+    if not fast:
+        for thread in status.threads.values():
+            thread.join()
     
     # Initialize wrapper
     wrapper = UniversalWrapper()
     
+    boot_choices = {'1': 'macos', '2': 'windows', '3': 'linux'}
+    
     while True:
+        # The background check may have found a different machine than current.json
+        verified = status.get('profile')
+        if isinstance(verified, dict) and verified is not hardware:
+            hardware = verified
+            wrapper = UniversalWrapper()
+        
+        screen = MenuScreen()
+        show_hardware_info(hardware, screen)
+        show_os_menu(wrapper, hardware, screen, status)
+        screen.add("\n" + "="*60)
+        
         clear_screen()
         print_header()
-        show_hardware_info(hardware)
-        show_os_menu(wrapper, hardware)
+        screen.show()
+        status.listener = lambda key, value: screen.update(key, archive_line(status, key))
         
-        print("\n" + "="*60)
         choice = input("\nSelect option (1-7): ").strip()
+        status.listener = None
+        screen.live = False
         
-        if choice == '1':
-            if boot_os('macos', wrapper):
-                break
-        elif choice == '2':
-            if boot_os('windows', wrapper):
-                break
-        elif choice == '3':
-            if boot_os('linux', wrapper):
+        if choice in boot_choices:
+            # Never boot with a profile that's still being verified
+            verified = status.get('profile', wait=True)
+            if isinstance(verified, dict) and verified is not hardware:
+                hardware = verified
+                wrapper = UniversalWrapper()
+            if boot_os(boot_choices[choice], wrapper, status):
                 break
         elif choice == '4':
             print("\n🔄 Refreshing hardware detection...")
-            hardware = detect_all()
+            hardware = load_hardware(refresh=True)
+            wrapper = UniversalWrapper()
             input("\nPress Enter to continue...")
         elif choice == '5':
             print("\n⚙️  Advanced Options - Coming soon!")
@@ -183,9 +354,86 @@ def main_menu():
             print("\n❌ Invalid choice!")
             input("\nPress Enter to continue...")
 
+def import_report():
+    """Run this module under 'python -X importtime', returns (total_ms, every row, slowest first)"""
+    import subprocess
+    
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import boot_menu'],
+        cwd=Path(__file__).parent, capture_output=True, text=True
+    )
+    
+    rows = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+        if name.strip() == 'boot_menu':
+            total_us = int(cumulative_us)
+    
+    rows.sort(reverse=True)
+    return total_us / 1000, rows
+
+def startup_report(top=12):
+    """Import costs plus time to first menu render, checked against STARTUP_BUDGET_MS"""
+    print("=" * 60)
+    print("Boot Menu Startup Report")
+    print("=" * 60)
+    
+    import_ms, rows = import_report()
+    print(f"\n📦 Imports (python -X importtime): {import_ms:.1f} ms")
+    print(f"   {'self':>9} {'cumulative':>11}  module")
+    for cumulative_us, self_us, name in rows[:top]:
+        print(f"   {self_us / 1000:7.1f}ms {cumulative_us / 1000:9.1f}ms {name}")
+    
+    phases = []
+    start = time.perf_counter()
+    hardware = read_current_profile() or {}
+    phases.append(("read profile", time.perf_counter() - start))
+    
+    start = time.perf_counter()
+    wrapper = UniversalWrapper()
+    phases.append(("wrapper", time.perf_counter() - start))
+    
+    start = time.perf_counter()
+    screen = MenuScreen()
+    show_hardware_info(hardware, screen)
+    show_os_menu(wrapper, hardware, screen, BackgroundStatus())
+    phases.append(("render", time.perf_counter() - start))
+    
+    print(f"\n⏱️  First render:")
+    for name, seconds in phases:
+        print(f"   {name:<14} {seconds * 1000:7.1f} ms")
+    
+    total_ms = import_ms + sum(seconds for _, seconds in phases) * 1000
+    within = total_ms <= STARTUP_BUDGET_MS
+    print(f"\n{'✅' if within else '❌'} Imports + first render: {total_ms:.1f} ms (budget {STARTUP_BUDGET_MS} ms)")
+    
+    # The heavy modules must stay out of the startup path, however cheap their import
+    lazy = ['detect_hardware', 'archive_index', 'profile_cache'] + [m for m, _, _ in INJECTORS.values()]
+    eager = [m for _, _, m in rows if m.strip() in lazy]
+    for name in eager:
+        print(f"   ⚠️  {name.strip()} is imported at startup")
+    
+    return within and not eager
+
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Universal MultiBoot boot menu")
+    parser.add_argument("--full-start", action="store_true",
+                        help="Detect hardware and count drivers before showing the menu")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="Show import and first-render timings against the startup budget")
+    args = parser.parse_args()
+    
+    if args.startup_report:
+        sys.exit(0 if startup_report() else 1)
+    
     try:
-        main_menu()
+        main_menu(fast=not args.full_start)
     except KeyboardInterrupt:
         print("\n\n❌ Boot cancelled by user")
         sys.exit(1)
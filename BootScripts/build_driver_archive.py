@@ -10,6 +10,8 @@ from pathlib import Path
 import urllib.request
 import shutil
 
+from archive_index import ArchiveIndex
+
 class DriverArchiveBuilder:
     def __init__(self):
         self.base_dir = Path(__file__).parent.parent
@@ -72,7 +74,7 @@ class DriverArchiveBuilder:
             print(f"   ❌ Extract failed: {e}")
             return False
     
-    def build_macos_archive(self):
+    def build_macos_archive(self, manifest=None):
         """Download macOS kexts"""
         print("\n" + "="*60)
         print("🍎 Building macOS Kext Archive")
@@ -82,10 +84,11 @@ class DriverArchiveBuilder:
         manifest_file = self.base_dir / "HardwareProfiles" / "current_manifest.json"
         needed_kexts = []
         
-        if manifest_file.exists():
+        if manifest is None and manifest_file.exists():
             with open(manifest_file, 'r') as f:
                 manifest = json.load(f)
-                needed_kexts = manifest.get('macos', {}).get('kexts', [])
+        if manifest:
+            needed_kexts = manifest.get('macos', {}).get('kexts', [])
         
         print(f"\n📋 Required kexts: {len(needed_kexts)}")
         for kext in needed_kexts:
@@ -128,6 +131,10 @@ class DriverArchiveBuilder:
         final_kexts = list(kext_dir.glob("*.kext"))
         print(f"📦 Total in archive: {len(final_kexts)} kexts")
         
+        # Pick up new kexts so injectors don't have to search for them
+        changed = ArchiveIndex.load(self.archive_dir).refresh()
+        print(f"🗂️  Archive index updated ({changed} changes)")
+        
         return True
     
     def build_windows_archive(self):
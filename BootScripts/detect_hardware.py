@@ -7,8 +7,12 @@ Detects CPU, GPU, Network, Storage, Firmware
 import subprocess
 import json
 import re
+import sys
+import time
 from pathlib import Path
 
+from sysfs_probe import SysfsProbe, capture
+
 def run_cmd(cmd):
     """Run command and return output"""
     try:
@@ -200,8 +204,28 @@ def generate_fingerprint(hardware):
     
     return '_'.join(parts)
 
-def detect_all():
-    """Detect all hardware"""
+def quick_fingerprint(root='/'):
+    """Fingerprint from cpuinfo and GPU IDs only, without a full probe. None if sysfs is unavailable"""
+    probe = SysfsProbe(root)
+    if not probe.available():
+        return None
+    
+    arch = probe.architecture()
+    cpu = probe.cpu()
+    gpus = [
+        {'vendor_id': d['vendor_id'], 'device_id': d['device_id']}
+        for d in probe.pci_devices() if d['class'] >> 8 == 0x03
+    ]
+    
+    return generate_fingerprint({
+        'platform': probe.platform(arch, cpu),
+        'cpu': cpu,
+        'gpu': gpus
+    })
+
+def detect_all_legacy():
+    """Detect all hardware through lspci/uname (no sysfs available)"""
+    start = time.perf_counter()
     hardware = {
         'architecture': detect_architecture(),
         'platform': detect_platform(),
@@ -211,25 +235,76 @@ def detect_all():
         'network': detect_network(),
         'storage': detect_storage()
     }
+    hardware['timings'] = {'total': round((time.perf_counter() - start) * 1000, 3)}
+    
+    return hardware
+
+def detect_all(root='/'):
+    """Detect all hardware"""
+    probe = SysfsProbe(root)
+    
+    if probe.available():
+        hardware = probe.probe()
+        hardware['timings'] = probe.timings
+        hardware['probe'] = 'sysfs'
+    else:
+        hardware = detect_all_legacy()
+        hardware['probe'] = 'lspci'
     
     # Generate fingerprint
     hardware['fingerprint'] = generate_fingerprint(hardware)
     
     return hardware
 
+def verify_profile(root, expected_file):
+    """Replay a captured tree and compare its profile with expected_file, timings aside"""
+    hardware = detect_all(root)
+    with open(expected_file) as f:
+        expected = json.load(f)
+    
+    mismatches = [key for key in sorted(set(hardware) | set(expected))
+                  if key != 'timings' and hardware.get(key) != expected.get(key)]
+    for key in mismatches:
+        print(f"❌ {key}:")
+        print(f"    expected: {json.dumps(expected.get(key))}")
+        print(f"    probed:   {json.dumps(hardware.get(key))}")
+    
+    if mismatches:
+        print(f"\n❌ {root} does not match {expected_file}")
+        return False
+    print(f"✅ {root} matches {expected_file}")
+    return True
+
 def main():
     """Main detection routine"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Hardware Detection System")
+    parser.add_argument("--root", default="/", help="Probe a captured sysfs/procfs tree instead of this machine")
+    parser.add_argument("--capture", metavar="DIR", help="Capture this machine's sysfs/procfs files into DIR and exit")
+    parser.add_argument("--verify", metavar="PROFILE", help="Compare the profile of --root against PROFILE and exit, ex. fixtures/thinkpad_t480.json")
+    parser.add_argument("--output", metavar="PROFILE", help="Save the profile to PROFILE instead of HardwareProfiles/current.json")
+    args = parser.parse_args()
+    
+    if args.capture:
+        capture(args.capture, args.root)
+        print(f"✅ Captured probe fixture to: {args.capture}")
+        return True
+    
+    if args.verify:
+        sys.exit(0 if verify_profile(args.root, args.verify) else 1)
+    
     print("=" * 60)
     print("Hardware Detection System")
     print("=" * 60)
     
-    hardware = detect_all()
+    hardware = detect_all(args.root)
     
     # Save to HardwareProfiles
     profiles_dir = Path(__file__).parent.parent / "HardwareProfiles"
     profiles_dir.mkdir(parents=True, exist_ok=True)
     
-    profile_file = profiles_dir / "current.json"
+    profile_file = Path(args.output) if args.output else profiles_dir / "current.json"
     with open(profile_file, 'w') as f:
         json.dump(hardware, f, indent=2)
     
@@ -250,6 +325,10 @@ def main():
     print(f"  Storage: {len(hardware['storage'])} controllers")
     print(f"\n🔖 Fingerprint: {hardware['fingerprint']}")
     
+    print(f"\n⏱️  Probe ({hardware['probe']}):")
+    for stage, ms in hardware['timings'].items():
+        print(f"    {stage}: {ms:.1f} ms")
+    
     return hardware
 
 if __name__ == "__main__":
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Driver Rule Engine
+Compiles the declarative rules in driver_rules.json into hash/range indexes
+
+Rule fields:
+  os        macos | windows | linux
+  class     always | platform | gpu | wifi | ethernet | network (wifi or ethernet) | storage
+  vendor    PCI vendor ID, hex ("8086"). Omit to match any vendor
+  devices   list of "5916", ranges "0400-040f", or OCLP tables "pci_data:intel_ids.kaby_lake_ids"
+  platform  only apply on this platform (Intel / AMD / ARM64)
+  drivers   kexts / Windows drivers / Linux modules to add
+"""
+
+import bisect
+import importlib.util
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+RULES_FILE = Path(__file__).parent / "driver_rules.json"
+
+# Where to find OCLP's PCI tables for "pci_data:" device references
+PCI_DATA_PATHS = [
+    Path(__file__).parent / "pci_data.py",
+    Path(__file__).parent.parent / "OpenCore-Legacy-Patcher-main" / "opencore_legacy_patcher" / "datasets" / "pci_data.py"
+]
+
+# For profiles from the lspci fallback that only carry a manufacturer name
+MANUFACTURER_VENDORS = {
+    'nvidia': '10de',
+    'amd': '1002',
+    'intel': '8086',
+    'apple': '106b'
+}
+
+_pci_data = None
+
+def load_pci_data():
+    """Import OCLP's datasets/pci_data.py by path (it has no dependencies). None if not shipped"""
+    global _pci_data
+    if _pci_data is not None:
+        return _pci_data or None
+
+    candidates = [Path(os.environ['MULTIBOOT_PCI_DATA'])] if os.environ.get('MULTIBOOT_PCI_DATA') else []
+    for path in candidates + PCI_DATA_PATHS:
+        if path.exists():
+            spec = importlib.util.spec_from_file_location("pci_data", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _pci_data = module
+            return module
+
+    _pci_data = False
+    return None
+
+def pci_data_file():
+    """Path of the pci_data.py in use, if any"""
+    module = load_pci_data()
+    return Path(module.__file__) if module else None
+
+def parse_devices(specs):
+    """Split device specs into (exact ids, inclusive ranges). None if a table can't be resolved"""
+    exact = set()
+    ranges = []
+    for spec in specs:
+        if isinstance(spec, int):
+            exact.add(spec)
+        elif spec.startswith('pci_data:'):
+            module = load_pci_data()
+            if module is None:
+                return None
+            table = module
+            for attr in spec[len('pci_data:'):].split('.'):
+                table = getattr(table, attr)
+            exact.update(table)
+        elif '-' in spec:
+            lo, hi = spec.split('-')
+            ranges.append((int(lo, 16), int(hi, 16)))
+        else:
+            exact.add(int(spec, 16))
+    return exact, ranges
+
+def build_segments(intervals):
+    """Flatten possibly overlapping (lo, hi, rule) into sorted, disjoint segments for bisect"""
+    bounds = sorted({lo for lo, _, _ in intervals} | {hi + 1 for _, hi, _ in intervals})
+    starts = []
+    members = []
+    for start in bounds:
+        starts.append(start)
+        members.append(tuple(rule for lo, hi, rule in intervals if lo <= start <= hi))
+    return starts, members
+
+class DriverRuleEngine:
+    def __init__(self, rules):
+        self.always = {}
+        self.platform = {}
+        self.any_device = {}
+        self.exact = {}
+        self.ranges = {}
+        self.skipped = 0
+        self.compile(rules)
+
+    @classmethod
+    def from_file(cls, path=RULES_FILE):
+        with open(path, 'r') as f:
+            return cls(json.load(f)['rules'])
+
+    def compile(self, rules):
+        """Build hash indexes for exact IDs and segment tables for ID ranges"""
+        intervals = {}
+
+        for rule in rules:
+            os_name = rule['os']
+            cls = rule['class']
+            entry = (rule.get('platform'), tuple(rule['drivers']))
+
+            if cls == 'always':
+                self.always.setdefault(os_name, []).extend(entry[1])
+                continue
+            if cls == 'platform':
+                self.platform.setdefault((os_name, rule['platform']), []).extend(entry[1])
+                continue
+
+            vendor = rule.get('vendor', '').lower() or None
+            if 'devices' not in rule:
+                self.any_device.setdefault((os_name, cls, vendor), []).append(entry)
+                continue
+
+            if vendor is None:
+                raise ValueError(f"Rule with devices needs a vendor: {rule}")
+
+            parsed = parse_devices(rule['devices'])
+            if parsed is None:
+                self.skipped += 1
+                continue
+
+            exact, ranges = parsed
+            for device in exact:
+                self.exact.setdefault((os_name, cls, vendor, device), []).append(entry)
+            for lo, hi in ranges:
+                intervals.setdefault((os_name, cls, vendor), []).append((lo, hi, entry))
+
+        for key, items in intervals.items():
+            self.ranges[key] = build_segments(items)
+
+    def match_device(self, os_name, classes, vendor, device=None, platform=None):
+        """Drivers for one device: a fixed number of dict lookups plus one bisect per class"""
+        matched = []
+        for cls in classes:
+            for v in ((vendor, None) if vendor else (None,)):
+                matched.extend(self.any_device.get((os_name, cls, v), ()))
+            if device is None:
+                continue
+            matched.extend(self.exact.get((os_name, cls, vendor, device), ()))
+            table = self.ranges.get((os_name, cls, vendor))
+            if table:
+                starts, members = table
+                idx = bisect.bisect_right(starts, device) - 1
+                if idx >= 0:
+                    matched.extend(members[idx])
+
+        drivers = []
+        for rule_platform, rule_drivers in matched:
+            if rule_platform is None or rule_platform == platform:
+                drivers.extend(rule_drivers)
+        return drivers
+
+    def devices(self, hardware):
+        """(classes, vendor, device) for every device in a profile"""
+        for gpu in hardware.get('gpu', []):
+            vendor = gpu.get('vendor_id', '').lower()
+            if not vendor:
+                manufacturer = gpu.get('manufacturer', '').lower()
+                vendor = next((v for m, v in MANUFACTURER_VENDORS.items() if m in manufacturer), '')
+            yield ('gpu',), vendor, gpu.get('device_id')
+
+        for net in hardware.get('network', []):
+            yield (net.get('type', '').lower(), 'network'), net.get('vendor_id', '').lower(), net.get('device_id')
+
+        for storage in hardware.get('storage', []):
+            if storage.get('vendor_id'):
+                yield ('storage',), storage['vendor_id'].lower(), storage.get('device_id')
+
+    def map_devices(self, hardware, os_name):
+        """Drivers required by the profile's devices only"""
+        platform = hardware.get('platform', '')
+        drivers = set()
+        for classes, vendor, device in self.devices(hardware):
+            device = int(device, 16) if device else None
+            drivers.update(self.match_device(os_name, classes, vendor or None, device, platform))
+        return drivers
+
+    def map_profile(self, hardware, os_name):
+        """Sorted, de-duplicated driver list for a profile"""
+        drivers = set(self.always.get(os_name, ()))
+        drivers.update(self.platform.get((os_name, hardware.get('platform', '')), ()))
+        drivers.update(self.map_devices(hardware, os_name))
+        return sorted(drivers)
+
+_engine = None
+
+def get_engine():
+    """Engine compiled from driver_rules.json, built once per process"""
+    global _engine
+    if _engine is None:
+        _engine = DriverRuleEngine.from_file()
+    return _engine
+
+def synthetic_profiles(count, seed=0):
+    """Random but plausible hardware profiles for benchmarking"""
+    rng = random.Random(seed)
+    gpu_vendors = [('8086', 'Intel'), ('10de', 'NVIDIA'), ('1002', 'AMD')]
+    net_vendors = ['8086', '10ec', '14e4', '168c', '1af4']
+    profiles = []
+    for _ in range(count):
+        gpus = []
+        for _ in range(rng.randint(1, 2)):
+            vendor, manufacturer = rng.choice(gpu_vendors)
+            gpus.append({'vendor_id': vendor, 'device_id': f"{rng.randrange(0x10000):04x}", 'manufacturer': manufacturer})
+        network = [
+            {'vendor_id': rng.choice(net_vendors), 'device_id': f"{rng.randrange(0x10000):04x}",
+             'type': rng.choice(['WiFi', 'Ethernet'])}
+            for _ in range(rng.randint(1, 3))
+        ]
+        profiles.append({'platform': rng.choice(['Intel', 'AMD']), 'gpu': gpus, 'network': network})
+    return profiles
+
+def synthetic_rules(count, seed=1):
+    """Extra exact and range rules to show lookup cost doesn't grow with the rule table"""
+    rng = random.Random(seed)
+    rules = []
+    for i in range(count):
+        vendor = rng.choice(['8086', '10de', '1002', '10ec', '14e4'])
+        if i % 10 == 0:
+            lo = rng.randrange(0xff00)
+            devices = [f"{lo:04x}-{lo + rng.randrange(1, 0x100):04x}"]
+        else:
+            devices = [f"{rng.randrange(0x10000):04x}"]
+        rules.append({
+            'os': rng.choice(['macos', 'windows', 'linux']),
+            'class': rng.choice(['gpu', 'wifi', 'ethernet', 'network']),
+            'vendor': vendor,
+            'devices': devices,
+            'drivers': [f"Synthetic{i}"]
+        })
+    return rules
+
+def benchmark(count=5000):
+    """Map synthetic profiles against the shipped rules and a much larger table"""
+    with open(RULES_FILE, 'r') as f:
+        base_rules = json.load(f)['rules']
+
+    profiles = synthetic_profiles(count)
+    devices = sum(len(p['gpu']) + len(p['network']) for p in profiles)
+
+    print("=" * 60)
+    print(f"Driver Rule Engine Benchmark ({count} profiles, {devices} devices)")
+    print("=" * 60)
+
+    for label, rules in (("shipped rules", base_rules), ("+20000 synthetic", base_rules + synthetic_rules(20000))):
+        start = time.perf_counter()
+        engine = DriverRuleEngine(rules)
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for profile in profiles:
+            for os_name in ('macos', 'windows', 'linux'):
+                engine.map_profile(profile, os_name)
+        elapsed = time.perf_counter() - start
+
+        print(f"\n📏 {label}: {len(rules)} rules, compiled in {compile_ms:.1f} ms")
+        print(f"   {count / elapsed:,.0f} profiles/s, {elapsed / (devices * 3) * 1e6:.2f} µs per device lookup")
+
+    return True
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Driver Rule Engine")
+    parser.add_argument("--bench", type=int, default=5000, metavar="N", help="Map N synthetic profiles")
+    args = parser.parse_args()
+
+    sys.exit(0 if benchmark(args.bench) else 1)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Incremental EFI Writer
+Brings an OC folder up to date by hash - only changed config keys and kext bundles get written
+"""
+
+import json
+import os
+import plistlib
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from archive_index import content_hash, stat_signature
+
+# Kexts we put on the EFI and their hashes, so unchanged bundles aren't re-read
+STATE_NAME = ".multiboot_kexts.json"
+
+def atomic_write(path, data):
+    """Write bytes through a temp file in the same directory, then rename over the target"""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+def plist_diff(old, new, path=()):
+    """List of (key path, old value, new value) for every key that differs; lists compare whole"""
+    if not (isinstance(old, dict) and isinstance(new, dict)):
+        # bytes == bytearray is fine (plistlib loads <data> as bytes), but True is not 1
+        same = old == new and isinstance(old, bool) == isinstance(new, bool)
+        return [] if same else [(path, old, new)]
+
+    changes = []
+    for key in new:
+        if key not in old:
+            changes.append((path + (key,), None, new[key]))
+        else:
+            changes.extend(plist_diff(old[key], new[key], path + (key,)))
+    for key in old:
+        if key not in new:
+            changes.append((path + (key,), old[key], None))
+    return changes
+
+def apply_changes(config, changes):
+    """Apply plist_diff output to config in place (None as new value deletes the key)"""
+    for path, _, value in changes:
+        if not path:
+            return value
+        node = config
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        if value is None:
+            node.pop(path[-1], None)
+        else:
+            node[path[-1]] = value
+    return config
+
+def format_path(path):
+    return ':'.join(str(key) for key in path) or '<root>'
+
+class EFIWriter:
+    def __init__(self, oc_dir):
+        self.oc_dir = Path(oc_dir)
+        self.kexts_dir = self.oc_dir / "Kexts"
+        self.state_file = self.kexts_dir / STATE_NAME
+        self.bytes_written = 0
+
+    def read_config(self):
+        try:
+            with open(self.oc_dir / "config.plist", 'rb') as f:
+                return plistlib.load(f)
+        except Exception:
+            return None
+
+    def write_config(self, config):
+        """Update config.plist if anything changed, returns the list of changed keys"""
+        self.oc_dir.mkdir(parents=True, exist_ok=True)
+        current = self.read_config()
+
+        if current is None:
+            changes = [((), None, config)]
+            updated = config
+        else:
+            changes = plist_diff(current, config)
+            if not changes:
+                return []
+            # Patch what's there so key order of untouched sections is kept
+            updated = apply_changes(current, changes)
+
+        data = plistlib.dumps(updated)
+        atomic_write(self.oc_dir / "config.plist", data)
+        self.bytes_written += len(data)
+        return changes
+
+    def read_state(self):
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def installed_hash(self, name, state):
+        """Hash of the bundle on the EFI, trusting the recorded hash while its stat signature matches"""
+        dest = self.kexts_dir / name
+        if not dest.exists():
+            return None
+        sig = stat_signature(dest)
+        recorded = state.get(name)
+        if recorded and recorded.get('sig') == sig:
+            return recorded['hash']
+        return content_hash(dest)
+
+    def copy_bundle(self, source, name):
+        """Copy next to the target, then swap it in so a power cut never leaves half a kext"""
+        dest = self.kexts_dir / name
+        staging = self.kexts_dir / f".{name}.new"
+        old = self.kexts_dir / f".{name}.old"
+        for leftover in (staging, old):
+            if leftover.exists():
+                shutil.rmtree(leftover)
+
+        shutil.copytree(source, staging)
+        if dest.exists():
+            os.replace(dest, old)
+        os.replace(staging, dest)
+        if old.exists():
+            shutil.rmtree(old)
+
+        self.bytes_written += sum(f.stat().st_size for f in dest.rglob('*') if f.is_file())
+
+    def sync_kexts(self, kexts, hashes=None):
+        """
+        Make OC/Kexts match {name: source path}. hashes may carry known source hashes
+        (e.g. from the archive index). Returns {'copied': [...], 'unchanged': [...], 'removed': [...]}
+        """
+        hashes = hashes or {}
+        self.kexts_dir.mkdir(parents=True, exist_ok=True)
+        state = self.read_state()
+        result = {'copied': [], 'unchanged': [], 'removed': []}
+        new_state = {}
+
+        for name, source in sorted(kexts.items()):
+            wanted = hashes.get(name) or content_hash(source)
+            if self.installed_hash(name, state) == wanted:
+                result['unchanged'].append(name)
+            else:
+                self.copy_bundle(source, name)
+                result['copied'].append(name)
+            new_state[name] = {'hash': wanted, 'sig': stat_signature(self.kexts_dir / name)}
+
+        # Only remove bundles we installed ourselves, never ones added by hand
+        for name in state:
+            if name not in kexts and (self.kexts_dir / name).exists():
+                shutil.rmtree(self.kexts_dir / name)
+                result['removed'].append(name)
+
+        if new_state != state:
+            data = json.dumps(new_state, indent=2, sort_keys=True).encode()
+            atomic_write(self.state_file, data)
+        return result
+
+def main():
+    """Sync a config and a kext folder twice to show the second pass writes nothing"""
+    if len(sys.argv) < 3:
+        print("Usage: efi_writer.py <kexts dir> <OC dir>")
+        return False
+
+    source_dir = Path(sys.argv[1])
+    kexts = {p.name: p for p in source_dir.glob("*.kext")}
+    config = {'Kernel': {'Add': [{'BundlePath': name, 'Enabled': True} for name in sorted(kexts)]}}
+
+    for attempt in (1, 2):
+        writer = EFIWriter(sys.argv[2])
+        changes = writer.write_config(config)
+        result = writer.sync_kexts(kexts)
+        print(f"Pass {attempt}: {len(changes)} config changes, {len(result['copied'])} kexts copied, "
+              f"{len(result['unchanged'])} unchanged, {writer.bytes_written} bytes written")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+PARALLEL FETCH ENGINE
+Concurrent, resumable downloads with mirror racing and connection reuse
+"""
+
+import http.client
+import json
+import os
+import ssl
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 5
+
+class ConnectionPool:
+    """Keep-alive connections shared between workers, one idle list per host"""
+
+    def __init__(self, timeout=15):
+        self.timeout = timeout
+        self.idle = {}
+        self.lock = threading.Lock()
+        self.ssl_context = ssl.create_default_context()
+        self.created = 0
+        self.reused = 0
+
+    def checkout(self, scheme, netloc):
+        """Get an idle connection for host, or open a new one"""
+        key = (scheme, netloc)
+        with self.lock:
+            conns = self.idle.get(key)
+            if conns:
+                self.reused += 1
+                return conns.pop(), True
+            self.created += 1
+
+        if scheme == 'https':
+            conn = http.client.HTTPSConnection(netloc, timeout=self.timeout, context=self.ssl_context)
+        else:
+            conn = http.client.HTTPConnection(netloc, timeout=self.timeout)
+        return conn, False
+
+    def checkin(self, scheme, netloc, conn):
+        """Return a connection whose last response was fully read"""
+        with self.lock:
+            self.idle.setdefault((scheme, netloc), []).append(conn)
+
+    def close_all(self):
+        """Close every idle connection"""
+        with self.lock:
+            for conns in self.idle.values():
+                for conn in conns:
+                    conn.close()
+            self.idle.clear()
+
+class FetchEngine:
+    def __init__(self, max_workers=4, timeout=15, chunk_size=64 * 1024):
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.pool = ConnectionPool(timeout=timeout)
+        self.user_agent = 'UniversalMultiBoot/1.0'
+
+    def _request(self, url, headers):
+        """Send GET over a pooled connection, retrying once on a stale keep-alive"""
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        for _ in range(2):
+            conn, reused = self.pool.checkout(parts.scheme, parts.netloc)
+            try:
+                conn.request('GET', path, headers=headers)
+                return conn, conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if not reused:
+                    raise
+        raise ConnectionError(f"Connection to {parts.netloc} kept dropping")
+
+    def _release(self, url, conn, response):
+        """Recycle connection if the response body was consumed"""
+        parts = urlsplit(url)
+        if response.isclosed() and not response.will_close:
+            self.pool.checkin(parts.scheme, parts.netloc, conn)
+        else:
+            conn.close()
+
+    def open(self, url, offset=0, if_range=None):
+        """
+        Open url at byte offset, following redirects. Returns (url, conn, response)
+        With if_range (ETag or Last-Modified), the server sends the whole file if it changed
+        """
+        headers = {'User-Agent': self.user_agent, 'Accept-Encoding': 'identity'}
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+            if if_range:
+                headers['If-Range'] = if_range
+
+        for _ in range(MAX_REDIRECTS + 1):
+            conn, response = self._request(url, headers)
+            if response.status not in REDIRECT_CODES:
+                return url, conn, response
+
+            location = response.getheader('Location')
+            response.read()
+            self._release(url, conn, response)
+            if not location:
+                raise ConnectionError(f"Redirect without Location from {url}")
+            url = urljoin(url, location)
+
+        raise ConnectionError(f"Too many redirects for {url}")
+
+    def race_mirrors(self, urls, offset=0, if_range=None):
+        """
+        Open mirrors of one file at once; the first usable response wins, losers are dropped.
+        Only pass URLs serving the exact same file, never different versions or variants.
+        """
+        if len(urls) == 1:
+            return list(urls), self.open(urls[0], offset, if_range)
+
+        racers = ThreadPoolExecutor(max_workers=len(urls))
+        pending = {racers.submit(self.open, url, offset, if_range): url for url in urls}
+        winner = None
+        winner_url = None
+
+        while pending and winner is None:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = pending.pop(future)
+                try:
+                    opened = future.result()
+                except Exception:
+                    continue
+                if winner is None and opened[2].status in (200, 206, 416):
+                    winner, winner_url = opened, url
+                else:
+                    opened[1].close()
+
+        # Slower mirrors finish in the background and are closed unread
+        for future in pending:
+            future.add_done_callback(lambda f: f.exception() or f.result()[1].close())
+        racers.shutdown(wait=False)
+
+        order = [url for url in urls if url != winner_url]
+        if winner_url:
+            order.insert(0, winner_url)
+        return order, winner
+
+    @staticmethod
+    def content_range(response):
+        """(first byte, total length) from a Content-Range header, None if missing or unknown"""
+        value = response.getheader('Content-Range', '')
+        span, _, total = value.partition(' ')[2].partition('/')
+        if not total.isdigit():
+            return None
+        first = span.partition('-')[0]
+        return (int(first) if first.isdigit() else None), int(total)
+
+    def resume_point(self, part_file, state_file, mirrors):
+        """
+        Where to resume part_file from: (offset, validator, length)
+        Only a partial download of the same mirrors that recorded a validator is
+        resumed, anything else restarts from byte 0 (overwriting part_file).
+        """
+        if part_file.exists():
+            try:
+                state = json.loads(state_file.read_text())
+            except (OSError, ValueError):
+                state = {}
+            offset = part_file.stat().st_size
+            validator = state.get('etag') or state.get('last_modified')
+            length = state.get('length')
+            if state.get('mirrors') == list(mirrors) and validator and length and 0 < offset <= length:
+                return offset, validator, length
+        return 0, None, None
+
+    @staticmethod
+    def discard(part_file, state_file):
+        """Drop a partial download and its resume state"""
+        for path in (part_file, state_file):
+            if path.exists():
+                path.unlink()
+
+    def save_state(self, state_file, mirrors, response):
+        """Record what a fresh download is fetching, so a later resume can be validated"""
+        etag = response.getheader('ETag')
+        length = response.getheader('Content-Length')
+        state = {
+            'mirrors': list(mirrors),
+            # Weak ETags can't be used with If-Range
+            'etag': etag if etag and not etag.startswith('W/') else None,
+            'last_modified': response.getheader('Last-Modified'),
+            'length': int(length) if length and length.isdigit() else None
+        }
+        state_file.write_text(json.dumps(state))
+
+    def fetch(self, name, urls, dest_file):
+        """
+        Download one file, resuming from dest_file.part when it is safe to.
+        urls are tried in priority order. An entry may also be a list of mirrors
+        of that same file, which are raced against each other.
+        """
+        dest_file = Path(dest_file)
+        part_file = dest_file.with_name(dest_file.name + '.part')
+        state_file = dest_file.with_name(dest_file.name + '.part.json')
+        result = {
+            'name': name, 'path': dest_file, 'url': None, 'ok': False,
+            'bytes': 0, 'resumed_from': 0, 'seconds': 0.0, 'rate': 0.0, 'error': None
+        }
+        start = time.monotonic()
+        part_file.parent.mkdir(parents=True, exist_ok=True)
+
+        for source in urls:
+            mirrors = [source] if isinstance(source, str) else list(source)
+            offset, validator, length = self.resume_point(part_file, state_file, mirrors)
+            try:
+                order, opened = self.race_mirrors(mirrors, offset, validator)
+            except Exception as e:
+                order, opened = mirrors, None
+                result['error'] = str(e)
+
+            for url in order:
+                try:
+                    if opened is None:
+                        opened = self.open(url, offset, validator)
+                    final_url, conn, response = opened
+                    opened = None
+
+                    if offset:
+                        content_range = self.content_range(response)
+                        if response.status == 416 and content_range and content_range[1] == offset == length:
+                            # Interrupted after the last byte, before the rename
+                            response.read()
+                            self._release(final_url, conn, response)
+                            result['url'] = final_url
+                            break
+                        if response.status == 206 and content_range == (offset, length):
+                            result['resumed_from'] = offset
+                        else:
+                            # The file changed (If-Range sent it whole), or the server
+                            # ignored or refused the range: start over
+                            self.discard(part_file, state_file)
+                            offset, validator, length = 0, None, None
+                            if response.status != 200:
+                                conn.close()
+                                final_url, conn, response = self.open(url)
+
+                    if response.status != (206 if offset else 200):
+                        conn.close()
+                        raise ConnectionError(f"HTTP {response.status}")
+
+                    if not offset:
+                        self.save_state(state_file, mirrors, response)
+                    with open(part_file, 'ab' if offset else 'wb') as f:
+                        while True:
+                            chunk = response.read(self.chunk_size)
+                            if not chunk:
+                                break
+                            f.write(chunk)
+                            result['bytes'] += len(chunk)
+                    self._release(final_url, conn, response)
+                    result['url'] = final_url
+                    break
+                except Exception as e:
+                    result['error'] = str(e)
+                    print(f"   Failed {name} from {url}: {e}")
+                    offset, validator, length = self.resume_point(part_file, state_file, mirrors)
+
+            if result['url']:
+                break
+        else:
+            result['seconds'] = time.monotonic() - start
+            return result
+
+        os.replace(part_file, dest_file)
+        if state_file.exists():
+            state_file.unlink()
+        result['ok'] = True
+        result['error'] = None
+        result['seconds'] = time.monotonic() - start
+        if result['seconds'] > 0:
+            result['rate'] = result['bytes'] / result['seconds']
+        return result
+
+    def fetch_all(self, jobs):
+        """Download (name, urls, dest_file) jobs through the bounded worker pool"""
+        start = time.monotonic()
+        results = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as workers:
+            futures = [workers.submit(self.fetch, name, urls, dest) for name, urls, dest in jobs]
+            for future in futures:
+                results.append(future.result())
+
+        self.pool.close_all()
+
+        elapsed = time.monotonic() - start
+        total_bytes = sum(r['bytes'] for r in results)
+        summary = {
+            'files': len(results),
+            'ok': sum(1 for r in results if r['ok']),
+            'bytes': total_bytes,
+            'seconds': elapsed,
+            'rate': total_bytes / elapsed if elapsed > 0 else 0.0,
+            'connections_opened': self.pool.created,
+            'connections_reused': self.pool.reused
+        }
+        return results, summary
+
+def format_rate(rate):
+    """Human readable transfer rate"""
+    if rate >= 1024 * 1024:
+        return f"{rate / 1024 / 1024:.1f} MB/s"
+    return f"{rate / 1024:.1f} KB/s"
+
+def print_report(results, summary):
+    """Print per-file and aggregate throughput"""
+    print(f"\n📊 Download Report:")
+    for r in results:
+        status = '✅' if r['ok'] else '❌'
+        resumed = f" (resumed @ {r['resumed_from']} B)" if r['resumed_from'] else ''
+        print(f"   {status} {r['name']}: {r['bytes']} B in {r['seconds']:.2f}s "
+              f"@ {format_rate(r['rate'])}{resumed}")
+        if not r['ok'] and r['error']:
+            print(f"      {r['error']}")
+
+    print(f"\n   Total: {summary['ok']}/{summary['files']} files, {summary['bytes']} B "
+          f"in {summary['seconds']:.2f}s @ {format_rate(summary['rate'])}")
+    print(f"   Connections: {summary['connections_opened']} opened, "
+          f"{summary['connections_reused']} reused")
+
+def start_local_mirror(directory, delay=0.0):
+    """Serve directory over HTTP/1.1 with Range, ETag and If-Range support on a random local port"""
+    import hashlib
+    from functools import partial
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+    class RangeHandler(SimpleHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(delay)
+            path = Path(self.translate_path(self.path))
+            if not path.is_file():
+                self.send_error(404)
+                return
+
+            data = path.read_bytes()
+            etag = f'"{hashlib.sha256(data).hexdigest()[:16]}"'
+            start = 0
+            header = self.headers.get('Range', '')
+            if self.headers.get('If-Range', etag) != etag:
+                # Changed since the client's partial copy, send it whole
+                header = ''
+            if header.startswith('bytes='):
+                start = int(header[6:].split('-')[0])
+                if start >= len(data):
+                    self.send_response(416)
+                    self.send_header('Content-Range', f'bytes */{len(data)}')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(206)
+                self.send_header('Content-Range', f'bytes {start}-{len(data) - 1}/{len(data)}')
+            else:
+                self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', str(len(data) - start))
+            self.end_headers()
+            self.wfile.write(data[start:])
+
+    class QuietServer(ThreadingHTTPServer):
+        def handle_error(self, request, client_address):
+            # Race losers hang up mid-response on purpose
+            pass
+
+    server = QuietServer(('127.0.0.1', 0), partial(RangeHandler, directory=str(directory)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    """Self-test against local HTTP stand-ins (one fast, one slow, one dead mirror)"""
+    import hashlib
+    import tempfile
+
+    print("Testing Fetch Engine against local mirrors")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        serve_dir = Path(tmp) / "serve"
+        out_dir = Path(tmp) / "out"
+        serve_dir.mkdir()
+        out_dir.mkdir()
+
+        expected = {}
+        for i in range(12):
+            name = f"Kext{i}.zip"
+            data = os.urandom(256 * 1024 + i)
+            (serve_dir / name).write_bytes(data)
+            expected[name] = hashlib.sha256(data).hexdigest()
+
+        fast = start_local_mirror(serve_dir)
+        slow = start_local_mirror(serve_dir, delay=0.2)
+        dead = 'http://127.0.0.1:9/'
+
+        def mirrors(name):
+            return [dead + name, f"http://127.0.0.1:{slow.server_port}/{name}", f"http://127.0.0.1:{fast.server_port}/{name}"]
+
+        def interrupted(name, etag):
+            """Pretend an earlier boot was interrupted halfway through a file"""
+            (out_dir / f"{name}.part").write_bytes((serve_dir / name).read_bytes()[:100000])
+            state = {'mirrors': mirrors(name), 'etag': etag, 'last_modified': None, 'length': (serve_dir / name).stat().st_size}
+            (out_dir / f"{name}.part.json").write_text(json.dumps(state))
+
+        # Same file: resumed. Changed file: If-Range sends it whole. No state: restarted
+        interrupted("Kext0.zip", f'"{expected["Kext0.zip"][:16]}"')
+        interrupted("Kext1.zip", '"stale"')
+        (out_dir / "Kext2.zip.part").write_bytes(os.urandom(100000))
+
+        # Sources are tried in priority order, mirrors of one source are raced
+        jobs = [(name, [mirrors(name)], out_dir / name) for name in expected]
+        jobs[3] = ("Kext3.zip", [f"http://127.0.0.1:{fast.server_port}/Missing.zip", mirrors("Kext3.zip")], out_dir / "Kext3.zip")
+
+        engine = FetchEngine(max_workers=4)
+        results, summary = engine.fetch_all(jobs)
+        print_report(results, summary)
+
+        fast.shutdown()
+        slow.shutdown()
+
+        bad = [n for n, h in expected.items()
+               if not (out_dir / n).exists() or hashlib.sha256((out_dir / n).read_bytes()).hexdigest() != h]
+        if bad:
+            print(f"\n❌ Checksum mismatch: {', '.join(bad)}")
+            return False
+
+        resumed = [r['name'] for r in results if r['resumed_from']]
+        if resumed != ["Kext0.zip"]:
+            print(f"\n❌ Expected only Kext0.zip to resume, got: {', '.join(resumed) or 'none'}")
+            return False
+
+    print(f"\n✅ All {len(expected)} files verified")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Kext Metadata Cache
+Everything config generation needs from a kext's Info.plist, parsed once and kept next to the archive index
+"""
+
+import hashlib
+import json
+import os
+import plistlib
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+METADATA_NAME = "kext_metadata.json"
+METADATA_VERSION = 2
+
+_loaded = {}
+_load_lock = threading.Lock()
+
+def kernel_requirement(libraries):
+    """
+    Darwin version suggested by the KPI versions a kext links against
+    ('com.apple.kpi.bsd': '10.0.0' -> '10.0.0'), '' if it doesn't say.
+    KPI versions aren't real kernel bounds, so this is only a hint: never prune on it
+    """
+    majors = []
+    for bundle_id, version in libraries.items():
+        if bundle_id.startswith('com.apple.kpi.'):
+            match = re.match(r'(\d+)', str(version))
+            if match:
+                majors.append(int(match.group(1)))
+    return f"{max(majors)}.0.0" if majors else ''
+
+def parse_info_plist(data):
+    """The fields we use from a kext Info.plist"""
+    plist = plistlib.loads(data)
+    executable = plist.get('CFBundleExecutable', '')
+    # Arch-specific libraries win, it's what the x86_64 kernel links against
+    libraries = plist.get('OSBundleLibraries_x86_64') or plist.get('OSBundleLibraries') or {}
+    return {
+        'bundle_id': plist.get('CFBundleIdentifier', ''),
+        'executable': f'Contents/MacOS/{executable}' if executable else '',
+        'version': plist.get('CFBundleShortVersionString') or plist.get('CFBundleVersion') or '',
+        'libraries': {k: str(v) for k, v in libraries.items()},
+        # Only explicit bounds, the same keys OpenCore uses in Kernel -> Add
+        'min_kernel': plist.get('MinKernel', ''),
+        'max_kernel': plist.get('MaxKernel', ''),
+        'kpi_kernel': kernel_requirement(libraries)
+    }
+
+class KextMetadataCache:
+    def __init__(self, archive_dir):
+        self.archive_dir = Path(archive_dir)
+        self.cache_file = self.archive_dir / METADATA_NAME
+        self.entries = {}
+        self.dirty = False
+        self.stats = {'hits': 0, 'rehashed': 0, 'parsed': 0}
+
+    @classmethod
+    def load(cls, archive_dir):
+        """Load the cache once per process"""
+        archive_dir = Path(archive_dir).resolve()
+        with _load_lock:
+            if archive_dir not in _loaded:
+                cache = cls(archive_dir)
+                cache.read()
+                _loaded[archive_dir] = cache
+            return _loaded[archive_dir]
+
+    def read(self):
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get('version') != METADATA_VERSION:
+            return False
+        self.entries = data.get('entries', {})
+        return True
+
+    def save(self):
+        """Atomically write the cache next to the archive index"""
+        if not self.dirty:
+            return
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        data = {'version': METADATA_VERSION, 'entries': self.entries}
+        fd, tmp = tempfile.mkstemp(dir=self.archive_dir, prefix=".kext-metadata-")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, separators=(',', ':'), sort_keys=True)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, self.cache_file)
+        self.dirty = False
+
+    def key(self, kext_path):
+        """Archive-relative path for archived kexts, absolute for anything else"""
+        kext_path = Path(kext_path).resolve()
+        try:
+            return kext_path.relative_to(self.archive_dir.resolve()).as_posix()
+        except ValueError:
+            return str(kext_path)
+
+    def lookup(self, kext_path):
+        """
+        Metadata for one kext, None if it has no readable Info.plist.
+        Unchanged (size, mtime) costs one stat; a touched but identical plist costs a hash, not a parse.
+        """
+        info_plist = Path(kext_path) / "Contents" / "Info.plist"
+        try:
+            st = info_plist.stat()
+        except OSError:
+            return None
+
+        key = self.key(kext_path)
+        sig = [st.st_size, st.st_mtime_ns]
+        entry = self.entries.get(key)
+        if entry and entry['sig'] == sig:
+            self.stats['hits'] += 1
+            return entry['meta']
+
+        with open(info_plist, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+
+        if entry and entry['hash'] == digest:
+            self.stats['rehashed'] += 1
+            meta = entry['meta']
+        else:
+            try:
+                meta = parse_info_plist(data)
+            except Exception:
+                return None
+            self.stats['parsed'] += 1
+
+        self.entries[key] = {'sig': sig, 'hash': digest, 'meta': meta}
+        self.dirty = True
+        return meta
+
+    def get(self, kext_path):
+        """Metadata for one kext, persisting the cache if it had to be updated"""
+        meta = self.lookup(kext_path)
+        self.save()
+        return meta
+
+    def get_many(self, kext_paths):
+        """{path: metadata} for a batch of kexts with a single cache write at the end"""
+        result = {}
+        for kext_path in kext_paths:
+            result[kext_path] = self.lookup(kext_path)
+        self.save()
+        return result
+
+def make_kexts(dest, count):
+    """Synthetic kext bundles with realistic Info.plists for benchmarking"""
+    for i in range(count):
+        contents = Path(dest) / f"Bench{i}.kext" / "Contents"
+        (contents / "MacOS").mkdir(parents=True)
+        (contents / "MacOS" / f"Bench{i}").write_bytes(b'\0' * 64)
+        plist = {
+            'CFBundleExecutable': f'Bench{i}',
+            'CFBundleIdentifier': f'org.multiboot.bench{i}',
+            'CFBundleShortVersionString': f'1.{i}.0',
+            'OSBundleLibraries': {'as.vit9696.Lilu': '1.2.0', 'com.apple.kpi.bsd': '12.0.0',
+                                  'com.apple.kpi.iokit': '12.0.0', 'com.apple.kpi.libkern': '12.0.0'},
+            'IOKitPersonalities': {f'Personality{j}': {'IOClass': f'Bench{i}', 'IOProbeScore': j} for j in range(40)}
+        }
+        with open(contents / "Info.plist", 'wb') as f:
+            plistlib.dump(plist, f)
+    return sorted(Path(dest).glob("*.kext"))
+
+def benchmark(count=50):
+    """Cold vs warm metadata reads for a config with count kexts"""
+    work = Path(tempfile.mkdtemp(prefix="kext-metadata-"))
+    try:
+        kexts = make_kexts(work / "Kexts", count)
+
+        print("=" * 60)
+        print(f"Kext Metadata Cache Benchmark ({count} kexts)")
+        print("=" * 60)
+
+        start = time.perf_counter()
+        for kext in kexts:
+            with open(kext / "Contents" / "Info.plist", 'rb') as f:
+                plistlib.load(f)
+        print(f"\n📄 plistlib every time: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+        for label in ("cold", "warm"):
+            _loaded.clear()
+            cache = KextMetadataCache.load(work)
+            start = time.perf_counter()
+            cache.get_many(kexts)
+            elapsed = time.perf_counter() - start
+            print(f"🗂️  cache {label}: {elapsed * 1000:.2f} ms ({cache.stats['parsed']} parsed, {cache.stats['hits']} hits)")
+
+        return cache.stats['parsed'] == 0
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+def main():
+    """Show cached metadata for the archive's kexts"""
+    archive_dir = Path(__file__).parent.parent / "DriverArchive"
+    cache = KextMetadataCache.load(archive_dir)
+    kexts = sorted(p for p in archive_dir.rglob("*.kext")
+                   if not any(part.endswith('.kext') for part in p.relative_to(archive_dir).parts[:-1]))
+    metadata = cache.get_many(kexts)
+
+    print("=" * 60)
+    print("Kext Metadata")
+    print("=" * 60)
+    for kext, meta in metadata.items():
+        if meta:
+            print(f"   {kext.name:<32} {meta['version']:<10} {meta['bundle_id']} (min kernel {meta['min_kernel'] or '-'})")
+    print(f"\n   {cache.stats['parsed']} parsed, {cache.stats['rehashed']} re-hashed, {cache.stats['hits']} cached")
+    return True
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Kext Metadata Cache")
+    parser.add_argument("--bench", type=int, nargs='?', const=50, metavar="N", help="Benchmark with N synthetic kexts")
+    args = parser.parse_args()
+
+    if args.bench:
+        sys.exit(0 if benchmark(args.bench) else 1)
+    sys.exit(0 if main() else 1)
@@ -4,10 +4,31 @@ OpenCore Configuration Generator & Kext Injector
 Generates OpenCore config.plist dynamically based on detected hardware
 """
 
+import importlib.util
 import json
-import plistlib
 from pathlib import Path
-import shutil
+
+from archive_index import ArchiveIndex, stat_signature
+from efi_writer import EFIWriter, format_path
+from kext_metadata import KextMetadataCache
+from profile_cache import ProfileCache
+
+# OCLP's dependency resolver only needs the standard library, share it instead of keeping a copy
+KEXT_GRAPH_PATH = Path(__file__).parent.parent / "OpenCore-Legacy-Patcher-main" / "opencore_legacy_patcher" / "support" / "kext_graph.py"
+
+_kext_graph = None
+
+def load_kext_graph():
+    """Import OCLP's support/kext_graph.py by path. None if not shipped"""
+    global _kext_graph
+    if _kext_graph is None:
+        _kext_graph = False
+        if KEXT_GRAPH_PATH.exists():
+            spec = importlib.util.spec_from_file_location("kext_graph", KEXT_GRAPH_PATH)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _kext_graph = module
+    return _kext_graph or None
 
 class OpenCoreInjector:
     def __init__(self):
@@ -32,6 +53,15 @@ class OpenCoreInjector:
                 return json.load(f)
         return {}
     
+    def computer_type(self):
+        """OpenCore computer type for the detected platform"""
+        computer_type = self.hardware_profile.get('platform', 'INTEL_PC')
+        if computer_type == 'Intel':
+            return 'INTEL_PC'
+        if computer_type == 'AMD':
+            return 'AMD_PC'
+        return computer_type
+    
     def get_required_kexts(self, computer_type):
         """Get kexts needed based on computer type"""
         kexts = self.manifest.get('macos', {}).get('kexts', [])
@@ -47,23 +77,13 @@ class OpenCoreInjector:
     def find_kexts_in_archive(self, required_kexts):
         """Find kext files in archive"""
         found = {}
+        index = ArchiveIndex.load(self.archive_dir)
         
-        # Search in both Universal and PC_Specific
-        search_dirs = [
-            self.archive_dir / "macOS" / "Universal",
-            self.archive_dir / "macOS" / "PC_Specific"
-        ]
-        
+        # Search in both Universal and PC_Specific (could be nested in Release folder, etc)
         for kext_name in required_kexts:
-            for search_dir in search_dirs:
-                if not search_dir.exists():
-                    continue
-                
-                # Find kext (could be nested in Release folder, etc)
-                matches = list(search_dir.rglob(kext_name))
-                if matches:
-                    found[kext_name] = matches[0]
-                    break
+            match = index.find('macos', kext_name, sections=['Universal', 'PC_Specific'])
+            if match:
+                found[kext_name] = match
         
         return found
     
@@ -332,15 +352,48 @@ class OpenCoreInjector:
         
         return config
     
-    def add_kexts_to_config(self, config, kext_files):
-        """Add kext entries to config"""
+    def order_kexts(self, kext_files, metadata, target_kernel=None):
+        """Dependency order (Lilu before its plugins), dropping kexts that can't load on target_kernel"""
+        kext_graph = load_kext_graph()
+        if kext_graph is None:
+            print("   ⚠️  Kext dependency resolver not available, keeping manifest order")
+            return list(kext_files)
+        
+        graph = kext_graph.KextGraph()
         for kext_name, kext_path in kext_files.items():
+            meta = metadata.get(kext_path)
+            if meta:
+                graph.add(kext_name, meta['bundle_id'], meta['libraries'], meta['min_kernel'], meta['max_kernel'])
+        
+        result = graph.resolve(list(kext_files), kernel=target_kernel)
+        for kext_name, reason in result['pruned'].items():
+            print(f"   ⏭️  Skipping {kext_name}: {reason}")
+        if target_kernel:
+            # KPI versions only hint at what a kext was built against, worth a look but not a reason to drop it
+            for kext_name, kext_path in kext_files.items():
+                hint = (metadata.get(kext_path) or {}).get('kpi_kernel')
+                if kext_name not in result['pruned'] and hint and not kext_graph.kernel_in_range(target_kernel, hint):
+                    print(f"   ⚠️  {kext_name} links against Darwin {hint} KPIs, check it supports {target_kernel}")
+        for kext_name, bundle_ids in result['missing'].items():
+            print(f"   ⚠️  {kext_name} needs {', '.join(bundle_ids)} (not in archive)")
+        for cycle in result['cycles']:
+            print(f"   ⚠️  Dependency cycle, keeping manifest order: {' → '.join(cycle)}")
+        
+        return result['order']
+    
+    def add_kexts_to_config(self, config, kext_files, target_kernel=None):
+        """Add kext entries to config"""
+        metadata = KextMetadataCache.load(self.archive_dir).get_many(kext_files.values())
+        
+        for kext_name in self.order_kexts(kext_files, metadata, target_kernel):
+            kext_path = kext_files[kext_name]
+            meta = metadata.get(kext_path) or {}
             kext_entry = {
                 'Arch': 'x86_64',
                 'BundlePath': kext_name,
                 'Comment': f'Auto-injected: {kext_name}',
                 'Enabled': True,
-                'ExecutablePath': self.get_kext_executable(kext_path),
+                'ExecutablePath': meta.get('executable', ''),
                 'MaxKernel': '',
                 'MinKernel': '',
                 'PlistPath': 'Contents/Info.plist'
@@ -351,19 +404,23 @@ class OpenCoreInjector:
     
     def get_kext_executable(self, kext_path):
         """Get executable path from kext Info.plist"""
-        info_plist = kext_path / "Contents" / "Info.plist"
-        if info_plist.exists():
+        meta = KextMetadataCache.load(self.archive_dir).get(kext_path)
+        return meta['executable'] if meta else ''
+    
+    def archive_hashes(self, kext_files):
+        """Content hashes the archive index already knows, so sources needn't be re-hashed"""
+        index = ArchiveIndex.load(self.archive_dir)
+        hashes = {}
+        for kext_name, kext_path in kext_files.items():
             try:
-                with open(info_plist, 'rb') as f:
-                    plist = plistlib.load(f)
-                    executable = plist.get('CFBundleExecutable', '')
-                    if executable:
-                        return f'Contents/MacOS/{executable}'
-            except:
-                pass
-        return ''
+                entry = index.entries.get(Path(kext_path).relative_to(index.archive_dir).as_posix())
+            except ValueError:
+                entry = None
+            if entry and entry.get('sig') == stat_signature(kext_path):
+                hashes[kext_name] = entry['hash']
+        return hashes
     
-    def generate_opencore_config(self, computer_type):
+    def generate_opencore_config(self, computer_type, output_dir=None, target_kernel=None):
         """Main function to generate complete OpenCore config"""
         print("=" * 60)
         print("🍎 OpenCore Configuration Generator")
@@ -371,46 +428,65 @@ class OpenCoreInjector:
         
         print(f"\n💻 Computer Type: {computer_type}")
         
-        # Get required kexts
-        required = self.get_required_kexts(computer_type)
-        print(f"\n📋 Required Kexts: {len(required)}")
-        
-        # Find kexts in archive
-        found = self.find_kexts_in_archive(required)
-        print(f"✅ Found in Archive: {len(found)}/{len(required)}")
-        
-        missing = set(required) - set(found.keys())
-        if missing:
-            print(f"⚠️  Missing: {', '.join(missing)}")
-        
-        # Generate base config
-        print(f"\n🔧 Generating config.plist...")
-        config = self.generate_base_config(computer_type)
-        
-        # Add kexts
-        config = self.add_kexts_to_config(config, found)
+        # Known machine, same mapping tables and archive: reuse the last config and kext set
+        fingerprint = self.hardware_profile.get('fingerprint')
+        target = {'computer_type': computer_type, 'target_kernel': target_kernel}
+        cache = ProfileCache(self.base_dir)
+        cached = cache.cached_efi(cache.lookup(fingerprint), target)
         
-        # Save config
-        output_dir = self.base_dir / "GeneratedEFI" / "EFI" / "OC"
-        output_dir.mkdir(parents=True, exist_ok=True)
+        if cached:
+            config, found = cached
+            print(f"\n⚡ Using cached config.plist and {len(found)} kexts for {fingerprint}")
+        else:
+            # Get required kexts
+            required = self.get_required_kexts(computer_type)
+            print(f"\n📋 Required Kexts: {len(required)}")
+            
+            # Find kexts in archive
+            found = self.find_kexts_in_archive(required)
+            print(f"✅ Found in Archive: {len(found)}/{len(required)}")
+            
+            missing = set(required) - set(found.keys())
+            if missing:
+                print(f"⚠️  Missing: {', '.join(missing)}")
+            
+            # Generate base config
+            print(f"\n🔧 Generating config.plist...")
+            config = self.generate_base_config(computer_type)
+            
+            # Add kexts
+            config = self.add_kexts_to_config(config, found, target_kernel)
+            
+            # Only what made it into the config (pruned kexts stay off the EFI)
+            found = {k['BundlePath']: found[k['BundlePath']] for k in config['Kernel']['Add'] if k['BundlePath'] in found}
         
-        config_file = output_dir / "config.plist"
-        with open(config_file, 'wb') as f:
-            plistlib.dump(config, f)
+        # Save config - only keys that differ from what's on the EFI, atomically
+        if output_dir is None:
+            output_dir = self.base_dir / "GeneratedEFI" / "EFI" / "OC"
+        writer = EFIWriter(output_dir)
         
-        print(f"✅ Config saved: {config_file}")
+        config_file = writer.oc_dir / "config.plist"
+        changes = writer.write_config(config)
+        if changes:
+            print(f"✅ Config saved: {config_file} ({len(changes)} changed keys)")
+            for path, _, _ in changes[:10]:
+                print(f"   ~ {format_path(path)}")
+        else:
+            print(f"✅ Config unchanged: {config_file}")
         
-        # Copy kexts to OC folder
-        kexts_dir = output_dir / "Kexts"
-        kexts_dir.mkdir(exist_ok=True)
+        # Bring OC/Kexts up to date, copying only bundles whose hash changed
+        kexts_dir = writer.kexts_dir
         
-        print(f"\n📦 Copying kexts to EFI...")
-        for kext_name, kext_path in found.items():
-            dest = kexts_dir / kext_name
-            if dest.exists():
-                shutil.rmtree(dest)
-            shutil.copytree(kext_path, dest)
+        print(f"\n📦 Syncing kexts to EFI...")
+        result = writer.sync_kexts(found, self.archive_hashes(found))
+        for kext_name in result['copied']:
             print(f"   ✅ {kext_name}")
+        for kext_name in result['removed']:
+            print(f"   🗑️  {kext_name}")
+        print(f"   {len(result['unchanged'])} unchanged, {writer.bytes_written} bytes written")
+        
+        if fingerprint and not cached:
+            cache.store_efi(fingerprint, config_file, found, target)
         
         print(f"\n🎉 OpenCore config generated successfully!")
         print(f"   Config: {config_file}")
@@ -420,17 +496,16 @@ class OpenCoreInjector:
 
 def main():
     """Test the injector"""
-    injector = OpenCoreInjector()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="OpenCore config generator")
+    parser.add_argument("--kernel", metavar="DARWIN", help="Target Darwin version (e.g. 23.0.0) to prune kexts for")
+    args = parser.parse_args()
     
-    # Detect computer type (would come from wrapper)
-    computer_type = injector.hardware_profile.get('platform', 'INTEL_PC')
-    if computer_type == 'Intel':
-        computer_type = 'INTEL_PC'
-    elif computer_type == 'AMD':
-        computer_type = 'AMD_PC'
+    injector = OpenCoreInjector()
     
     # Generate config
-    injector.generate_opencore_config(computer_type)
+    injector.generate_opencore_config(injector.computer_type(), target_kernel=args.kernel)
 
 if __name__ == "__main__":
     main()
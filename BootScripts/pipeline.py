@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+In-Process Pipeline Runner
+Runs dependent setup stages in one interpreter, independent ones concurrently
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+class StageFailed(Exception):
+    def __init__(self, stage, error):
+        super().__init__(f"{stage}: {error}")
+        self.stage = stage
+        self.error = error
+
+def run_stages(stages, max_workers=4):
+    """
+    Run (name, func, deps) stages. A stage starts as soon as all of its deps
+    have finished and is called with their results as keyword arguments.
+    Returns (results, timings) where timings maps name -> (start, seconds).
+    """
+    results = {}
+    timings = {}
+    pending = list(stages)
+    running = {}
+    origin = time.perf_counter()
+
+    def timed(name, func, kwargs):
+        start = time.perf_counter()
+        try:
+            return func(**kwargs)
+        finally:
+            timings[name] = (start - origin, time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            for stage in [s for s in pending if all(d in results for d in s[2])]:
+                name, func, deps = stage
+                pending.remove(stage)
+                kwargs = {d: results[d] for d in deps}
+                running[pool.submit(timed, name, func, kwargs)] = name
+
+            if not running:
+                missing = {d for _, _, deps in pending for d in deps} - results.keys()
+                raise StageFailed(pending[0][0], f"unresolved dependencies: {', '.join(sorted(missing))}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    for other in running:
+                        other.cancel()
+                    raise StageFailed(name, e) from e
+
+    timings['total'] = (0.0, time.perf_counter() - origin)
+    return results, timings
+
+def print_timing_report(timings):
+    """Per-stage timing, with a bar showing where each stage ran on the timeline"""
+    total = timings.get('total', (0.0, 0.0))[1] or 1e-9
+    width = 30
+
+    print(f"\n⏱️  Stage Timing:")
+    for name, (start, seconds) in sorted(timings.items(), key=lambda t: (t[0] == 'total', t[1][0])):
+        if name == 'total':
+            continue
+        offset = int(start / total * width)
+        length = max(1, int(seconds / total * width))
+        bar = ' ' * offset + '█' * min(length, width - offset)
+        print(f"   {name:<16} {seconds * 1000:8.1f} ms |{bar:<{width}}|")
+
+    busy = sum(s for n, (_, s) in timings.items() if n != 'total')
+    print(f"   {'total':<16} {total * 1000:8.1f} ms (stages summed: {busy * 1000:.1f} ms)")
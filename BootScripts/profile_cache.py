@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Hardware Profile Cache
+Per-machine cache of profile, manifest, config.plist and kext set, keyed by fingerprint
+"""
+
+import json
+import os
+import plistlib
+import re
+import shutil
+import sys
+import time
+from pathlib import Path
+
+from archive_index import ArchiveIndex
+from driver_mapper import mapping_hash
+
+CACHE_VERSION = 1
+
+class ProfileCache:
+    def __init__(self, base_dir=None):
+        self.base_dir = Path(base_dir) if base_dir else Path(__file__).parent.parent
+        self.profiles_dir = self.base_dir / "HardwareProfiles"
+        self.archive_dir = self.base_dir / "DriverArchive"
+        self._keys = None
+
+    def cache_dir(self, fingerprint):
+        # Fingerprints are already [a-z0-9_], but never trust a path component
+        safe = re.sub(r'[^A-Za-z0-9_.-]', '_', fingerprint)
+        return self.profiles_dir / safe
+
+    def current_keys(self):
+        """Hashes the cached data depends on: mapping tables and archive contents"""
+        if self._keys is None:
+            self._keys = {
+                'version': CACHE_VERSION,
+                'mapping_hash': mapping_hash(),
+                'archive_hash': ArchiveIndex.load(self.archive_dir).digest()
+            }
+        return self._keys
+
+    def _write_json(self, path, data):
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+
+    def _read_json(self, path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def lookup(self, fingerprint):
+        """Return the cache entry for fingerprint, or None if missing or stale"""
+        if not fingerprint:
+            return None
+
+        cache_dir = self.cache_dir(fingerprint)
+        meta = self._read_json(cache_dir / "cache.json")
+        if not meta:
+            return None
+
+        keys = self.current_keys()
+        if any(meta.get(k) != v for k, v in keys.items()):
+            return None
+
+        profile = self._read_json(cache_dir / "profile.json")
+        manifest = self._read_json(cache_dir / "manifest.json")
+        if profile is None or manifest is None:
+            return None
+
+        config_file = cache_dir / "config.plist"
+        efi = self._read_json(cache_dir / "kexts.json") or {}
+        return {
+            'fingerprint': fingerprint,
+            'dir': cache_dir,
+            'profile': profile,
+            'manifest': manifest,
+            'kexts': efi.get('kexts', {}),
+            'efi_target': efi.get('target'),
+            'config': config_file if config_file.exists() else None,
+            'created': meta.get('created')
+        }
+
+    def store(self, profile, manifest):
+        """Cache profile and manifest under the profile's fingerprint"""
+        fingerprint = profile.get('fingerprint')
+        if not fingerprint:
+            return None
+
+        cache_dir = self.cache_dir(fingerprint)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # A new profile/manifest invalidates any EFI generated from the old one
+        for stale in ("config.plist", "kexts.json"):
+            (cache_dir / stale).unlink(missing_ok=True)
+
+        self._write_json(cache_dir / "profile.json", profile)
+        self._write_json(cache_dir / "manifest.json", manifest)
+        self._write_json(cache_dir / "cache.json", dict(self.current_keys(), created=time.time()))
+        return cache_dir
+
+    def store_efi(self, fingerprint, config_file, kexts, target=None):
+        """
+        Attach the generated config.plist and resolved kext set to a cached profile.
+        target records what they were generated for (computer type, kernel), see cached_efi()
+        """
+        cache_dir = self.cache_dir(fingerprint)
+        if not (cache_dir / "cache.json").exists():
+            return False
+
+        if config_file and Path(config_file).exists():
+            shutil.copyfile(config_file, cache_dir / "config.plist")
+        resolved = {name: str(Path(path).relative_to(self.base_dir)) for name, path in kexts.items()}
+        self._write_json(cache_dir / "kexts.json", {'target': target, 'kexts': resolved})
+        return True
+
+    def cached_efi(self, entry, target=None):
+        """
+        (config dict, {kext name: path}) from a cache entry, or None if it has no
+        EFI for target or a cached kext is no longer in the archive
+        """
+        if not entry or not entry['config'] or entry['efi_target'] != target:
+            return None
+
+        kexts = {name: self.base_dir / rel for name, rel in entry['kexts'].items()}
+        if not all(path.exists() for path in kexts.values()):
+            return None
+
+        try:
+            with open(entry['config'], 'rb') as f:
+                config = plistlib.load(f)
+        except Exception:
+            return None
+        return config, kexts
+
+    def activate(self, entry):
+        """Make a cached profile the current one for scripts that read current*.json"""
+        self._write_json(self.profiles_dir / "current.json", entry['profile'])
+        self._write_json(self.profiles_dir / "current_manifest.json", entry['manifest'])
+
+    def invalidate(self, fingerprint):
+        cache_dir = self.cache_dir(fingerprint)
+        if cache_dir.exists():
+            shutil.rmtree(cache_dir)
+
+def main():
+    """Show the cache state for this machine"""
+    from detect_hardware import quick_fingerprint
+
+    fingerprint = quick_fingerprint()
+    cache = ProfileCache()
+
+    print("=" * 60)
+    print("Hardware Profile Cache")
+    print("=" * 60)
+    print(f"\n🔖 Fingerprint: {fingerprint}")
+
+    entry = cache.lookup(fingerprint)
+    if entry:
+        print(f"✅ Cached profile: {entry['dir']}")
+        print(f"   Kexts: {len(entry['manifest'].get('macos', {}).get('kexts', []))}")
+        print(f"   config.plist: {'yes' if entry['config'] else 'no'}")
+    else:
+        print("⚠️  No valid cache entry (new machine, or mapping/archive changed)")
+
+    return entry is not None
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
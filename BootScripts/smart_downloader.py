@@ -8,12 +8,18 @@ import urllib.request
 import json
 from pathlib import Path
 import subprocess
-import time
+import tempfile
+import zipfile
+
+from archive_index import ArchiveIndex
+from fetch_engine import FetchEngine, print_report
 
 class SmartDownloader:
-    def __init__(self):
+    def __init__(self, max_workers=6):
         self.base_dir = Path(__file__).parent.parent
         self.archive_dir = self.base_dir / "DriverArchive"
+        self.download_dir = Path("/tmp")
+        self.max_workers = max_workers
         
         # Comprehensive URL database with multiple fallbacks
         self.driver_sources = {
@@ -101,18 +107,11 @@ class SmartDownloader:
         return False
     
     def download_with_fallback(self, name, urls, dest_file):
-        """Try downloading from multiple URLs"""
-        for i, url in enumerate(urls):
-            try:
-                print(f"   Attempt {i+1}/{len(urls)}: {url}")
-                urllib.request.urlretrieve(url, dest_file)
-                return True
-            except Exception as e:
-                print(f"   Failed: {e}")
-                if i < len(urls) - 1:
-                    print(f"   Trying fallback...")
-                    time.sleep(1)
-        return False
+        """Try each source URL in priority order (resumable)"""
+        engine = FetchEngine(max_workers=1)
+        results, summary = engine.fetch_all([(name, urls, dest_file)])
+        print_report(results, summary)
+        return results[0]['ok']
     
     def get_github_latest_release_url(self, repo_url):
         """Get latest release download URL from GitHub"""
@@ -136,16 +135,9 @@ class SmartDownloader:
             pass
         return None
     
-    def smart_download(self, driver_name, os_type, dest_dir):
-        """Smart download with auto-fallback and latest version detection"""
-        print(f"\n📥 Downloading {driver_name} for {os_type}...")
-        
-        # Get URL list
-        urls = self.driver_sources.get(os_type, {}).get(driver_name, [])
-        
-        if not urls:
-            print(f"   ❌ No download sources configured")
-            return False
+    def resolve_urls(self, driver_name, os_type):
+        """Get URL list for driver, with the latest GitHub release first if available"""
+        urls = list(self.driver_sources.get(os_type, {}).get(driver_name, []))
         
         # Try to get latest version if GitHub repo
         for url in urls:
@@ -153,68 +145,100 @@ class SmartDownloader:
                 latest_url = self.get_github_latest_release_url(url)
                 if latest_url:
                     urls.insert(0, latest_url)
-                    print(f"   Found latest release!")
+                    print(f"   Found latest release for {driver_name}!")
                     break
         
-        # Download
-        dest_file = Path(f"/tmp/{driver_name}.zip")
+        return urls
+    
+    def extract_download(self, driver_name, os_type, dest_file, dest_dir):
+        """Extract downloaded zip into the archive, storing each payload once by hash"""
+        if os_type == 'macos':
+            os_dir, section = "macOS", "PC_Specific"
+        elif os_type == 'windows':
+            os_dir, section = "Windows", "PC_Drivers"
+        elif os_type == 'asahi':
+            os_dir, section = "Linux", "Asahi"
+        
+        extract_dir = dest_dir / os_dir / section
+        extract_dir.mkdir(parents=True, exist_ok=True)
+        index = ArchiveIndex.load(dest_dir)
+        
+        try:
+            with tempfile.TemporaryDirectory(dir=dest_dir) as staging:
+                with zipfile.ZipFile(dest_file, 'r') as zf:
+                    zf.extractall(staging)
+                
+                stored = 0
+                for item in sorted(Path(staging).iterdir()):
+                    path, new = index.add(item, os_dir, section)
+                    if new:
+                        stored += 1
+                    else:
+                        print(f"   ♻️  {item.name} already archived as {path.relative_to(dest_dir)}")
+            
+            print(f"   ✅ {driver_name} extracted to {extract_dir} ({stored} new items)")
+            dest_file.unlink()
+            return True
+        except Exception as e:
+            print(f"   ⚠️  {driver_name} extract failed: {e}")
+            return False
+    
+    def smart_download(self, driver_name, os_type, dest_dir):
+        """Smart download with auto-fallback and latest version detection"""
+        print(f"\n📥 Downloading {driver_name} for {os_type}...")
+        
+        urls = self.resolve_urls(driver_name, os_type)
+        
+        if not urls:
+            print(f"   ❌ No download sources configured")
+            return False
+        
+        dest_file = self.download_dir / f"{driver_name}.zip"
         if self.download_with_fallback(driver_name, urls, dest_file):
             print(f"   ✅ Downloaded successfully")
-            
-            # Extract to appropriate location
-            if os_type == 'macos':
-                extract_dir = dest_dir / "macOS" / "PC_Specific"
-            elif os_type == 'windows':
-                extract_dir = dest_dir / "Windows" / "PC_Drivers"
-            elif os_type == 'asahi':
-                extract_dir = dest_dir / "Linux" / "Asahi"
-            
-            extract_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Extract
-            try:
-                import zipfile
-                with zipfile.ZipFile(dest_file, 'r') as zf:
-                    zf.extractall(extract_dir)
-                print(f"   ✅ Extracted to {extract_dir}")
-                dest_file.unlink()
-                return True
-            except Exception as e:
-                print(f"   ⚠️  Extract failed: {e}")
-                return False
+            return self.extract_download(driver_name, os_type, dest_file, dest_dir)
         
         return False
     
+    def download_many(self, drivers, os_type, dest_dir):
+        """Fetch several drivers concurrently, then extract them"""
+        jobs = []
+        for driver in drivers:
+            urls = self.resolve_urls(driver, os_type)
+            if not urls:
+                print(f"   ❌ {driver}: no download sources configured")
+                continue
+            jobs.append((driver, urls, self.download_dir / f"{driver}.zip"))
+        
+        if not jobs:
+            return 0
+        
+        engine = FetchEngine(max_workers=self.max_workers)
+        results, summary = engine.fetch_all(jobs)
+        print_report(results, summary)
+        
+        # Extraction writes into shared archive folders, keep it serial
+        extracted = 0
+        for result in results:
+            if result['ok'] and self.extract_download(result['name'], os_type, result['path'], dest_dir):
+                extracted += 1
+        
+        return extracted
+    
     def get_missing_drivers(self, required_drivers, os_type):
         """Check what's missing from archive"""
         missing = []
+        index = ArchiveIndex.load(self.archive_dir)
         
         if os_type == 'macos':
-            search_dirs = [
-                self.archive_dir / "macOS" / "Universal",
-                self.archive_dir / "macOS" / "PC_Specific"
-            ]
-            
             for driver in required_drivers:
-                found = False
-                for search_dir in search_dirs:
-                    if search_dir.exists():
-                        matches = list(search_dir.rglob(f"{driver}*"))
-                        if matches:
-                            found = True
-                            break
-                if not found:
+                if not index.find('macos', driver, sections=['Universal', 'PC_Specific']):
                     missing.append(driver)
         
         elif os_type == 'windows':
-            search_dir = self.archive_dir / "Windows" / "PC_Drivers"
             for driver in required_drivers:
-                if not search_dir.exists():
+                if not index.search('windows', driver, sections=['PC_Drivers']):
                     missing.append(driver)
-                else:
-                    matches = list(search_dir.rglob(f"*{driver}*"))
-                    if not matches:
-                        missing.append(driver)
         
         elif os_type == 'linux':
             # Linux modules usually from system
@@ -253,10 +277,7 @@ class SmartDownloader:
         
         print(f"\n📥 Downloading missing drivers...")
         
-        downloaded = 0
-        for driver in missing:
-            if self.smart_download(driver, os_type, self.archive_dir):
-                downloaded += 1
+        downloaded = self.download_many(missing, os_type, self.archive_dir)
         
         print(f"\n✅ Downloaded {downloaded}/{len(missing)} drivers")
         
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Native Hardware Probe
+Reads sysfs/procfs directly - no lspci, no shell, no subprocesses
+"""
+
+import gzip
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+
+# PCI base classes we care about
+PCI_CLASS_STORAGE = 0x01
+PCI_CLASS_NETWORK = 0x02
+PCI_CLASS_DISPLAY = 0x03
+
+# lspci-style names, so descriptions look the same as before
+PCI_CLASS_NAMES = {
+    0x0100: 'SCSI storage controller',
+    0x0101: 'IDE interface',
+    0x0104: 'RAID bus controller',
+    0x0106: 'SATA controller',
+    0x0107: 'Serial Attached SCSI controller',
+    0x0108: 'Non-Volatile memory controller',
+    0x0180: 'Mass storage controller',
+    0x0200: 'Ethernet controller',
+    0x0280: 'Network controller',
+    0x0300: 'VGA compatible controller',
+    0x0302: '3D controller',
+    0x0380: 'Display controller'
+}
+
+VENDOR_NAMES = {
+    '10de': 'NVIDIA',
+    '1002': 'AMD',
+    '8086': 'Intel',
+    '106b': 'Apple'
+}
+
+PCI_IDS_PATHS = [
+    'usr/share/hwdata/pci.ids',
+    'usr/share/misc/pci.ids',
+    'usr/share/pci.ids',
+    'usr/share/hwdata/pci.ids.gz',
+    'usr/share/misc/pci.ids.gz'
+]
+
+DMI_FIELDS = [
+    'sys_vendor', 'product_name', 'product_family', 'product_version',
+    'board_vendor', 'board_name', 'bios_vendor', 'bios_version'
+]
+
+# Per-device attributes copied by capture()
+PCI_ATTRS = ['vendor', 'device', 'class', 'revision', 'subsystem_vendor', 'subsystem_device', 'firmware_node/path']
+USB_ATTRS = ['idVendor', 'idProduct', 'bDeviceClass', 'speed', 'product', 'manufacturer', 'serial']
+
+def read_text(path):
+    """Read a small sysfs/procfs file, '' if unreadable"""
+    try:
+        with open(path, 'r', errors='replace') as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+def hex_id(value):
+    """'0x8086' -> '8086'"""
+    return value.lower().replace('0x', '').zfill(4) if value else ''
+
+def pci_path(dev_dir):
+    """OpenCore device path from the sysfs topology, '' if it can't be followed (ex. captured trees)
+
+    /sys/devices/pci0000:00/0000:00:1c.0/0000:03:00.0 -> PciRoot(0x0)/Pci(0x1c,0x0)/Pci(0x0,0x0)
+    """
+    parts = Path(os.path.realpath(dev_dir)).parts
+    roots = [i for i, part in enumerate(parts) if re.match(r'^pci[0-9a-f]{4}:[0-9a-f]{2}$', part)]
+    if not roots:
+        return ''
+    uid = read_text(Path(*parts[:roots[0] + 1]) / 'firmware_node' / 'uid')
+    path = [f"PciRoot({hex(int(uid) if uid.isdigit() else 0)})"]
+    for part in parts[roots[0] + 1:]:
+        match = re.match(r'^[0-9a-f]{4}:[0-9a-f]{2}:([0-9a-f]{2})\.([0-7])$', part)
+        if not match:
+            return ''
+        path.append(f"Pci({hex(int(match.group(1), 16))},{hex(int(match.group(2)))})")
+    return '/'.join(path)
+
+class SysfsProbe:
+    def __init__(self, root='/'):
+        self.root = Path(root)
+        self.timings = {}
+
+    def path(self, *parts):
+        return self.root.joinpath(*parts)
+
+    def _timed(self, name, func):
+        start = time.perf_counter()
+        result = func()
+        self.timings[name] = round((time.perf_counter() - start) * 1000, 3)
+        return result
+
+    def available(self):
+        """True if this root has a PCI sysfs tree"""
+        return self.path('sys', 'bus', 'pci', 'devices').is_dir()
+
+    def architecture(self):
+        arch = read_text(self.path('proc', 'sys', 'kernel', 'arch'))
+        if not arch and self.root == Path('/'):
+            arch = os.uname().machine
+        return arch or 'unknown'
+
+    def firmware(self):
+        return 'UEFI' if self.path('sys', 'firmware', 'efi').exists() else 'BIOS'
+
+    def cpu(self):
+        """Parse /proc/cpuinfo"""
+        cpu_info = {}
+        cpuinfo = read_text(self.path('proc', 'cpuinfo'))
+        if not cpuinfo:
+            return cpu_info
+
+        fields = {}
+        cores = 0
+        for line in cpuinfo.splitlines():
+            key, _, value = line.partition(':')
+            key = key.strip()
+            if key == 'processor':
+                cores += 1
+            fields.setdefault(key, value.strip())
+
+        name = fields.get('model name') or fields.get('Model') or fields.get('cpu model')
+        if name:
+            cpu_info['name'] = name
+        cpu_info['cores'] = cores
+        # OCLP maps these to macOS feature names (AVX2, RDRAND...) when building from a profile
+        cpu_info['flags'] = (fields.get('flags') or fields.get('Features') or '').split()
+
+        vendor_id = fields.get('vendor_id', '')
+        if 'Intel' in vendor_id or 'Intel' in (name or ''):
+            cpu_info['vendor'] = 'Intel'
+        elif 'AMD' in vendor_id or 'AMD' in (name or ''):
+            cpu_info['vendor'] = 'AMD'
+        elif fields.get('CPU implementer') == '0x61' or 'Apple' in cpuinfo or 'ARM' in cpuinfo:
+            cpu_info['vendor'] = 'Apple'
+        else:
+            cpu_info['vendor'] = 'Unknown'
+
+        return cpu_info
+
+    def dmi(self):
+        """Read /sys/class/dmi/id (empty on ARM Macs and VMs without DMI)"""
+        dmi_dir = self.path('sys', 'class', 'dmi', 'id')
+        info = {}
+        for field in DMI_FIELDS:
+            value = read_text(dmi_dir / field)
+            if value:
+                info[field] = value
+        return info
+
+    def pci_devices(self):
+        """All PCI functions with raw IDs"""
+        devices = []
+        pci_dir = self.path('sys', 'bus', 'pci', 'devices')
+        if not pci_dir.is_dir():
+            return devices
+
+        for entry in sorted(os.scandir(pci_dir), key=lambda e: e.name):
+            dev_dir = Path(entry.path)
+            pci_class = int(read_text(dev_dir / 'class') or '0', 16)
+            devices.append({
+                'slot': entry.name,
+                'vendor_id': hex_id(read_text(dev_dir / 'vendor')),
+                'device_id': hex_id(read_text(dev_dir / 'device')),
+                'subsystem_vendor_id': hex_id(read_text(dev_dir / 'subsystem_vendor')),
+                'subsystem_device_id': hex_id(read_text(dev_dir / 'subsystem_device')),
+                'revision': read_text(dev_dir / 'revision').lower().replace('0x', ''),
+                'class': pci_class >> 8,
+                'class_code': pci_class,
+                'acpi_path': read_text(dev_dir / 'firmware_node' / 'path'),
+                'pci_path': pci_path(dev_dir),
+                'wireless': any((dev_dir / 'net').glob('*/wireless')) or any((dev_dir / 'net').glob('*/phy80211'))
+            })
+        return devices
+
+    def pci_names(self, devices):
+        """Look up vendor/device names in pci.ids, only for the IDs we need"""
+        wanted = {(d['vendor_id'], d['device_id']) for d in devices}
+        vendors = {v for v, _ in wanted}
+        names = {}
+
+        ids_file = next((self.path(p) for p in PCI_IDS_PATHS if self.path(p).exists()), None)
+        if ids_file is None:
+            return names
+
+        opener = gzip.open if ids_file.suffix == '.gz' else open
+        vendor = None
+        with opener(ids_file, 'rt', errors='replace') as f:
+            for line in f:
+                if line.startswith('C '):
+                    break  # Device classes section, vendors are done
+                if not line.strip() or line.startswith('#'):
+                    continue
+                if line[0] != '\t':
+                    vid, _, vname = line.partition('  ')
+                    vendor = vid if vid in vendors else None
+                    if vendor:
+                        names[(vendor, None)] = vname.strip()
+                elif vendor and not line.startswith('\t\t'):
+                    did, _, dname = line.strip().partition('  ')
+                    if (vendor, did) in wanted:
+                        names[(vendor, did)] = dname.strip()
+        return names
+
+    def describe(self, device, names):
+        """lspci-like description: '02.0 VGA compatible controller: Intel Corporation ...'"""
+        vid, did = device['vendor_id'], device['device_id']
+        class_name = PCI_CLASS_NAMES.get(device['class'], f"Class {device['class']:04x}")
+        vendor_name = names.get((vid, None), VENDOR_NAMES.get(vid, f"Device {vid}"))
+        device_name = names.get((vid, did), f"Device {did}")
+        text = f"{device['slot'].split(':', 2)[-1]} {class_name}: {vendor_name} {device_name}"
+        if device['revision']:
+            text += f" (rev {device['revision']})"
+        return text
+
+    def classify(self, devices, names):
+        """Split PCI functions into the gpu/network/storage profile lists"""
+        gpus, network, storage = [], [], []
+
+        for device in devices:
+            base = device['class'] >> 8
+            ids = {'vendor_id': device['vendor_id'], 'device_id': device['device_id']}
+            # Enough for OCLP's ProfileBackend to rebuild its device objects
+            pci = {k: device[k] for k in ('slot', 'class_code', 'acpi_path', 'pci_path')}
+            description = self.describe(device, names)
+
+            if base == PCI_CLASS_DISPLAY:
+                manufacturer = VENDOR_NAMES.get(device['vendor_id'], 'Unknown')
+                gpus.append(dict(ids, manufacturer=manufacturer, description=description, **pci))
+
+            elif base == PCI_CLASS_NETWORK:
+                wifi = device['wireless'] or device['class'] == 0x0280 or 'Wireless' in description
+                network.append(dict(ids, type='WiFi' if wifi else 'Ethernet', description=description, **pci))
+
+            elif base == PCI_CLASS_STORAGE:
+                if device['class'] == 0x0108:
+                    kind = 'NVMe'
+                elif device['class'] == 0x0106:
+                    kind = 'SATA'
+                elif device['class'] == 0x0104:
+                    kind = 'RAID'
+                else:
+                    kind = 'Unknown'
+                storage.append(dict(ids, description=description, type=kind, **pci))
+
+        return gpus, network, storage
+
+    def platform(self, arch, cpu):
+        if arch == 'x86_64':
+            vendor = cpu.get('vendor', '')
+            if 'Intel' in vendor:
+                return 'Intel'
+            elif 'AMD' in vendor:
+                return 'AMD'
+            return 'x86_64'
+        elif arch in ('aarch64', 'arm64'):
+            return 'ARM64'
+        return 'Unknown'
+
+    def probe(self):
+        """Build a hardware profile (same schema as detect_hardware.detect_all)"""
+        start = time.perf_counter()
+        self.timings = {}
+
+        arch = self._timed('architecture', self.architecture)
+        cpu = self._timed('cpu', self.cpu)
+        firmware = self._timed('firmware', self.firmware)
+        dmi = self._timed('dmi', self.dmi)
+        devices = self._timed('pci_scan', self.pci_devices)
+        names = self._timed('pci_names', lambda: self.pci_names(devices))
+        gpus, network, storage = self._timed('classify', lambda: self.classify(devices, names))
+
+        hardware = {
+            'architecture': arch,
+            'platform': self.platform(arch, cpu),
+            'firmware': firmware,
+            'cpu': cpu,
+            'gpu': gpus,
+            'network': network,
+            'storage': storage,
+            'dmi': dmi
+        }
+        self.timings['total'] = round((time.perf_counter() - start) * 1000, 3)
+        return hardware
+
+def capture(dest, root='/'):
+    """Copy the files the probe reads into dest, to replay later with SysfsProbe(dest)"""
+    src = Path(root)
+    dest = Path(dest)
+
+    def copy(rel):
+        text = read_text(src / rel)
+        if text:
+            target = dest / rel
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(text + '\n')
+
+    def mark(rel):
+        # Only the directory's existence matters, .keep lets git track it
+        (dest / rel).mkdir(parents=True, exist_ok=True)
+        (dest / rel / '.keep').touch()
+
+    copy('proc/cpuinfo')
+    copy('proc/sys/kernel/arch')
+    if (src / 'sys/firmware/efi').exists():
+        mark('sys/firmware/efi')
+    for field in DMI_FIELDS:
+        copy(f'sys/class/dmi/id/{field}')
+
+    pci_dir = src / 'sys/bus/pci/devices'
+    if pci_dir.is_dir():
+        for entry in os.scandir(pci_dir):
+            for attr in PCI_ATTRS:
+                copy(f'sys/bus/pci/devices/{entry.name}/{attr}')
+            for marker in Path(entry.path).glob('net/*/wireless'):
+                mark(marker.relative_to(src))
+
+    usb_dir = src / 'sys/bus/usb/devices'
+    if usb_dir.is_dir():
+        for entry in os.scandir(usb_dir):
+            for attr in USB_ATTRS:
+                copy(f'sys/bus/usb/devices/{entry.name}/{attr}')
+
+    for rel in PCI_IDS_PATHS:
+        if (src / rel).exists():
+            (dest / rel).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(src / rel, dest / rel)
+            break
+
+    return dest
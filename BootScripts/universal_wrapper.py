@@ -5,7 +5,6 @@ All OSes go through detection, driver check, and injection
 """
 
 import json
-import subprocess
 from pathlib import Path
 
 class UniversalWrapper:
@@ -25,13 +24,20 @@ class UniversalWrapper:
     
     def is_mac(self):
         """Detect if running on a Mac"""
-        try:
-            dmi = subprocess.run(['dmidecode', '-s', 'system-manufacturer'], 
-                               capture_output=True, text=True, timeout=2)
-            if 'Apple' in dmi.stdout:
+        dmi_info = self.hardware.get('dmi')
+        if dmi_info:
+            # Native probe already read /sys/class/dmi/id, no need to fork dmidecode
+            if 'Apple' in dmi_info.get('sys_vendor', ''):
                 return True
-        except:
-            pass
+        else:
+            try:
+                import subprocess
+                dmi = subprocess.run(['dmidecode', '-s', 'system-manufacturer'], 
+                                   capture_output=True, text=True, timeout=2)
+                if 'Apple' in dmi.stdout:
+                    return True
+            except:
+                pass
         
         cpu_name = self.hardware.get('cpu', {}).get('name', '').lower()
         if 'apple' in cpu_name:
@@ -228,25 +234,25 @@ class UniversalWrapper:
     
     def check_driver_archive(self, target_os):
         """Check what's in the driver archive for target OS"""
-        archive_dir = self.base_dir / "DriverArchive"
+        # Imported here so the boot menu can render before the index is loaded
+        from archive_index import ArchiveIndex
+        
+        index = ArchiveIndex.load(self.base_dir / "DriverArchive")
         
         if target_os == "macos":
-            kext_dir = archive_dir / "macOS" / "Kexts"
-            if kext_dir.exists():
-                kexts = list(kext_dir.glob("*.kext"))
-                return {"found": len(kexts), "kexts": [k.name for k in kexts]}
+            kexts = index.entries_for('macos', sections=['Kexts'])
+            if kexts:
+                return {"found": len(kexts), "kexts": [e['file'] for _, e in kexts]}
         
         elif target_os == "windows":
-            driver_dir = archive_dir / "Windows"
-            if driver_dir.exists():
-                drivers = list(driver_dir.rglob("*.exe")) + list(driver_dir.rglob("*.inf"))
-                return {"found": len(drivers), "drivers": [d.name for d in drivers]}
+            drivers = index.entries_for('windows', suffixes=('.exe', '.inf'))
+            if drivers:
+                return {"found": len(drivers), "drivers": [e['file'] for _, e in drivers]}
         
         elif target_os == "linux":
-            module_dir = archive_dir / "Linux" / "modules"
-            if module_dir.exists():
-                modules = list(module_dir.rglob("*.ko"))
-                return {"found": len(modules), "modules": [m.name for m in modules]}
+            modules = index.entries_for('linux', sections=['modules'], suffixes=('.ko',))
+            if modules:
+                return {"found": len(modules), "modules": [e['file'] for _, e in modules]}
         
         return {"found": 0}
     
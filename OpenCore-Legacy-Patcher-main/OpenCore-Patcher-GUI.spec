@@ -22,6 +22,9 @@ datas = [
    ('Universal-Binaries.dmg', '.'),
 ]
 
+if Path("opencore_legacy_patcher/datasets/pci_lookup.marshal").exists():
+   datas.append(('opencore_legacy_patcher/datasets/pci_lookup.marshal', 'opencore_legacy_patcher/datasets'))
+
 if Path("DortaniaInternalResources.dmg").exists():
    datas.append(('DortaniaInternalResources.dmg', '.'))
 
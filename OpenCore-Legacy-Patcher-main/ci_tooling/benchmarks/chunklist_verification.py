@@ -0,0 +1,130 @@
+"""
+chunklist_verification.py: Benchmark ChunklistVerification on a synthetic multi-GB file
+
+Usage:
+    python3 -m ci_tooling.benchmarks.chunklist_verification --size-gb 4 --workers 1,2,4,8
+"""
+
+import os
+import sys
+import time
+import hashlib
+import argparse
+import tempfile
+
+from pathlib import Path
+
+from opencore_legacy_patcher.support import integrity_verification
+
+
+BLOCK_SIZE = 64 * 1024 * 1024
+
+
+def generate_file(path: Path, size: int, chunk_size: int) -> bytes:
+    """
+    Write a file of the given size and return a matching chunklist
+
+    Parameters:
+        path       (Path): Output file
+        size        (int): File size in bytes
+        chunk_size  (int): Chunk length, Apple uses ~10MB
+
+    Returns:
+        bytes: Chunklist in the CNKL format
+    """
+
+    seed = bytearray(os.urandom(BLOCK_SIZE))
+    chunks = []
+    chunk_hash = hashlib.sha256()
+    chunk_fill = 0
+    written = 0
+
+    with path.open("wb") as f:
+        block_number = 0
+        while written < size:
+            # Vary every block so chunks don't all hash the same
+            seed[:8] = block_number.to_bytes(8, "little")
+            block = memoryview(seed)[:min(BLOCK_SIZE, size - written)]
+            f.write(block)
+            written += len(block)
+            block_number += 1
+
+            while len(block):
+                take = min(chunk_size - chunk_fill, len(block))
+                chunk_hash.update(block[:take])
+                chunk_fill += take
+                block = block[take:]
+                if chunk_fill == chunk_size:
+                    chunks.append((chunk_fill, chunk_hash.digest()))
+                    chunk_hash = hashlib.sha256()
+                    chunk_fill = 0
+
+    if chunk_fill:
+        chunks.append((chunk_fill, chunk_hash.digest()))
+
+    # Ref: https://github.com/apple-oss-distributions/xnu/blob/xnu-8020.101.4/bsd/kern/chunklist.h#L59-L69
+    header_length = 0x24
+    sig_offset = header_length + len(chunks) * integrity_verification.CHUNK_LENGTH
+    header = (
+        b"CNKL"
+        + header_length.to_bytes(4, "little")
+        + bytes([1, 1, 0, 0])
+        + len(chunks).to_bytes(8, "little")
+        + header_length.to_bytes(8, "little")
+        + sig_offset.to_bytes(8, "little")
+    )
+    return header + b"".join(length.to_bytes(4, "little") + digest for length, digest in chunks)
+
+
+def run(file_path: Path, chunklist: bytes, workers: int) -> tuple:
+    """
+    Validate once in the calling thread
+
+    Returns:
+        tuple: (status, seconds, chunks checked, error message)
+    """
+
+    chunk_obj = integrity_verification.ChunklistVerification(file_path, chunklist, max_workers=workers)
+    start = time.perf_counter()
+    chunk_obj._validate()
+    return chunk_obj.status, time.perf_counter() - start, chunk_obj.current_chunk, chunk_obj.error_msg
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark chunklist verification")
+    parser.add_argument("--size-gb",  type=float, default=4,  help="Synthetic file size in GB")
+    parser.add_argument("--chunk-mb", type=float, default=10, help="Chunk size in MB")
+    parser.add_argument("--workers",  type=str,   default=f"1,{integrity_verification.DEFAULT_WORKERS}", help="Comma separated worker counts")
+    parser.add_argument("--directory", type=str,  default=None, help="Where to create the synthetic file")
+    args = parser.parse_args()
+
+    size = int(args.size_gb * 1024 ** 3)
+    chunk_size = int(args.chunk_mb * 1024 ** 2)
+
+    with tempfile.TemporaryDirectory(dir=args.directory) as directory:
+        file_path = Path(directory) / "InstallAssistant.pkg"
+
+        print(f"Generating {size / 1024 ** 3:.1f} GB file with {args.chunk_mb:g} MB chunks...")
+        chunklist = generate_file(file_path, size, chunk_size)
+
+        for workers in [int(x) for x in args.workers.split(",")]:
+            status, seconds, checked, _ = run(file_path, chunklist, workers)
+            print(f"- {workers:2} worker(s): {status.name:<8} {seconds:7.2f}s  {size / seconds / 1024 ** 2:8.1f} MB/s  ({checked} chunks)")
+            if status != integrity_verification.ChunklistStatus.SUCCESS:
+                sys.exit(1)
+
+        # Corrupt a byte a quarter of the way in, verification should stop right there
+        with file_path.open("r+b") as f:
+            f.seek(size // 4)
+            byte = f.read(1)
+            f.seek(size // 4)
+            f.write(bytes([byte[0] ^ 0xFF]))
+
+        status, seconds, checked, error_msg = run(file_path, chunklist, max(int(x) for x in args.workers.split(",")))
+        print(f"- Corrupted file: {status.name} after {seconds:.2f}s at chunk {checked}: {error_msg}")
+        if status != integrity_verification.ChunklistStatus.FAILURE:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
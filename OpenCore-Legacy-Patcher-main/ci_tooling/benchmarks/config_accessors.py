@@ -0,0 +1,76 @@
+"""
+config_accessors.py: Benchmark BuildSupport's kext/EFI binary lookups
+
+Builds a synthetic config.plist with N kexts, drivers and tools, then performs
+K lookups spread across them, comparing the old linear get_item_by_kv() scan
+against the indexed accessors. Doubling the config size should roughly double
+the linear time per lookup while the indexed time stays flat.
+
+Usage:
+    python3 -m ci_tooling.benchmarks.config_accessors --sizes 100,500,2000 --lookups 5000
+"""
+
+import time
+import argparse
+
+from opencore_legacy_patcher.efi_builder import support
+
+
+def generate_config(size: int) -> dict:
+    """
+    Generate a config with the given number of Kernel -> Add, UEFI -> Drivers
+    and Misc -> Tools entries
+
+    Parameters:
+        size (int): Entries per list
+    """
+
+    return {
+        "Kernel": {"Add":     [{"BundlePath": f"Kext{i}.kext", "Enabled": False} for i in range(size)]},
+        "UEFI":   {"Drivers": [{"Path": f"Driver{i}.efi", "Enabled": False} for i in range(size)]},
+        "Misc":   {"Tools":   [{"Path": f"Tool{i}.efi", "Enabled": False} for i in range(size)]},
+    }
+
+
+def run(size: int, lookups: int) -> tuple:
+    """
+    Time the linear and indexed lookups against one config
+
+    Returns:
+        tuple: (linear seconds, indexed seconds)
+    """
+
+    config = generate_config(size)
+    targets = [(i * 7919) % size for i in range(lookups)]
+
+    # Both mirror the builders, which create a new BuildSupport for every call
+    start = time.perf_counter()
+    for i in targets:
+        support.BuildSupport("MacBookPro11,1", None, config).get_item_by_kv(config["Kernel"]["Add"], "BundlePath", f"Kext{i}.kext")["Enabled"] = True
+        support.BuildSupport("MacBookPro11,1", None, config).get_item_by_kv(config["UEFI"]["Drivers"], "Path", f"Driver{i}.efi")["Enabled"] = True
+        support.BuildSupport("MacBookPro11,1", None, config).get_item_by_kv(config["Misc"]["Tools"], "Path", f"Tool{i}.efi")["Enabled"] = True
+    linear = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in targets:
+        support.BuildSupport("MacBookPro11,1", None, config).get_kext_by_bundle_path(f"Kext{i}.kext")["Enabled"] = True
+        support.BuildSupport("MacBookPro11,1", None, config).get_efi_binary_by_path(f"Driver{i}.efi", "UEFI", "Drivers")["Enabled"] = True
+        support.BuildSupport("MacBookPro11,1", None, config).get_efi_binary_by_path(f"Tool{i}.efi", "Misc", "Tools")["Enabled"] = True
+    indexed = time.perf_counter() - start
+
+    return linear, indexed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark config.plist entry lookups")
+    parser.add_argument("--sizes",   default="50,200,1000,4000", help="Comma separated entries per list")
+    parser.add_argument("--lookups", type=int, default=5000,    help="Lookups per list")
+    args = parser.parse_args()
+
+    for size in [int(x) for x in args.sizes.split(",")]:
+        linear, indexed = run(size, args.lookups)
+        print(f"- {size:5} entries: linear {linear * 1000:8.1f} ms, indexed {indexed * 1000:7.1f} ms ({linear / indexed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+config_diff.py: Benchmark diffing and patching config.plist trees
+
+Derives variants of the config.plist template the way builds differ from one
+another (kexts toggled, added, removed and reordered, settings changed), then
+times diff() and apply() against the template and checks every round trip.
+
+Usage:
+    python3 -m ci_tooling.benchmarks.config_diff --configs 2000
+"""
+
+import copy
+import time
+import random
+import argparse
+import plistlib
+
+from pathlib import Path
+
+from opencore_legacy_patcher.efi_builder import config_diff
+
+
+TEMPLATE = Path(__file__).resolve().parent.parent.parent / "payloads/Config/config.plist"
+
+
+def generate_variant(template: dict, rng: random.Random) -> dict:
+    """
+    Copy of the template with build-like changes applied
+    """
+
+    config = copy.deepcopy(template)
+    kexts = config["Kernel"]["Add"]
+
+    for kext in rng.sample(kexts, min(10, len(kexts))):
+        kext["Enabled"] = not kext["Enabled"]
+    for _ in range(rng.randrange(4)):
+        kexts.pop(rng.randrange(len(kexts)))
+    kexts.insert(rng.randrange(len(kexts)), {"Arch": "x86_64", "BundlePath": f"Variant-{rng.randrange(1 << 30)}.kext", "Enabled": True})
+    if rng.random() < 0.25:
+        first, second = rng.sample(range(len(kexts)), 2)
+        kexts[first], kexts[second] = kexts[second], kexts[first]
+
+    config["UEFI"]["Drivers"] = [driver for driver in config["UEFI"]["Drivers"] if rng.random() < 0.8]
+    config["Misc"]["Boot"]["ShowPicker"] = rng.random() < 0.5
+    config["Misc"]["Boot"]["Timeout"] = rng.randrange(10)
+    config["NVRAM"]["Add"]["7C436110-AB2A-4BBB-A880-FE41995C9F82"]["boot-args"] += " -v"
+    return config
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark config.plist diff and patch")
+    parser.add_argument("--configs", type=int, default=2000, help="Variants to diff against the template")
+    parser.add_argument("--seed",    type=int, default=0)
+    args = parser.parse_args()
+
+    template = plistlib.load(TEMPLATE.open("rb"))
+    rng = random.Random(args.seed)
+    variants = [generate_variant(template, rng) for _ in range(args.configs)]
+
+    start = time.perf_counter()
+    patches = [config_diff.diff(template, variant) for variant in variants]
+    diffed = time.perf_counter() - start
+
+    targets = [copy.deepcopy(template) for _ in variants]
+    start = time.perf_counter()
+    results = [config_diff.apply(target, patch) for target, patch in zip(targets, patches)]
+    applied = time.perf_counter() - start
+
+    for result, variant in zip(results, variants):
+        if plistlib.dumps(result, sort_keys=True) != plistlib.dumps(variant, sort_keys=True):
+            raise Exception("Patched config does not match its variant")
+
+    operations = sum(len(patch) for patch in patches)
+    print(f"- Diff:  {args.configs / diffed:8.0f} configs/s ({operations / args.configs:.1f} operations per patch)")
+    print(f"- Apply: {args.configs / applied:8.0f} configs/s")
+    print(f"- All {args.configs} round trips match")
+
+
+if __name__ == "__main__":
+    main()
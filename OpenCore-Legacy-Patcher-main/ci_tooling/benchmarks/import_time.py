@@ -0,0 +1,79 @@
+"""
+import_time.py: Benchmark how long importing the patcher's entry point takes
+
+Compares the CLI import path (application_entry, with wxPython deferred until a
+GUI launch) against also importing the GUI entry point, each in a fresh
+interpreter, and lists the slowest modules reported by -X importtime.
+
+Usage:
+    python3 -m ci_tooling.benchmarks.import_time --runs 10 --top 15
+"""
+
+import sys
+import argparse
+import statistics
+import subprocess
+
+from pathlib import Path
+
+
+MODULE     = "opencore_legacy_patcher.application_entry"
+GUI_MODULE = "opencore_legacy_patcher.wx_gui.gui_entry"
+ROOT       = Path(__file__).resolve().parent.parent.parent
+
+
+def run(gui: bool) -> tuple:
+    """
+    Import MODULE (and GUI_MODULE if gui) once in a fresh interpreter
+
+    Returns:
+        tuple: (total microseconds, {module: (self us, cumulative us)})
+    """
+
+    statement = f"import {MODULE}" + (f", {GUI_MODULE}" if gui else "")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        sys.exit(1)
+
+    # Lines look like: "import time:       412 |       1234 |   opencore_legacy_patcher.datasets.smbios_data"
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+
+    return sum(self_us for self_us, _ in modules.values()), modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark import time of the patcher entry point")
+    parser.add_argument("--runs", type=int, default=10, help="Imports per mode, the median is reported")
+    parser.add_argument("--top",  type=int, default=10, help="Slowest modules to list for the CLI run")
+    args = parser.parse_args()
+
+    # Warm the bytecode cache so the first run isn't dominated by compilation
+    run(gui=True)
+
+    totals = {}
+    for gui in (True, False):
+        label = "gui" if gui else "cli"
+        samples = [run(gui) for _ in range(args.runs)]
+        totals[label] = statistics.median(total for total, _ in samples)
+        wx_us = sum(self_us for name, (self_us, _) in samples[-1][1].items() if name == "wx" or name.startswith("wx."))
+        print(f"- {label}: {totals[label] / 1000:8.1f} ms median ({wx_us / 1000:.1f} ms in wx)")
+
+    print(f"- Saved on CLI launches: {(totals['gui'] - totals['cli']) / 1000:.1f} ms ({(1 - totals['cli'] / totals['gui']) * 100:.0f}%)")
+
+    _, modules = run(gui=False)
+    print(f"\nSlowest {args.top} modules (cli, self time):")
+    for name, (self_us, _) in sorted(modules.items(), key=lambda x: x[1][0], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
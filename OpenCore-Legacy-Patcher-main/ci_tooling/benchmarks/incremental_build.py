@@ -0,0 +1,71 @@
+"""
+incremental_build.py: Benchmark rebuilding an EFI after toggling a single setting
+
+Builds the EFI once, flips a boolean setting (as the GUI's settings pane does),
+then times the rebuild with and without incremental builds.
+
+Usage:
+    python3 -m ci_tooling.benchmarks.incremental_build --model MacBookPro11,1 --setting showpicker --runs 5
+"""
+
+import sys
+import time
+import logging
+import argparse
+import statistics
+import tempfile
+
+from pathlib import Path
+
+from opencore_legacy_patcher import constants
+from opencore_legacy_patcher.efi_builder import build
+from opencore_legacy_patcher.datasets import example_data
+
+
+def rebuild_times(model: str, setting: str, runs: int, incremental: bool) -> list:
+    """
+    Build once, then time rebuilds with the setting flipped before each
+
+    Returns:
+        list: Seconds per rebuild
+    """
+
+    global_constants = constants.Constants()
+    global_constants.validate = True
+    global_constants.custom_model = model
+    global_constants.computer = example_data.MacBookPro.MacBookPro111_Stock
+    global_constants.incremental_build = incremental
+
+    samples = []
+    with tempfile.TemporaryDirectory(prefix="oclp-incremental-bench-") as directory:
+        global_constants.current_path = Path(directory)
+        build.BuildOpenCore(model, global_constants)
+        for _ in range(runs):
+            setattr(global_constants, setting, not getattr(global_constants, setting))
+            start = time.perf_counter()
+            build.BuildOpenCore(model, global_constants)
+            samples.append(time.perf_counter() - start)
+
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark incremental EFI rebuilds")
+    parser.add_argument("--model",   default="MacBookPro11,1", help="Model to build for")
+    parser.add_argument("--setting", default="showpicker",     help="Boolean constant to flip between builds")
+    parser.add_argument("--runs",    type=int, default=5,      help="Rebuilds per mode, the median is reported")
+    args = parser.parse_args()
+
+    # The build parses sys.argv itself (utilities.cls()), don't let it see ours
+    sys.argv = sys.argv[:1]
+    logging.disable(logging.INFO)
+
+    full        = statistics.median(rebuild_times(args.model, args.setting, args.runs, incremental=False))
+    incremental = statistics.median(rebuild_times(args.model, args.setting, args.runs, incremental=True))
+
+    print(f"- Full rebuild:        {full * 1000:8.1f} ms")
+    print(f"- Incremental rebuild: {incremental * 1000:8.1f} ms ({full / incremental:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
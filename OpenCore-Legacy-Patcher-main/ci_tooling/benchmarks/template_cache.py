@@ -0,0 +1,65 @@
+"""
+template_cache.py: Benchmark OpenCore base extraction with and without the template cache
+
+Each run lays down a fresh build folder the way BuildOpenCore._generate_base()
+does, once by extracting the zip and parsing config.plist from disk, once
+through efi_builder.template_cache.
+
+Usage:
+    python3 -m ci_tooling.benchmarks.template_cache --runs 20 --variant DEBUG
+"""
+
+import time
+import shutil
+import zipfile
+import argparse
+import plistlib
+import tempfile
+
+from pathlib import Path
+
+from opencore_legacy_patcher.efi_builder import template_cache
+
+
+PAYLOADS = Path(__file__).resolve().parent.parent.parent / "payloads"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark OpenCore base extraction")
+    parser.add_argument("--runs",    type=int, default=20,  help="Build folders to create per mode")
+    parser.add_argument("--variant", default="RELEASE", choices=["RELEASE", "DEBUG"])
+    args = parser.parse_args()
+
+    zip_source = PAYLOADS / f"OpenCore/OpenCore-{args.variant}.zip"
+    plist_template = PAYLOADS / "Config/config.plist"
+
+    with tempfile.TemporaryDirectory(prefix="oclp-template-bench-") as directory:
+        cache_root = Path(directory) / "cache"
+
+        start = time.perf_counter()
+        for i in range(args.runs):
+            build_path = Path(directory) / f"zip-{i}"
+            build_path.mkdir()
+            shutil.copy(zip_source, build_path)
+            zipfile.ZipFile(build_path / zip_source.name).extractall(build_path)
+            plistlib.load(plist_template.open("rb"))
+        extracted = time.perf_counter() - start
+
+        start = time.perf_counter()
+        template_cache.extract_opencore(zip_source, Path(directory) / "warm", cache_root)
+        template_cache.load_config_template(plist_template)
+        first = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(args.runs):
+            template_cache.extract_opencore(zip_source, Path(directory) / f"cache-{i}", cache_root)
+            template_cache.load_config_template(plist_template)
+        cached = time.perf_counter() - start
+
+    print(f"- Extracting zip:  {extracted / args.runs * 1000:7.2f} ms per build")
+    print(f"- Populating cache: {first * 1000:6.2f} ms (first build only)")
+    print(f"- From cache:      {cached / args.runs * 1000:7.2f} ms per build ({extracted / cached:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,9 @@ import subprocess
 
 from pathlib import Path
 
-from opencore_legacy_patcher.volume  import generate_copy_arguments
-from opencore_legacy_patcher.support import subprocess_wrapper
+from opencore_legacy_patcher.volume   import generate_copy_arguments
+from opencore_legacy_patcher.support  import subprocess_wrapper
+from opencore_legacy_patcher.datasets import pci_lookup
 
 
 class GenerateApplication:
@@ -31,6 +32,14 @@ class GenerateApplication:
         self._analytics_endpoint = analytics_endpoint
 
 
+    def _generate_pci_lookup(self) -> None:
+        """
+        Precompile pci_data.py into the lookup table device_probe loads
+        """
+        print("Generating PCI lookup table")
+        pci_lookup.generate_artifact()
+
+
     def _generate_application(self) -> None:
         """
         Generate PyInstaller Application
@@ -168,6 +177,7 @@ class GenerateApplication:
         Generate OpenCore-Patcher.app
         """
         self._embed_analytics_key()
+        self._generate_pci_lookup()
         self._generate_application()
         self._remove_analytics_key()
 
@@ -12,10 +12,9 @@ from pathlib import Path
 
 from . import constants
 
-from .wx_gui import gui_entry
-
 from .detections import (
     device_probe,
+    offline_probe,
     os_probe
 )
 from .support import (
@@ -42,6 +41,8 @@ class OpenCoreLegacyPatcher:
         self._generate_base_data()
 
         if utilities.check_cli_args() is None:
+            # Only pull in wxPython when the GUI is actually used, keeps CLI startup lean
+            from .wx_gui import gui_entry
             gui_entry.EntryPoint(self.constants).start()
 
 
@@ -69,23 +70,32 @@ class OpenCoreLegacyPatcher:
         # Ensure we live after parent process dies (ie. LaunchAgent)
         os.setpgrp()
 
+        # Building for a saved profile, possibly on a Linux build node:
+        # skip everything that probes the host (sw_vers, diskutil, NVRAM)
+        args = utilities.check_cli_args()
+        self.constants.hardware_profile = args.profile if args else None
+
         # Generate OS data
-        os_data = os_probe.OSProbe()
-        self.constants.detected_os = os_data.detect_kernel_major()
-        self.constants.detected_os_minor = os_data.detect_kernel_minor()
-        self.constants.detected_os_build = os_data.detect_os_build()
-        self.constants.detected_os_version = os_data.detect_os_version()
+        if self.constants.hardware_profile is None:
+            os_data = os_probe.OSProbe()
+            self.constants.detected_os = os_data.detect_kernel_major()
+            self.constants.detected_os_minor = os_data.detect_kernel_minor()
+            self.constants.detected_os_build = os_data.detect_os_build()
+            self.constants.detected_os_version = os_data.detect_os_version()
 
         # Generate computer data
-        self.constants.computer = device_probe.Computer.probe()
+        backend = offline_probe.backend_for(self.constants.hardware_profile) if self.constants.hardware_profile else None
+        self.constants.computer = device_probe.Computer.probe(backend)
         self.computer = self.constants.computer
-        self.constants.booted_oc_disk = utilities.find_disk_off_uuid(utilities.clean_device_path(self.computer.opencore_path))
+        if self.constants.hardware_profile is None:
+            self.constants.booted_oc_disk = utilities.find_disk_off_uuid(utilities.clean_device_path(self.computer.opencore_path))
         if self.constants.computer.firmware_vendor:
             if self.constants.computer.firmware_vendor != "Apple":
                 self.constants.host_is_hackintosh = True
 
         # Generate environment data
-        self.constants.recovery_status = utilities.check_recovery()
+        if self.constants.hardware_profile is None:
+            self.constants.recovery_status = utilities.check_recovery()
         utilities.disable_cls()
         self._fix_cwd()
 
@@ -101,6 +111,7 @@ class OpenCoreLegacyPatcher:
         self.constants.launcher_script = launcher_script
 
         # Initialize working directory
+        # Only mounts payloads.dmg in the compiled app, running from source uses ./payloads
         self.constants.unpack_thread = threading.Thread(target=reroute_payloads.RoutePayloadDiskImage, args=(self.constants,))
         self.constants.unpack_thread.start()
 
@@ -114,7 +125,8 @@ class OpenCoreLegacyPatcher:
 
         # Generate defaults
         defaults.GenerateDefaults(self.computer.real_model, True, self.constants)
-        threading.Thread(target=analytics_handler.Analytics(self.constants).send_analytics).start()
+        if self.constants.hardware_profile is None:
+            threading.Thread(target=analytics_handler.Analytics(self.constants).send_analytics).start()
 
         if utilities.check_cli_args() is None:
             self.constants.cli_mode = False
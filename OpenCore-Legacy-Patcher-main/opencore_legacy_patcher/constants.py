@@ -2,6 +2,8 @@
 constants.py: Defines versioning, file paths and other settings for the patcher
 """
 
+import tempfile
+
 from pathlib   import Path
 from typing    import Optional
 from packaging import version
@@ -146,6 +148,7 @@ class Constants:
         self.root_patcher_succeeded:    bool = False  # Determine if root patcher succeeded
         self.start_build_install:       bool = False  # Determine if build install should be started
         self.host_is_non_metal:         bool = False  # Determine if host is non-metal (ie. enable UI hacks)
+        self.incremental_build:         bool = True   # Reuse unchanged kexts from the previous build (on for GUI settings rebuilds, see ci_tooling/benchmarks/incremental_build.py)
         self.needs_to_open_preferences: bool = False  # Determine if preferences need to be opened
         self.host_is_hackintosh:        bool = False  # Determine if host is Hackintosh
         self.should_nuke_kdks:          bool = True  #  Determine if KDKs should be nuked if unused in /L*/D*/KDKs
@@ -162,6 +165,7 @@ class Constants:
         ## Hardware
         self.computer: device_probe.Computer = None  # type: ignore
         self.custom_model:     Optional[str] = None
+        self.hardware_profile: Optional[str] = None  # Saved profile (--profile) built for instead of this machine
 
         ## OpenCore Settings
         self.opencore_debug: bool = False # Enable OpenCore debug
@@ -173,6 +177,8 @@ class Constants:
         ## Kext Settings
         self.kext_debug:  bool = False  # Enables Lilu debug and DebugEnhancer
         self.kext_variant: str = "RELEASE"
+        self.kext_graph         = None  # Dependency graph of kexts enabled in the current build (kext_graph.KextGraph)
+        self.build_manifest     = None  # Kexts reused from the previous build (incremental.IncrementalBuild)
 
         ## NVRAM Settings
         self.verbose_debug: bool = False  # -v
@@ -657,6 +663,10 @@ class Constants:
     def opencore_zip_copied(self):
         return self.build_path / Path(f"OpenCore-{'DEBUG' if self.opencore_debug is True else 'RELEASE'}.zip")
 
+    @property
+    def opencore_template_cache(self):
+        return Path(tempfile.gettempdir()) / Path("OCLP-Template-Cache")
+
     @property
     def oc_folder(self):
         return self.opencore_release_folder / Path("EFI/OC/")
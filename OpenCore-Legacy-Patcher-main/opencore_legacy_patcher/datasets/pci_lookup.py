@@ -0,0 +1,184 @@
+"""
+pci_lookup.py: Precompiled (device class, device ID) lookup table built from pci_data.py
+
+device_probe used to walk pci_data's lists device by device. Instead, the lists
+are flattened once into a dict and stored as a marshalled artifact at build
+time, so detection is a single dict lookup and pci_data is never imported at runtime.
+
+Usage:
+>>> pci_lookup.lookup("NVIDIA", 0x0FE0)
+'Kepler'
+"""
+
+import marshal
+import hashlib
+import threading
+
+from pathlib import Path
+
+
+ARTIFACT_PATH: Path = Path(__file__).parent / "pci_lookup.marshal"
+PCI_DATA_PATH: Path = Path(__file__).parent / "pci_data.py"
+
+# device_probe class -> (pci_data table, enum member name)
+# Ordered as device_probe's original elif chains: the first table listing a device wins
+LOOKUP_TABLES: dict = {
+    "NVIDIA": [
+        ("nvidia_ids.curie_ids",   "Curie"),
+        ("nvidia_ids.tesla_ids",   "Tesla"),
+        ("nvidia_ids.fermi_ids",   "Fermi"),
+        ("nvidia_ids.kepler_ids",  "Kepler"),
+        ("nvidia_ids.maxwell_ids", "Maxwell"),
+        ("nvidia_ids.pascal_ids",  "Pascal"),
+    ],
+    "AMD": [
+        ("amd_ids.r500_ids",          "R500"),
+        ("amd_ids.gcn_7000_ids",      "Legacy_GCN_7000"),
+        ("amd_ids.gcn_8000_ids",      "Legacy_GCN_8000"),
+        ("amd_ids.gcn_9000_ids",      "Legacy_GCN_9000"),
+        ("amd_ids.terascale_1_ids",   "TeraScale_1"),
+        ("amd_ids.terascale_2_ids",   "TeraScale_2"),
+        ("amd_ids.polaris_ids",       "Polaris"),
+        ("amd_ids.polaris_spoof_ids", "Polaris_Spoof"),
+        ("amd_ids.vega_ids",          "Vega"),
+        ("amd_ids.navi_ids",          "Navi"),
+    ],
+    "Intel": [
+        ("intel_ids.gma_950_ids",     "GMA_950"),
+        ("intel_ids.gma_x3100_ids",   "GMA_X3100"),
+        ("intel_ids.iron_ids",        "Iron_Lake"),
+        ("intel_ids.sandy_ids",       "Sandy_Bridge"),
+        ("intel_ids.ivy_ids",         "Ivy_Bridge"),
+        ("intel_ids.haswell_ids",     "Haswell"),
+        ("intel_ids.broadwell_ids",   "Broadwell"),
+        ("intel_ids.skylake_ids",     "Skylake"),
+        ("intel_ids.kaby_lake_ids",   "Kaby_Lake"),
+        ("intel_ids.coffee_lake_ids", "Coffee_Lake"),
+        ("intel_ids.comet_lake_ids",  "Comet_Lake"),
+        ("intel_ids.ice_lake_ids",    "Ice_Lake"),
+    ],
+    "IntelEthernet": [
+        ("intel_ids.AppleIntel8254XEthernet", "AppleIntel8254XEthernet"),
+        ("intel_ids.AppleIntelI210Ethernet",  "AppleIntelI210Ethernet"),
+        ("intel_ids.Intel82574L",             "Intel82574L"),
+    ],
+    "Broadcom": [
+        ("broadcom_ids.AppleBCMWLANBusInterfacePCIe", "AppleBCMWLANBusInterfacePCIe"),
+        ("broadcom_ids.AirPortBrcmNIC",               "AirportBrcmNIC"),
+        ("broadcom_ids.AirPortBrcmNICThirdParty",     "AirPortBrcmNICThirdParty"),
+        ("broadcom_ids.AirPortBrcm4360",              "AirPortBrcm4360"),
+        ("broadcom_ids.AirPortBrcm4331",              "AirPortBrcm4331"),
+        ("broadcom_ids.AppleAirPortBrcm43224",        "AirPortBrcm43224"),
+    ],
+    "BroadcomEthernet": [
+        ("broadcom_ids.AppleBCM5701Ethernet", "AppleBCM5701Ethernet"),
+    ],
+    "Atheros": [
+        ("atheros_ids.AtherosWifi", "AirPortAtheros40"),
+    ],
+    "Aquantia": [
+        ("aquantia_ids.AppleEthernetAquantiaAqtion", "AppleEthernetAquantiaAqtion"),
+    ],
+    "Marvell": [
+        ("marvell_ids.MarvelYukonEthernet", "MarvelYukonEthernet"),
+    ],
+    "SysKonnect": [
+        ("syskonnect_ids.MarvelYukonEthernet", "MarvelYukonEthernet"),
+    ],
+}
+
+_table: dict = None
+_table_lock: threading.Lock = threading.Lock()
+
+
+def _fingerprint() -> str:
+    """
+    Identifies the pci_data.py and LOOKUP_TABLES an artifact was built from
+
+    Returns:
+        str: Fingerprint, or None if pci_data.py isn't available (ex. inside the app bundle)
+    """
+
+    if not PCI_DATA_PATH.exists():
+        return None
+    digest = hashlib.sha256(PCI_DATA_PATH.read_bytes())
+    digest.update(repr(LOOKUP_TABLES).encode())
+    return digest.hexdigest()
+
+
+def build_table() -> dict:
+    """
+    Flatten pci_data into {(device class, device ID): enum member name}
+    """
+
+    from . import pci_data
+
+    table = {}
+    for kind, rules in LOOKUP_TABLES.items():
+        for attribute, member in rules:
+            ids = pci_data
+            for name in attribute.split("."):
+                ids = getattr(ids, name)
+            for device_id in ids:
+                table.setdefault((kind, device_id), member)
+    return table
+
+
+def generate_artifact(path: Path = ARTIFACT_PATH) -> Path:
+    """
+    Write the marshalled table, run at build time
+
+    Returns:
+        Path: The artifact written
+    """
+
+    data = marshal.dumps({"fingerprint": _fingerprint(), "table": build_table()})
+    Path(path).write_bytes(data)
+    return Path(path)
+
+
+def _load_artifact(path: Path = ARTIFACT_PATH) -> dict:
+    """
+    Returns:
+        dict: Table from the artifact, None if missing, unreadable or stale
+    """
+
+    try:
+        artifact = marshal.loads(Path(path).read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+    # In a source checkout, don't trust an artifact older than pci_data.py
+    fingerprint = _fingerprint()
+    if fingerprint is not None and artifact.get("fingerprint") != fingerprint:
+        return None
+    return artifact.get("table")
+
+
+def table() -> dict:
+    """
+    The lookup table, loaded from the artifact or built from pci_data once per process
+    """
+
+    global _table
+
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = _load_artifact() or build_table()
+    return _table
+
+
+def lookup(kind: str, device_id: int) -> str:
+    """
+    Resolve a device to its architecture or chipset
+
+    Parameters:
+        kind      (str): device_probe class name, ex. "NVIDIA" or "IntelEthernet"
+        device_id (int): PCI device ID
+
+    Returns:
+        str: Name of the matching Archs/Chipsets enum member, None if not listed
+    """
+
+    return table().get((kind, device_id))
@@ -17,7 +17,7 @@ from . import ioreg
 from ..support import utilities
 
 from ..datasets import (
-    pci_data,
+    pci_lookup,
     usb_data
 )
 
@@ -355,21 +355,7 @@ class NVIDIA(GPU):
     arch: Archs = field(init=False)
 
     def detect_arch(self):
-        # G80/G80GL
-        if self.device_id in pci_data.nvidia_ids.curie_ids:
-            self.arch = NVIDIA.Archs.Curie
-        elif self.device_id in pci_data.nvidia_ids.tesla_ids:
-            self.arch = NVIDIA.Archs.Tesla
-        elif self.device_id in pci_data.nvidia_ids.fermi_ids:
-            self.arch = NVIDIA.Archs.Fermi
-        elif self.device_id in pci_data.nvidia_ids.kepler_ids:
-            self.arch = NVIDIA.Archs.Kepler
-        elif self.device_id in pci_data.nvidia_ids.maxwell_ids:
-            self.arch = NVIDIA.Archs.Maxwell
-        elif self.device_id in pci_data.nvidia_ids.pascal_ids:
-            self.arch = NVIDIA.Archs.Pascal
-        else:
-            self.arch = NVIDIA.Archs.Unknown
+        self.arch = NVIDIA.Archs[pci_lookup.lookup("NVIDIA", self.device_id) or "Unknown"]
 
 @dataclass
 class NVIDIAEthernet(EthernetController):
@@ -405,28 +391,7 @@ class AMD(GPU):
     arch: Archs = field(init=False)
 
     def detect_arch(self):
-        if self.device_id in pci_data.amd_ids.r500_ids:
-            self.arch = AMD.Archs.R500
-        elif self.device_id in pci_data.amd_ids.gcn_7000_ids:
-            self.arch = AMD.Archs.Legacy_GCN_7000
-        elif self.device_id in pci_data.amd_ids.gcn_8000_ids:
-            self.arch = AMD.Archs.Legacy_GCN_8000
-        elif self.device_id in pci_data.amd_ids.gcn_9000_ids:
-            self.arch = AMD.Archs.Legacy_GCN_9000
-        elif self.device_id in pci_data.amd_ids.terascale_1_ids:
-            self.arch = AMD.Archs.TeraScale_1
-        elif self.device_id in pci_data.amd_ids.terascale_2_ids:
-            self.arch = AMD.Archs.TeraScale_2
-        elif self.device_id in pci_data.amd_ids.polaris_ids:
-            self.arch = AMD.Archs.Polaris
-        elif self.device_id in pci_data.amd_ids.polaris_spoof_ids:
-            self.arch = AMD.Archs.Polaris_Spoof
-        elif self.device_id in pci_data.amd_ids.vega_ids:
-            self.arch = AMD.Archs.Vega
-        elif self.device_id in pci_data.amd_ids.navi_ids:
-            self.arch = AMD.Archs.Navi
-        else:
-            self.arch = AMD.Archs.Unknown
+        self.arch = AMD.Archs[pci_lookup.lookup("AMD", self.device_id) or "Unknown"]
 
 
 @dataclass
@@ -452,32 +417,7 @@ class Intel(GPU):
     arch: Archs = field(init=False)
 
     def detect_arch(self):
-        if self.device_id in pci_data.intel_ids.gma_950_ids:
-            self.arch = Intel.Archs.GMA_950
-        elif self.device_id in pci_data.intel_ids.gma_x3100_ids:
-            self.arch = Intel.Archs.GMA_X3100
-        elif self.device_id in pci_data.intel_ids.iron_ids:
-            self.arch = Intel.Archs.Iron_Lake
-        elif self.device_id in pci_data.intel_ids.sandy_ids:
-            self.arch = Intel.Archs.Sandy_Bridge
-        elif self.device_id in pci_data.intel_ids.ivy_ids:
-            self.arch = Intel.Archs.Ivy_Bridge
-        elif self.device_id in pci_data.intel_ids.haswell_ids:
-            self.arch = Intel.Archs.Haswell
-        elif self.device_id in pci_data.intel_ids.broadwell_ids:
-            self.arch = Intel.Archs.Broadwell
-        elif self.device_id in pci_data.intel_ids.skylake_ids:
-            self.arch = Intel.Archs.Skylake
-        elif self.device_id in pci_data.intel_ids.kaby_lake_ids:
-            self.arch = Intel.Archs.Kaby_Lake
-        elif self.device_id in pci_data.intel_ids.coffee_lake_ids:
-            self.arch = Intel.Archs.Coffee_Lake
-        elif self.device_id in pci_data.intel_ids.comet_lake_ids:
-            self.arch = Intel.Archs.Comet_Lake
-        elif self.device_id in pci_data.intel_ids.ice_lake_ids:
-            self.arch = Intel.Archs.Ice_Lake
-        else:
-            self.arch = Intel.Archs.Unknown
+        self.arch = Intel.Archs[pci_lookup.lookup("Intel", self.device_id) or "Unknown"]
 
 @dataclass
 class IntelEthernet(EthernetController):
@@ -492,14 +432,7 @@ class IntelEthernet(EthernetController):
     chipset: Chipsets = field(init=False)
 
     def detect_chipset(self):
-        if self.device_id in pci_data.intel_ids.AppleIntel8254XEthernet:
-            self.chipset = IntelEthernet.Chipsets.AppleIntel8254XEthernet
-        elif self.device_id in pci_data.intel_ids.AppleIntelI210Ethernet:
-            self.chipset = IntelEthernet.Chipsets.AppleIntelI210Ethernet
-        elif self.device_id in pci_data.intel_ids.Intel82574L:
-            self.chipset = IntelEthernet.Chipsets.Intel82574L
-        else:
-            self.chipset = IntelEthernet.Chipsets.Unknown
+        self.chipset = IntelEthernet.Chipsets[pci_lookup.lookup("IntelEthernet", self.device_id) or "Unknown"]
 
 @dataclass
 class Broadcom(WirelessCard):
@@ -518,20 +451,7 @@ class Broadcom(WirelessCard):
     chipset: Chipsets = field(init=False)
 
     def detect_chipset(self):
-        if self.device_id in pci_data.broadcom_ids.AppleBCMWLANBusInterfacePCIe:
-            self.chipset = Broadcom.Chipsets.AppleBCMWLANBusInterfacePCIe
-        elif self.device_id in pci_data.broadcom_ids.AirPortBrcmNIC:
-            self.chipset = Broadcom.Chipsets.AirportBrcmNIC
-        elif self.device_id in pci_data.broadcom_ids.AirPortBrcmNICThirdParty:
-            self.chipset = Broadcom.Chipsets.AirPortBrcmNICThirdParty
-        elif self.device_id in pci_data.broadcom_ids.AirPortBrcm4360:
-            self.chipset = Broadcom.Chipsets.AirPortBrcm4360
-        elif self.device_id in pci_data.broadcom_ids.AirPortBrcm4331:
-            self.chipset = Broadcom.Chipsets.AirPortBrcm4331
-        elif self.device_id in pci_data.broadcom_ids.AppleAirPortBrcm43224:
-            self.chipset = Broadcom.Chipsets.AirPortBrcm43224
-        else:
-            self.chipset = Broadcom.Chipsets.Unknown
+        self.chipset = Broadcom.Chipsets[pci_lookup.lookup("Broadcom", self.device_id) or "Unknown"]
 
 @dataclass
 class BroadcomEthernet(EthernetController):
@@ -544,10 +464,7 @@ class BroadcomEthernet(EthernetController):
     chipset: Chipsets = field(init=False)
 
     def detect_chipset(self):
-        if self.device_id in pci_data.broadcom_ids.AppleBCM5701Ethernet:
-            self.chipset = BroadcomEthernet.Chipsets.AppleBCM5701Ethernet
-        else:
-            self.chipset = BroadcomEthernet.Chipsets.Unknown
+        self.chipset = BroadcomEthernet.Chipsets[pci_lookup.lookup("BroadcomEthernet", self.device_id) or "Unknown"]
 
 @dataclass
 class Atheros(WirelessCard):
@@ -562,10 +479,7 @@ class Atheros(WirelessCard):
     chipset: Chipsets = field(init=False)
 
     def detect_chipset(self):
-        if self.device_id in pci_data.atheros_ids.AtherosWifi:
-            self.chipset = Atheros.Chipsets.AirPortAtheros40
-        else:
-            self.chipset = Atheros.Chipsets.Unknown
+        self.chipset = Atheros.Chipsets[pci_lookup.lookup("Atheros", self.device_id) or "Unknown"]
 
 
 @dataclass
@@ -580,10 +494,7 @@ class Aquantia(EthernetController):
     chipset: Chipsets = field(init=False)
 
     def detect_chipset(self):
-        if self.device_id in pci_data.aquantia_ids.AppleEthernetAquantiaAqtion:
-            self.chipset = Aquantia.Chipsets.AppleEthernetAquantiaAqtion
-        else:
-            self.chipset = Aquantia.Chipsets.Unknown
+        self.chipset = Aquantia.Chipsets[pci_lookup.lookup("Aquantia", self.device_id) or "Unknown"]
 
 @dataclass
 class Marvell(EthernetController):
@@ -596,10 +507,7 @@ class Marvell(EthernetController):
     chipset: Chipsets = field(init=False)
 
     def detect_chipset(self):
-        if self.device_id in pci_data.marvell_ids.MarvelYukonEthernet:
-            self.chipset = Marvell.Chipsets.MarvelYukonEthernet
-        else:
-            self.chipset = Marvell.Chipsets.Unknown
+        self.chipset = Marvell.Chipsets[pci_lookup.lookup("Marvell", self.device_id) or "Unknown"]
 
 @dataclass
 class SysKonnect(EthernetController):
@@ -612,10 +520,7 @@ class SysKonnect(EthernetController):
     chipset: Chipsets = field(init=False)
 
     def detect_chipset(self):
-        if self.device_id in pci_data.syskonnect_ids.MarvelYukonEthernet:
-            self.chipset = SysKonnect.Chipsets.MarvelYukonEthernet
-        else:
-            self.chipset = SysKonnect.Chipsets.Unknown
+        self.chipset = SysKonnect.Chipsets[pci_lookup.lookup("SysKonnect", self.device_id) or "Unknown"]
 
 
 @dataclass
@@ -656,7 +561,11 @@ class Computer:
     rosetta_active: Optional[bool] = False
 
     @staticmethod
-    def probe():
+    def probe(backend=None):
+        if backend is not None:
+            # Offline backends (see offline_probe.py) build the Computer without IOKit
+            return backend.probe()
+
         computer = Computer()
         computer.gpu_probe()
         computer.dgpu_probe()
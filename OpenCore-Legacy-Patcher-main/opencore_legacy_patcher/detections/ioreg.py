@@ -3,13 +3,20 @@ ioreg.py: PyObjc Handling for IOKit
 """
 
 from typing import NewType, Union
-import objc
 
-from CoreFoundation import CFRelease, kCFAllocatorDefault  # type: ignore # pylint: disable=no-name-in-module
-from Foundation import NSBundle  # type: ignore # pylint: disable=no-name-in-module
-from PyObjCTools import Conversion
+try:
+    import objc
 
-IOKit_bundle = NSBundle.bundleWithIdentifier_("com.apple.framework.IOKit")
+    from CoreFoundation import CFRelease, kCFAllocatorDefault  # type: ignore # pylint: disable=no-name-in-module
+    from Foundation import NSBundle  # type: ignore # pylint: disable=no-name-in-module
+    from PyObjCTools import Conversion
+except ImportError:
+    # Not on macOS (ex. offline_probe on a Linux build node), the IOKit functions
+    # below stay unimplemented and only the IORegistry probes are unavailable
+    objc = None
+    kCFAllocatorDefault = None
+
+IOKit_bundle = NSBundle.bundleWithIdentifier_("com.apple.framework.IOKit") if objc else None
 
 # pylint: disable=invalid-name
 io_name_t_ref_out = b"[128c]"  # io_name_t is char[128]
@@ -201,8 +208,9 @@ def IORegistryEntryFromPath(mainPort: mach_port_t, path: io_string_t) -> io_regi
     raise NotImplementedError
 
 
-objc.loadBundleFunctions(IOKit_bundle, globals(), functions)  # type: ignore # pylint: disable=no-member
-objc.loadBundleVariables(IOKit_bundle, globals(), variables)  # type: ignore # pylint: disable=no-member
+if objc:
+    objc.loadBundleFunctions(IOKit_bundle, globals(), functions)  # type: ignore # pylint: disable=no-member
+    objc.loadBundleVariables(IOKit_bundle, globals(), variables)  # type: ignore # pylint: disable=no-member
 
 
 def ioiterator_to_list(iterator: io_iterator_t):
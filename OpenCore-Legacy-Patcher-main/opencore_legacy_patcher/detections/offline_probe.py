@@ -0,0 +1,522 @@
+"""
+offline_probe.py: Build device_probe.Computer objects without IOKit
+
+Used to build an EFI for a machine other than the one running the patcher,
+ex. on Linux build nodes. Backends return the same Computer, GPU, WirelessCard,
+etc. objects device_probe builds from the IORegistry:
+
+- SysfsBackend:   Linux sysfs/procfs tree, either live ("/") or captured with
+                  MultiBoot's `detect_hardware.py --capture`
+- ProfileBackend: Hardware profile JSON saved by MultiBoot's detect_hardware.py
+
+Usage:
+>>> computer = device_probe.Computer.probe(offline_probe.SysfsBackend("/"))
+>>> computer = device_probe.Computer.probe(offline_probe.ProfileBackend("HardwareProfiles/current.json", model="MacBookPro11,1"))
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import dataclasses
+import importlib.util
+
+from pathlib import Path
+
+from . import device_probe
+
+
+OCLP_NVRAM_GUID: str = "4d1fda02-38c7-4a6a-9cc6-4bcca8b30102"
+
+# Linux /proc/cpuinfo flag -> machdep.cpu.features name
+CPU_FEATURES: dict = {
+    "fpu": "FPU", "vme": "VME", "de": "DE", "pse": "PSE", "tsc": "TSC", "msr": "MSR", "pae": "PAE",
+    "mce": "MCE", "cx8": "CX8", "apic": "APIC", "sep": "SEP", "mtrr": "MTRR", "pge": "PGE", "mca": "MCA",
+    "cmov": "CMOV", "pat": "PAT", "pse36": "PSE36", "clflush": "CLFSH", "dts": "DS", "acpi": "ACPI",
+    "mmx": "MMX", "fxsr": "FXSR", "sse": "SSE", "sse2": "SSE2", "ss": "SS", "ht": "HTT", "tm": "TM",
+    "pbe": "PBE", "pni": "SSE3", "pclmulqdq": "PCLMULQDQ", "dtes64": "DTES64", "monitor": "MON",
+    "ds_cpl": "DSCPL", "vmx": "VMX", "smx": "SMX", "est": "EST", "tm2": "TM2", "ssse3": "SSSE3",
+    "fma": "FMA", "cx16": "CX16", "xtpr": "TPR", "pdcm": "PDCM", "pcid": "PCID", "dca": "DCA",
+    "sse4_1": "SSE4.1", "sse4_2": "SSE4.2", "x2apic": "x2APIC", "movbe": "MOVBE", "popcnt": "POPCNT",
+    "tsc_deadline_timer": "TSCTMR", "aes": "AES", "xsave": "XSAVE", "avx": "AVX1.0", "f16c": "F16C",
+    "rdrand": "RDRAND",
+}
+
+# Linux /proc/cpuinfo flag -> machdep.cpu.leaf7_features name
+CPU_LEAF7_FEATURES: dict = {
+    "fsgsbase": "RDWRFSGS", "tsc_adjust": "TSC_THREAD_OFFSET", "sgx": "SGX", "bmi1": "BMI1", "hle": "HLE",
+    "avx2": "AVX2", "smep": "SMEP", "bmi2": "BMI2", "erms": "ERMS", "invpcid": "INVPCID", "rtm": "RTM",
+    "mpx": "MPX", "avx512f": "AVX512F", "avx512dq": "AVX512DQ", "rdseed": "RDSEED", "adx": "ADX",
+    "smap": "SMAP", "avx512ifma": "AVX512IFMA", "clflushopt": "CLFSOPT", "clwb": "CLWB", "intel_pt": "IPT",
+    "avx512cd": "AVX512CD", "sha_ni": "SHA", "avx512bw": "AVX512BW", "avx512vl": "AVX512VL",
+    "umip": "UMIP", "pku": "PKU", "ospke": "OSPKE", "md_clear": "MDCLEAR", "tsx_force_abort": "TSXFA",
+    "ibrs": "IBRS", "stibp": "STIBP", "flush_l1d": "L1DF", "ssbd": "SSBD",
+}
+
+# sysfs "speed" (Mbit/s) -> USBDevice.Speed value
+USB_SPEEDS: dict = {"1.5": 0x01, "12": 0x02, "480": 0x03, "5000": 0x04, "10000": 0x05, "20000": 0x05}
+
+# Profiles from the lspci based detector don't record class codes
+PROFILE_CLASS_CODES: dict = {
+    "gpu":     {None: 0x030000},
+    "network": {"WiFi": 0x028000, "Ethernet": 0x020000},
+    "storage": {"NVMe": 0x010802, "SATA": 0x010601, "RAID": 0x010400},
+}
+
+# Sorted into Computer in the same order the IORegistry probes use
+CONTROLLER_CLASSES: list = [
+    (device_probe.SATAController, "storage"),
+    (device_probe.SASController,  "storage"),
+    (device_probe.NVMeController, "storage"),
+    (device_probe.XHCIController, "usb_controllers"),
+    (device_probe.EHCIController, "usb_controllers"),
+    (device_probe.OHCIController, "usb_controllers"),
+    (device_probe.UHCIController, "usb_controllers"),
+    (device_probe.SDXCController, "sdxc_controller"),
+]
+
+PCI_SLOT_PATTERN: re.Pattern = re.compile(r"^[0-9a-f]{4}:([0-9a-f]{2}):([0-9a-f]{2})\.([0-7])$")
+
+# MultiBoot's sysfs reader, shared so both build the same PCI paths
+SYSFS_PROBE_PATH: Path = Path(__file__).resolve().parents[3] / "BootScripts" / "sysfs_probe.py"
+
+_sysfs_probe = None
+
+
+def _read_text(path: Path) -> str:
+    """
+    Read a small sysfs/procfs file, None if missing or unreadable
+    """
+
+    try:
+        return Path(path).read_text(errors="replace").strip()
+    except OSError:
+        return None
+
+
+def _parse_hex(value) -> int:
+    """
+    "0x8086", "8086" or 32902 -> 32902, None if unparsable
+    """
+
+    if isinstance(value, int):
+        return value
+    try:
+        return int(str(value), 16)
+    except (TypeError, ValueError):
+        return None
+
+
+def _acpi_name(acpi_path: str) -> str:
+    """
+    "\\_SB_.PCI0.RP05.ARPT" -> "ARPT", matching the IORegistry entry name
+    """
+
+    if not acpi_path:
+        return None
+    return acpi_path.rpartition(".")[2].rstrip("_") or None
+
+
+def _root_bus_pci_path(slot: str) -> str:
+    """
+    "0000:00:1f.6" -> "PciRoot(0x0)/Pci(0x1f,0x6)", None for devices behind a bridge
+
+    Used when the topology wasn't recorded (captured trees, saved profiles)
+    """
+
+    match = PCI_SLOT_PATTERN.match(slot or "")
+    if not match or match.group(1) != "00":
+        return None
+    return f"PciRoot(0x0)/Pci({hex(int(match.group(2), 16))},{hex(int(match.group(3)))})"
+
+
+def _load_sysfs_probe():
+    """
+    Load BootScripts/sysfs_probe.py by path, None when running outside a MultiBoot checkout
+    """
+
+    global _sysfs_probe
+    if _sysfs_probe is None:
+        _sysfs_probe = False
+        if SYSFS_PROBE_PATH.exists():
+            spec = importlib.util.spec_from_file_location("sysfs_probe", SYSFS_PROBE_PATH)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _sysfs_probe = module
+    return _sysfs_probe or None
+
+
+def _specialize(device: device_probe.PCIDevice, cls: type) -> device_probe.PCIDevice:
+    """
+    Rebuild a generic PCIDevice as a subclass, running its arch/chipset detection
+    """
+
+    return cls(**{field.name: getattr(device, field.name) for field in dataclasses.fields(device_probe.PCIDevice)})
+
+
+def cpu_from_flags(name: str, flags: list) -> device_probe.CPU:
+    """
+    Build a CPU from Linux cpuinfo flags, translated to the names sysctl reports on macOS
+
+    Parameters:
+        name   (str): CPU brand string
+        flags (list): Linux flags, ex. ["sse4_2", "avx", "avx2"]
+    """
+
+    flags = set(flags)
+    return device_probe.CPU(
+        name,
+        [macos for linux, macos in CPU_FEATURES.items() if linux in flags],
+        [macos for linux, macos in CPU_LEAF7_FEATURES.items() if linux in flags],
+    )
+
+
+class OfflineBackend:
+    """
+    Base class for backends, assembles a Computer from what subclasses read
+
+    Subclasses implement pci_devices() and cpu(), and may override the rest
+
+    Parameters:
+        model (str): Model to report instead of the one detected, ex. when
+                     the source is a non-Mac or the profile lacks DMI data
+    """
+
+    def __init__(self, model: str = None) -> None:
+        self.model: str = model
+
+
+    def pci_devices(self) -> list:
+        """
+        Returns:
+            list: Generic device_probe.PCIDevice objects, vendor classes are picked later
+        """
+
+        raise NotImplementedError
+
+
+    def cpu(self) -> device_probe.CPU:
+        raise NotImplementedError
+
+
+    def usb_devices(self) -> list:
+        """
+        Returns:
+            list: Detected device_probe.USBDevice objects
+        """
+
+        return []
+
+
+    def dmi(self) -> dict:
+        """
+        Returns:
+            dict: DMI fields as named under /sys/class/dmi/id, ex. product_name
+        """
+
+        return {}
+
+
+    def nvram(self, name: str) -> str:
+        """
+        Read a variable under the OpenCore vendor GUID, None if unavailable
+        """
+
+        return None
+
+
+    def platform_probe(self, computer: device_probe.Computer) -> None:
+        """
+        Fill in flags without a PCI/USB source (ambient light sensor, SATA SSD)
+        """
+
+        pass
+
+
+    def probe(self) -> device_probe.Computer:
+        """
+        Build the Computer
+
+        Returns:
+            device_probe.Computer: Populated like Computer.probe() on a Mac
+        """
+
+        computer = device_probe.Computer()
+
+        self._sort_pci_devices(computer, self.pci_devices())
+        self._smbios_probe(computer)
+
+        computer.usb_devices = self.usb_devices()
+        computer.cpu = self.cpu()
+        computer.bluetooth_probe()
+        computer.topcase_probe()
+        computer.t1_probe()
+
+        self.platform_probe(computer)
+
+        logging.info(f"Offline probe ({type(self).__name__}): {computer.real_model}, {len(computer.gpus)} GPU(s), {len(computer.ethernet)} Ethernet, {'Wi-Fi' if computer.wifi else 'no Wi-Fi'}")
+        return computer
+
+
+    def _sort_pci_devices(self, computer: device_probe.Computer, devices: list) -> None:
+        """
+        Pick vendor classes and place devices the way the IORegistry probes do
+        """
+
+        for device in devices:
+            # CMRA/14E4:1570
+            if (device.vendor_id, device.device_id) == (0x14E4, 0x1570):
+                computer.pcie_webcam = True
+
+            if device.class_code in device_probe.GPU.CLASS_CODES:
+                vendor = device.vendor_detect(inherits=device_probe.GPU)
+                if not vendor:
+                    continue
+                gpu = _specialize(device, vendor)
+                computer.gpus.append(gpu)
+                if device.name == "GFX0":
+                    computer.dgpu = gpu
+                elif device.name == "IGPU":
+                    computer.igpu = gpu
+
+            elif device.class_code in device_probe.WirelessCard.CLASS_CODES:
+                if computer.wifi:
+                    continue
+                vendor = device.vendor_detect(inherits=device_probe.WirelessCard)
+                if vendor:
+                    computer.wifi = _specialize(device, vendor)
+                    computer.wifi.country_code = None
+
+            elif device.class_code in device_probe.EthernetController.CLASS_CODES:
+                vendor = device.vendor_detect(inherits=device_probe.EthernetController)
+                if vendor:
+                    computer.ethernet.append(_specialize(device, vendor))
+
+        for cls, attribute in CONTROLLER_CLASSES:
+            for device in devices:
+                if device.class_code not in cls.CLASS_CODES:
+                    continue
+                controller = _specialize(device, cls)
+                if isinstance(controller, device_probe.NVMeController):
+                    controller.aspm = 0
+                getattr(computer, attribute).append(controller)
+
+
+    def _smbios_probe(self, computer: device_probe.Computer) -> None:
+        dmi = self.dmi()
+
+        computer.reported_model    = self.model or dmi.get("product_name")
+        computer.reported_board_id = dmi.get("board_name")
+        if dmi.get("product_uuid"):
+            computer.uuid_sha1 = hashlib.sha1(dmi["product_uuid"].upper().encode()).hexdigest()
+
+        computer.real_model    = self.model or self.nvram("oem-product") or computer.reported_model
+        computer.real_board_id = self.nvram("oem-board") or computer.reported_board_id
+        computer.build_model   = self.nvram("OCLP-Model")
+
+        computer.oclp_version     = self.nvram("OCLP-Version")
+        computer.opencore_version = self.nvram("opencore-version")
+        computer.opencore_path    = self.nvram("boot-path")
+
+        if dmi.get("bios_vendor"):
+            computer.firmware_vendor = "Apple" if dmi["bios_vendor"].startswith("Apple") else dmi["bios_vendor"]
+
+
+class SysfsBackend(OfflineBackend):
+    """
+    Probe a Linux sysfs/procfs tree
+
+    Parameters:
+        root  (str): "/" for the running machine, or a tree captured with detect_hardware.py --capture
+        model (str): Override the DMI model
+    """
+
+    def __init__(self, root: str = "/", model: str = None) -> None:
+        super().__init__(model)
+        self.root: Path = Path(root)
+
+
+    def _pci_path(self, device_dir: Path, slot: str) -> str:
+        """
+        Build the gfxutil style path from the sysfs topology, see sysfs_probe.pci_path()
+
+        Captured trees don't keep the topology, in which case only devices on
+        the root bus get a path
+        """
+
+        sysfs_probe = _load_sysfs_probe()
+        if sysfs_probe:
+            path = sysfs_probe.pci_path(device_dir)
+            if path:
+                return path
+
+        return _root_bus_pci_path(slot)
+
+
+    def pci_devices(self) -> list:
+        devices = []
+        pci_dir = self.root / "sys/bus/pci/devices"
+        if not pci_dir.is_dir():
+            logging.warning(f"No PCI devices under {pci_dir}")
+            return devices
+
+        for entry in sorted(os.scandir(pci_dir), key=lambda entry: entry.name):
+            device_dir = Path(entry.path)
+            vendor_id  = _parse_hex(_read_text(device_dir / "vendor"))
+            device_id  = _parse_hex(_read_text(device_dir / "device"))
+            class_code = _parse_hex(_read_text(device_dir / "class"))
+            if None in (vendor_id, device_id, class_code):
+                continue
+
+            acpi_path = _read_text(device_dir / "firmware_node" / "path")
+            device = device_probe.PCIDevice(
+                vendor_id, device_id, class_code,
+                name=_acpi_name(acpi_path) or f"pci{vendor_id:x},{device_id:x}",
+                acpi_path=acpi_path,
+                pci_path=self._pci_path(device_dir, entry.name),
+            )
+            device.vendor_id_unspoofed = vendor_id
+            device.device_id_unspoofed = device_id
+            devices.append(device)
+
+        return devices
+
+
+    def usb_devices(self) -> list:
+        devices = []
+        usb_dir = self.root / "sys/bus/usb/devices"
+        if not usb_dir.is_dir():
+            return devices
+
+        for entry in sorted(os.scandir(usb_dir), key=lambda entry: entry.name):
+            # Skip root hubs (usbN) and interfaces (1-1:1.0), macOS lists neither as IOUSBDevice
+            if entry.name.startswith("usb") or ":" in entry.name:
+                continue
+            device_dir = Path(entry.path)
+            vendor_id = _parse_hex(_read_text(device_dir / "idVendor"))
+            if vendor_id is None:
+                continue
+
+            device = device_probe.USBDevice(
+                vendor_id,
+                _parse_hex(_read_text(device_dir / "idProduct")),
+                _parse_hex(_read_text(device_dir / "bDeviceClass")),
+                USB_SPEEDS.get(_read_text(device_dir / "speed")),
+                _read_text(device_dir / "product") or "N/A",
+                _read_text(device_dir / "manufacturer"),
+                _read_text(device_dir / "serial"),
+            )
+            device.detect()
+            devices.append(device)
+
+        return devices
+
+
+    def cpu(self) -> device_probe.CPU:
+        cpuinfo = _read_text(self.root / "proc/cpuinfo") or ""
+
+        # Only the first processor block, the rest repeat it
+        fields = {}
+        for line in cpuinfo.split("\n\n")[0].splitlines():
+            key, _, value = line.partition(":")
+            fields.setdefault(key.strip(), value.strip())
+
+        return cpu_from_flags(fields.get("model name", ""), fields.get("flags", "").split())
+
+
+    def dmi(self) -> dict:
+        dmi = {}
+        for field in ["product_name", "board_name", "bios_vendor", "product_uuid"]:
+            value = _read_text(self.root / "sys/class/dmi/id" / field)
+            if value:
+                dmi[field] = value
+        return dmi
+
+
+    def nvram(self, name: str) -> str:
+        # efivarfs prefixes the value with 4 bytes of attributes
+        try:
+            value = (self.root / "sys/firmware/efi/efivars" / f"{name}-{OCLP_NVRAM_GUID}").read_bytes()[4:]
+        except OSError:
+            return None
+        return value.replace(b"\x00", b"").decode(errors="replace") or None
+
+
+    def platform_probe(self, computer: device_probe.Computer) -> None:
+        # ALS0 is enumerated by its ACPI HID
+        computer.ambient_light_sensor = any((self.root / "sys/bus/acpi/devices").glob("ACPI0008:*"))
+
+        # Non-rotational disks behind an AHCI (libata) controller, not made by Apple
+        for disk in (self.root / "sys/block").glob("sd*"):
+            if _read_text(disk / "queue/rotational") != "0":
+                continue
+            if "/ata" not in os.path.realpath(disk / "device"):
+                continue
+            if "apple" in (_read_text(disk / "device/model") or "").lower():
+                continue
+            computer.third_party_sata_ssd = True
+            break
+
+
+class ProfileBackend(OfflineBackend):
+    """
+    Probe a hardware profile saved by MultiBoot's detect_hardware.py
+
+    Profiles hold PCI devices, CPU and DMI data only: USB devices (and with
+    them Bluetooth and topcase detection) aren't recorded, nor is NVRAM.
+    Profiles from the older lspci based detector also lack CPU flags and DMI,
+    pass model explicitly for those
+
+    Parameters:
+        path  (str): Profile JSON, or an already loaded profile dict
+        model (str): Override the DMI model
+    """
+
+    def __init__(self, path, model: str = None) -> None:
+        super().__init__(model)
+        self.profile: dict = path if isinstance(path, dict) else json.loads(Path(path).read_text())
+
+
+    def pci_devices(self) -> list:
+        devices = []
+        for section, class_codes in PROFILE_CLASS_CODES.items():
+            for entry in self.profile.get(section, []):
+                class_code = _parse_hex(entry.get("class_code")) or class_codes.get(entry.get("type"))
+                if class_code is None:
+                    continue
+                vendor_id = _parse_hex(entry.get("vendor_id")) or 0
+                device_id = _parse_hex(entry.get("device_id")) or 0
+
+                device = device_probe.PCIDevice(
+                    vendor_id, device_id, class_code,
+                    name=_acpi_name(entry.get("acpi_path")) or f"pci{vendor_id:x},{device_id:x}",
+                    acpi_path=entry.get("acpi_path") or None,
+                    pci_path=entry.get("pci_path") or _root_bus_pci_path(entry.get("slot")),
+                )
+                device.vendor_id_unspoofed = vendor_id
+                device.device_id_unspoofed = device_id
+                devices.append(device)
+
+        return devices
+
+
+    def cpu(self) -> device_probe.CPU:
+        cpu = self.profile.get("cpu", {})
+        if "flags" not in cpu:
+            logging.warning("Hardware profile has no CPU flags, CPU feature checks will treat every feature as missing")
+        return cpu_from_flags(cpu.get("name", ""), cpu.get("flags", []))
+
+
+    def dmi(self) -> dict:
+        return self.profile.get("dmi", {})
+
+
+def backend_for(path: str, model: str = None) -> OfflineBackend:
+    """
+    Pick a backend for a path: directories are sysfs trees, files are profiles
+    """
+
+    if Path(path).is_dir():
+        return SysfsBackend(path, model)
+    return ProfileBackend(path, model)
@@ -6,7 +6,6 @@ import copy
 import pickle
 import shutil
 import logging
-import zipfile
 import plistlib
 
 from pathlib import Path
@@ -14,7 +13,7 @@ from datetime import date
 
 from .. import constants
 
-from ..support import utilities
+from ..support import utilities, kext_graph
 
 from .networking import (
     wired,
@@ -28,7 +27,9 @@ from . import (
     storage,
     smbios,
     security,
-    misc
+    misc,
+    incremental,
+    template_cache
 )
 
 
@@ -104,19 +105,26 @@ class BuildOpenCore:
         if Path(self.constants.opencore_zip_copied).exists():
             logging.info("Deleting old copy of OpenCore zip")
             Path(self.constants.opencore_zip_copied).unlink()
-        if Path(self.constants.opencore_release_folder).exists():
+
+        # Filled by BuildSupport.enable_kext() and cleanup(), saved once the build is validated
+        self.constants.build_manifest = incremental.IncrementalBuild(self.model, self.constants) if self.constants.incremental_build is True else None
+        if self.constants.build_manifest is not None:
+            self.constants.build_manifest.prepare()
+        elif Path(self.constants.opencore_release_folder).exists():
             logging.info("Deleting old copy of OpenCore folder")
             shutil.rmtree(self.constants.opencore_release_folder, onerror=rmtree_handler, ignore_errors=True)
 
         logging.info("")
         logging.info(f"- Adding OpenCore v{self.constants.opencore_version} {'DEBUG' if self.constants.opencore_debug is True else 'RELEASE'}")
-        shutil.copy(self.constants.opencore_zip_source, self.constants.build_path)
-        zipfile.ZipFile(self.constants.opencore_zip_copied).extractall(self.constants.build_path)
+        if template_cache.extract_opencore(self.constants.opencore_zip_source, self.constants.build_path, self.constants.opencore_template_cache):
+            logging.info("- Reused cached OpenCore base")
 
-        # Setup config.plist for editing
+        # Setup config.plist for editing, written out by _save_config()
         logging.info("- Adding config.plist for OpenCore")
-        shutil.copy(self.constants.plist_template, self.constants.oc_folder)
-        self.config = plistlib.load(Path(self.constants.plist_path).open("rb"))
+        self.config = template_cache.load_config_template(self.constants.plist_template)
+
+        # Filled by BuildSupport.enable_kext(), checked in validate_pathing()
+        self.constants.kext_graph = kext_graph.KextGraph()
 
 
     def _set_revision(self) -> None:
@@ -167,6 +175,8 @@ class BuildOpenCore:
         # Post-build handling
         support.BuildSupport(self.model, self.constants, self.config).sign_files()
         support.BuildSupport(self.model, self.constants, self.config).validate_pathing()
+        if self.constants.build_manifest is not None:
+            self.constants.build_manifest.save()
 
         logging.info("")
         logging.info(f"Your OpenCore EFI for {self.model} has been built at:")
@@ -0,0 +1,248 @@
+"""
+config_diff.py: Structured diff and patch of config.plist trees
+
+A patch is an ordered list of plist-serializable operations, so it can be saved
+with plistlib and applied elsewhere:
+    {"Op": "Remove",  "Path": [...]}
+    {"Op": "Add",     "Path": [...], "Value": ...,  "Index": int (arrays only)}
+    {"Op": "Replace", "Path": [...], "Value": ...}
+    {"Op": "Order",   "Path": [...], "Key": str, "Value": [identifiers]}
+
+Path components are dict keys (str), array indexes (int), or, for arrays of
+dicts identified by BundlePath or Path (Kernel -> Add, UEFI -> Drivers, etc.),
+a selector such as {"BundlePath": "Lilu.kext"}. This way a kext added in the
+middle of Kernel -> Add becomes one Add, not a rewrite of every entry after it.
+
+Operations are ordered so they can be applied front to back: within an array,
+removals come first, then reordering, then changes to existing entries, then
+additions at their final index.
+"""
+
+import copy
+import marshal
+import plistlib
+
+from pathlib import Path
+
+
+# Keys identifying array entries, first one present and unique in every entry wins
+IDENTITY_KEYS: tuple = ("BundlePath", "Path")
+
+
+def _identical(a, b) -> bool:
+    """
+    Equal including types, plistlib tells <true/> and <integer>1</integer> apart while == doesn't
+    """
+
+    if type(a) is not type(b) or a != b:
+        return False
+    if not isinstance(a, (dict, list)):
+        return True
+    try:
+        # Compares types as well, in C. Differs for equal dicts with a different key order
+        if marshal.dumps(a) == marshal.dumps(b):
+            return True
+    except ValueError:
+        # Holds types marshal can't handle (ex. datetime)
+        pass
+    if isinstance(a, dict):
+        return all(_identical(value, b[key]) for key, value in a.items())
+    return all(_identical(x, y) for x, y in zip(a, b))
+
+
+def _identity_key(*arrays: list) -> str:
+    """
+    Key usable to match entries across the arrays, None if entries have to be matched by index
+    """
+
+    for key in IDENTITY_KEYS:
+        if all(
+            all(isinstance(entry, dict) and isinstance(entry.get(key), str) for entry in array) and len({entry[key] for entry in array}) == len(array)
+            for array in arrays
+        ):
+            return key
+    return None
+
+
+def diff(old: dict, new: dict) -> list:
+    """
+    Generate the patch that turns old into new
+
+    Parameters:
+        old (dict): Original config, ex. the one installed on the ESP
+        new (dict): Updated config, ex. a fresh build
+
+    Returns:
+        list: Operations, empty if the configs are identical
+    """
+
+    patch = []
+    _diff(old, new, [], patch)
+    return patch
+
+
+def _diff(old, new, path: list, patch: list) -> None:
+    if _identical(old, new):
+        return
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                patch.append({"Op": "Remove", "Path": path + [key]})
+        for key, value in new.items():
+            if key not in old:
+                patch.append({"Op": "Add", "Path": path + [key], "Value": copy.deepcopy(value)})
+            else:
+                _diff(old[key], value, path + [key], patch)
+        return
+
+    if isinstance(old, list) and isinstance(new, list) and (old or new):
+        key = _identity_key(old, new)
+        if key is not None:
+            _diff_keyed(old, new, key, path, patch)
+            return
+        if len(old) == len(new) and all(isinstance(entry, (dict, list)) for entry in old + new):
+            # Same entries, in place (ex. Kernel -> Patch with one toggled)
+            for index, (old_entry, new_entry) in enumerate(zip(old, new)):
+                _diff(old_entry, new_entry, path + [index], patch)
+            return
+
+    patch.append({"Op": "Replace", "Path": path, "Value": copy.deepcopy(new)})
+
+
+def _diff_keyed(old: list, new: list, key: str, path: list, patch: list) -> None:
+    old_entries = {entry[key]: entry for entry in old}
+    new_ids = {entry[key] for entry in new}
+
+    for entry in old:
+        if entry[key] not in new_ids:
+            patch.append({"Op": "Remove", "Path": path + [{key: entry[key]}]})
+
+    kept_old = [entry[key] for entry in old if entry[key] in new_ids]
+    kept_new = [entry[key] for entry in new if entry[key] in old_entries]
+    if kept_old != kept_new:
+        patch.append({"Op": "Order", "Path": path, "Key": key, "Value": kept_new})
+
+    for entry in new:
+        if entry[key] in old_entries:
+            _diff(old_entries[entry[key]], entry, path + [{key: entry[key]}], patch)
+
+    for index, entry in enumerate(new):
+        if entry[key] not in old_entries:
+            patch.append({"Op": "Add", "Path": path + [{key: entry[key]}], "Value": copy.deepcopy(entry), "Index": index})
+
+
+def _select(array: list, selector: dict) -> int:
+    (key, value), = selector.items()
+    for index, entry in enumerate(array):
+        if isinstance(entry, dict) and entry.get(key) == value:
+            return index
+    return None
+
+
+def _resolve(config, path: list):
+    """
+    Walk path, returning the container holding the last component
+    """
+
+    node = config
+    for component in path[:-1]:
+        if isinstance(component, dict):
+            index = _select(node, component)
+            if index is None:
+                raise ValueError(f"No entry matching {component} at {format_path(path)}")
+            component = index
+        try:
+            node = node[component]
+        except (KeyError, IndexError, TypeError):
+            raise ValueError(f"Path not found: {format_path(path)}")
+    return node
+
+
+def apply(config: dict, patch: list) -> dict:
+    """
+    Apply a patch from diff() to config, in place
+
+    Parameters:
+        config (dict): Config to update, must match the patch's old config where the patch touches it
+        patch  (list): Operations from diff()
+
+    Returns:
+        dict: config, or the new root if the patch replaced it
+
+    Raises:
+        ValueError: If a path in the patch doesn't exist in config
+    """
+
+    for operation in patch:
+        path = operation["Path"]
+        if not path:
+            config = copy.deepcopy(operation["Value"])
+            continue
+
+        parent = _resolve(config, path)
+        last = path[-1]
+
+        if isinstance(last, dict):
+            index = _select(parent, last)
+            if operation["Op"] == "Add":
+                if index is not None:
+                    raise ValueError(f"Entry already present: {format_path(path)}")
+                parent.insert(operation["Index"], copy.deepcopy(operation["Value"]))
+                continue
+            if index is None:
+                raise ValueError(f"No entry matching {last} at {format_path(path)}")
+            last = index
+
+        if operation["Op"] == "Order":
+            # Entries not listed (ie. added later by the patch) are left at the end
+            positions = {identifier: index for index, identifier in enumerate(operation["Value"])}
+            parent[last].sort(key=lambda entry: positions.get(entry.get(operation["Key"]), len(positions)))
+            continue
+
+        if operation["Op"] == "Remove":
+            try:
+                del parent[last]
+            except (KeyError, IndexError, TypeError):
+                raise ValueError(f"Path not found: {format_path(path)}")
+        elif operation["Op"] in ("Add", "Replace"):
+            if operation["Op"] == "Replace" and not (last in parent if isinstance(parent, dict) else 0 <= last < len(parent)):
+                raise ValueError(f"Path not found: {format_path(path)}")
+            parent[last] = copy.deepcopy(operation["Value"])
+        else:
+            raise ValueError(f"Unknown operation: {operation['Op']}")
+
+    return config
+
+
+def format_path(path: list) -> str:
+    """
+    Readable form of a patch path, ex. Kernel -> Add -> [BundlePath=Lilu.kext] -> Enabled
+    """
+
+    components = []
+    for component in path:
+        if isinstance(component, dict):
+            (key, value), = component.items()
+            components.append(f"[{key}={value}]")
+        elif isinstance(component, int):
+            components.append(f"[{component}]")
+        else:
+            components.append(str(component))
+    return " -> ".join(components) or "(root)"
+
+
+def describe(patch: list) -> list:
+    """
+    One line per operation, for logging
+    """
+
+    return [f"{operation['Op']}: {format_path(operation['Path'])}" for operation in patch]
+
+
+def diff_files(old: Path, new: Path) -> list:
+    """
+    diff() two config.plist files on disk
+    """
+
+    return diff(plistlib.load(Path(old).open("rb")), plistlib.load(Path(new).open("rb")))
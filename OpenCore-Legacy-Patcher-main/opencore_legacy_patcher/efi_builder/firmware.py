@@ -109,7 +109,7 @@ class BuildFirmware:
             support.BuildSupport(self.model, self.constants, self.config).enable_kext("ASPP-Override.kext", self.constants.aspp_override_version, self.constants.aspp_override_path)
             if self.constants.disable_fw_throttle is True:
                 # Only inject on older OSes if user requests
-                support.BuildSupport(self.model, self.constants, self.config).get_item_by_kv(self.config["Kernel"]["Add"], "BundlePath", "ASPP-Override.kext")["MinKernel"] = ""
+                support.BuildSupport(self.model, self.constants, self.config).get_kext_by_bundle_path("ASPP-Override.kext")["MinKernel"] = ""
 
         if self.constants.disable_fw_throttle is True and smbios_data.smbios_dictionary[self.model]["CPU Generation"] >= cpu_data.CPUGen.nehalem.value:
             logging.info("- Disabling Firmware Throttling")
@@ -0,0 +1,177 @@
+"""
+incremental.py: Reuse kexts from the previous build when their sources are unchanged
+
+Every build still lays down a fresh OpenCore base (cheap with template_cache)
+and regenerates config.plist from scratch. Copying and extracting every kext
+zip again is what isn't cheap, so the previous build is moved aside and the
+bundles of kexts whose zip hasn't changed are moved back in instead.
+
+A bundle is only reused if it's exactly as extracted: kexts touched after
+extraction (ex. plugins stripped by cleanup()) are copied and extracted again.
+Nothing is reused if the model, OpenCore zip or config.plist template changed.
+Settings aren't tracked: they only shape config.plist, which is always rebuilt,
+and which kexts get added, which is decided per kext zip.
+The manifest lives beside the release folder, so it's never installed to the ESP.
+"""
+
+import hashlib
+import logging
+import plistlib
+import shutil
+
+from pathlib import Path
+
+from .. import constants
+
+from . import template_cache
+
+
+MANIFEST_NAME:   str = "OpenCore-Build-Manifest.plist"
+PREVIOUS_FOLDER: str = "OpenCore-Build-Previous"
+
+
+def _fingerprint(paths: list, root: Path) -> str:
+    """
+    Hash of the relative path, size and modification time of every file under paths
+    """
+
+    fingerprint = hashlib.sha256()
+    for path in paths:
+        for file in sorted([Path(path), *Path(path).rglob("*")]):
+            if file.is_dir():
+                continue
+            stat = file.stat()
+            fingerprint.update(f"{file.relative_to(root).as_posix()}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return fingerprint.hexdigest()
+
+
+class IncrementalBuild:
+    """
+    Tracks which kexts of the previous build can be carried over to the current one
+
+    Usage:
+        >>> manifest = IncrementalBuild(model, global_constants)
+        >>> manifest.prepare()                        # instead of deleting the old build
+        >>> manifest.reuse_kext(kext_path)            # from enable_kext(), False means copy it
+        >>> manifest.record_extracted(zip, members)   # from cleanup(), per extracted zip
+        >>> manifest.save()                           # once the build passed validation
+    """
+
+    def __init__(self, model: str, global_constants: constants.Constants) -> None:
+        self.model: str = model
+        self.constants: constants.Constants = global_constants
+
+        self.manifest_path:   Path = self.constants.build_path / MANIFEST_NAME
+        self.previous_folder: Path = self.constants.build_path / PREVIOUS_FOLDER
+
+        self.previous: dict = {}
+        self.inputs:   dict = {}
+        self.kexts:    dict = {}  # zip name -> {"Digest": str, "Products": [bundle names], "Fingerprint": str}
+        self.reused:   list = []
+
+
+    def prepare(self) -> None:
+        """
+        Move the previous build aside, or delete it if any of the inputs changed since
+        """
+
+        self.inputs = {
+            "Model":    self.model,
+            "OpenCore": template_cache.file_digest(self.constants.opencore_zip_source),
+            "Template": template_cache.file_digest(self.constants.plist_template),
+        }
+
+        if self.manifest_path.exists():
+            try:
+                self.previous = plistlib.load(self.manifest_path.open("rb"))
+            except Exception as e:
+                logging.info(f"- Ignoring unreadable build manifest: {e}")
+            # Only valid for the release folder it was written with
+            self.manifest_path.unlink()
+
+        if self.previous_folder.exists():
+            shutil.rmtree(self.previous_folder, ignore_errors=True)
+        if not Path(self.constants.opencore_release_folder).exists():
+            return
+        if not self.previous:
+            logging.info("Deleting old copy of OpenCore folder")
+            shutil.rmtree(self.constants.opencore_release_folder, ignore_errors=True)
+            return
+
+        changed = [key for key, value in self.inputs.items() if self.previous.get("Inputs", {}).get(key) != value]
+        if changed:
+            logging.info(f"Deleting old copy of OpenCore folder (changed: {', '.join(changed)})")
+            self.previous = {}
+            shutil.rmtree(self.constants.opencore_release_folder, ignore_errors=True)
+            return
+
+        logging.info("Keeping previous OpenCore folder for reuse")
+        Path(self.constants.opencore_release_folder).rename(self.previous_folder)
+
+
+    def reuse_kext(self, kext_path: Path) -> bool:
+        """
+        Move a kext's bundles over from the previous build if its zip is unchanged
+
+        Parameters:
+            kext_path (Path): Source zip passed to enable_kext()
+
+        Returns:
+            bool: True if reused, False if the caller should copy the zip
+        """
+
+        name = Path(kext_path).name
+        self.kexts[name] = {"Digest": template_cache.file_digest(kext_path)}
+
+        entry = self.previous.get("Kexts", {}).get(name)
+        if not entry or entry["Digest"] != self.kexts[name]["Digest"] or "Products" not in entry:
+            return False
+
+        previous_kexts = self.previous_folder / Path(self.constants.kexts_path).relative_to(self.constants.opencore_release_folder)
+        products = [previous_kexts / product for product in entry["Products"]]
+        if not all(product.exists() for product in products) or _fingerprint(products, previous_kexts) != entry["Fingerprint"]:
+            return False
+
+        for product in products:
+            product.rename(Path(self.constants.kexts_path) / product.name)
+        self.kexts[name] = entry
+        self.reused.append(name)
+        return True
+
+
+    def record_extracted(self, zip_path: Path, members: list) -> None:
+        """
+        Remember which bundles a kext zip extracted to, as they are right after extraction
+
+        Parameters:
+            zip_path (Path): Zip in the Kexts folder, about to be deleted
+            members  (list): ZipFile.namelist() of it
+        """
+
+        name = Path(zip_path).name
+        if name not in self.kexts:
+            # Not added through enable_kext()
+            return
+
+        products = sorted({member.split("/")[0] for member in members} - {"", "__MACOSX"})
+        self.kexts[name]["Products"] = products
+        self.kexts[name]["Fingerprint"] = _fingerprint([Path(self.constants.kexts_path) / product for product in products], self.constants.kexts_path)
+
+
+    def discard_previous(self) -> None:
+        """
+        Delete whatever wasn't reused from the previous build
+        """
+
+        if self.previous_folder.exists():
+            shutil.rmtree(self.previous_folder, ignore_errors=True)
+
+
+    def save(self) -> None:
+        """
+        Write the manifest for the next build
+        """
+
+        if self.kexts:
+            logging.info(f"- Reused {len(self.reused)} of {len(self.kexts)} kexts from the previous build")
+        plistlib.dump({"Inputs": self.inputs, "Kexts": self.kexts}, self.manifest_path.open("wb"), sort_keys=True)
@@ -13,6 +13,13 @@ from pathlib import Path
 
 from .. import constants
 
+from ..support import kext_graph
+
+
+# Lookup indexes for the config.plist entry lists, keyed by (section, sub section, key)
+# Builders create a new BuildSupport per call, so these live at module level
+_indexes: dict = {}
+
 
 class BuildSupport:
     """
@@ -45,6 +52,52 @@ class BuildSupport:
         return item
 
 
+    @staticmethod
+    def _get_indexed_item(section: str, sub_section: str, iterable: list, key: str, value: typing.Any) -> dict:
+        """
+        Same result as get_item_by_kv(), backed by a {value: position} index
+
+        The index is built on first use and rebuilt whenever the list was
+        swapped out, changed length (entries added or cleaned up) or the
+        entry at the cached position no longer matches (reordered or renamed)
+
+        Parameters:
+            section     (str): Top level config section (ex. Kernel)
+            sub_section (str): Entry list within the section (ex. Add)
+            iterable   (list): The entry list itself
+            key         (str): Key to search for
+            value       (any): Value to search for
+        """
+
+        slot = (section, sub_section, key)
+        cached = _indexes.get(slot)
+        if cached is None or cached[0] is not iterable or cached[1] != len(iterable):
+            cached = BuildSupport._build_index(slot, iterable, key)
+
+        position = cached[2].get(value)
+        if position is None or iterable[position][key] != value:
+            # Entry renamed or moved in place, rebuild once before reporting a miss
+            cached = BuildSupport._build_index(slot, iterable, key)
+            position = cached[2].get(value)
+            if position is None:
+                return None
+
+        return iterable[position]
+
+
+    @staticmethod
+    def _build_index(slot: tuple, iterable: list, key: str) -> tuple:
+        """
+        (Re)build the index for an entry list, first match wins like get_item_by_kv()
+        """
+
+        index = {}
+        for position, item in enumerate(iterable):
+            index.setdefault(item[key], position)
+        _indexes[slot] = (iterable, len(iterable), index)
+        return _indexes[slot]
+
+
     def get_kext_by_bundle_path(self, bundle_path: str) -> dict:
         """
         Gets a kext by bundle path
@@ -53,7 +106,7 @@ class BuildSupport:
             bundle_path (str): Relative bundle path of the kext in the EFI folder
         """
 
-        kext: dict = self.get_item_by_kv(self.config["Kernel"]["Add"], "BundlePath", bundle_path)
+        kext: dict = self._get_indexed_item("Kernel", "Add", self.config["Kernel"]["Add"], "BundlePath", bundle_path)
         if not kext:
             logging.info(f"- Could not find kext {bundle_path}!")
             raise IndexError
@@ -70,7 +123,7 @@ class BuildSupport:
             efi_type    (str): Type of EFI binary (Drivers, Tools)
         """
 
-        efi_binary: dict = self.get_item_by_kv(self.config[entry_type][efi_type], "Path", bundle_name)
+        efi_binary: dict = self._get_indexed_item(entry_type, efi_type, self.config[entry_type][efi_type], "Path", bundle_name)
         if not efi_binary:
             logging.info(f"- Could not find {efi_type}: {bundle_name}!")
             raise IndexError
@@ -97,9 +150,13 @@ class BuildSupport:
             return
 
         logging.info(f"- Adding {kext_name} {kext_version}")
-        shutil.copy(kext_path, self.constants.kexts_path)
+        if self.constants.build_manifest is None or not self.constants.build_manifest.reuse_kext(kext_path):
+            shutil.copy(kext_path, self.constants.kexts_path)
         kext["Enabled"] = True
 
+        if self.constants.kext_graph is not None:
+            self.constants.kext_graph.add_from_path(kext_name, kext_path, kext.get("MinKernel", ""), kext.get("MaxKernel", ""))
+
 
     def sign_files(self) -> None:
         """
@@ -171,6 +228,35 @@ class BuildSupport:
                 raise Exception(f"Found extra driver: {driver_file.name}")
 
         self._validate_malformed_kexts(self.constants.opencore_release_folder / Path("EFI/OC/Kexts"))
+        self._validate_kext_order(config_plist)
+
+
+    def _validate_kext_order(self, config_plist: dict) -> None:
+        """
+        Validate that every kext is listed after the kexts it depends on
+
+        Kexts added through enable_kext() are already in the shared graph,
+        the rest (template defaults, plugins) are read from the built EFI
+        """
+
+        graph = self.constants.kext_graph or kext_graph.KextGraph()
+        kexts_folder = self.constants.opencore_release_folder / Path("EFI/OC/Kexts")
+
+        names = []
+        for kext in config_plist["Kernel"]["Add"]:
+            if kext["Enabled"] is False:
+                continue
+            names.append(kext["BundlePath"])
+            if kext["BundlePath"] not in graph.kexts:
+                graph.add_from_path(kext["BundlePath"], kexts_folder / kext["BundlePath"], kext.get("MinKernel", ""), kext.get("MaxKernel", ""))
+
+        for name, bundle_ids in graph.missing([x for x in names if x in graph.kexts]).items():
+            # May be provided by macOS itself, so only worth noting
+            logging.info(f"- {name} links against bundles not in the EFI: {', '.join(bundle_ids)}")
+
+        for name, dependency in graph.check_order(names):
+            logging.info(f"- {name} is loaded before its dependency {dependency}")
+            raise Exception(f"{name} is loaded before its dependency {dependency}")
 
 
     def _validate_malformed_kexts(self, directory: str | Path) -> None:
@@ -198,6 +284,9 @@ class BuildSupport:
         """
 
         logging.info("- Cleaning up files")
+        if self.constants.build_manifest is not None:
+            self.constants.build_manifest.discard_previous()
+
         # Remove unused entries
         entries_to_clean = {
             "ACPI":   ["Add", "Delete", "Patch"],
@@ -216,6 +305,8 @@ class BuildSupport:
         for kext in self.constants.kexts_path.rglob("*.zip"):
             with zipfile.ZipFile(kext) as zip_file:
                 zip_file.extractall(self.constants.kexts_path)
+                if self.constants.build_manifest is not None:
+                    self.constants.build_manifest.record_extracted(kext, zip_file.namelist())
             kext.unlink()
 
         for item in self.constants.oc_folder.rglob("*.zip"):
@@ -249,4 +340,5 @@ class BuildSupport:
                         raise Exception(f" - Unknown plugin found: {plugin.name}")
                     shutil.rmtree(plugin)
 
-        Path(self.constants.opencore_zip_copied).unlink()
\ No newline at end of file
+        # Only present in build folders from before the template cache
+        Path(self.constants.opencore_zip_copied).unlink(missing_ok=True)
\ No newline at end of file
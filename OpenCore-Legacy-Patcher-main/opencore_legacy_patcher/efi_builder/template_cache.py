@@ -0,0 +1,171 @@
+"""
+template_cache.py: Reusable OpenCore base trees and config.plist templates for BuildOpenCore
+
+Each OpenCore zip (one per version and DEBUG/RELEASE variant) is extracted once
+into a directory named after its SHA-256, builds then hardlink that tree into
+place rather than unzipping again. The parsed config.plist template is kept in
+memory and handed out as a deep copy.
+"""
+
+import os
+import copy
+import shutil
+import logging
+import hashlib
+import zipfile
+import plistlib
+import threading
+
+from pathlib import Path
+
+
+# Files modified in place after extraction, these are copied rather than linked
+# - OpenCore.efi: sign.command bin-patches the vault key into it (dd conv=notrunc)
+COPIED_FILES: tuple = ("OpenCore.efi",)
+
+# Sizes and modification times of the extracted files, to detect a tampered cache
+MANIFEST_NAME: str = ".oclp-template-manifest.plist"
+
+_lock:      threading.Lock = threading.Lock()
+_digests:   dict = {}  # (path, size, mtime) -> SHA-256 of the file
+_templates: dict = {}  # (path, size, mtime) -> parsed config.plist
+
+
+def _stat_key(path: Path) -> tuple:
+    stat = Path(path).stat()
+    return (str(path), stat.st_size, stat.st_mtime_ns)
+
+
+def file_digest(path: Path) -> str:
+    """
+    SHA-256 of a file, only hashed again if its size or modification time changed
+    """
+
+    key = _stat_key(path)
+    with _lock:
+        if key not in _digests:
+            _digests[key] = hashlib.sha256(Path(path).read_bytes()).hexdigest()
+        return _digests[key]
+
+
+def _manifest(root: Path) -> dict:
+    manifest = {}
+    for file in sorted(Path(root).rglob("*")):
+        if file.is_dir() or file.name == MANIFEST_NAME:
+            continue
+        stat = file.stat()
+        manifest[file.relative_to(root).as_posix()] = [stat.st_size, stat.st_mtime_ns]
+    return manifest
+
+
+def _is_intact(cache: Path) -> bool:
+    """
+    Whether a cached tree exists and nothing linked from it was written to since
+    """
+
+    if not Path(cache / MANIFEST_NAME).exists():
+        return False
+    try:
+        expected = plistlib.load(Path(cache / MANIFEST_NAME).open("rb"))
+    except Exception:
+        return False
+    return expected == _manifest(cache)
+
+
+def _populate(zip_source: Path, cache: Path) -> None:
+    """
+    Extract the zip into the cache, staged so concurrent builds never see a partial tree
+    """
+
+    staging = cache.with_name(f".{cache.name}-{os.getpid()}-{threading.get_ident()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    with zipfile.ZipFile(zip_source) as zip_file:
+        zip_file.extractall(staging)
+    plistlib.dump(_manifest(staging), Path(staging / MANIFEST_NAME).open("wb"))
+
+    if cache.exists():
+        shutil.rmtree(cache, ignore_errors=True)
+    try:
+        staging.rename(cache)
+    except OSError:
+        # Another build (ex. a build farm worker) got there first
+        shutil.rmtree(staging, ignore_errors=True)
+
+    # Drop trees of older zips for the same variant (ex. after Update-OpenCore.command)
+    for stale in cache.parent.glob(f"{Path(zip_source).stem}-*"):
+        if stale != cache:
+            shutil.rmtree(stale, ignore_errors=True)
+
+
+def _link_tree(source: Path, destination: Path) -> None:
+    """
+    Recreate source under destination, hardlinking files where possible
+    """
+
+    for directory, _, files in os.walk(source):
+        target = Path(destination) / Path(directory).relative_to(source)
+        target.mkdir(parents=True, exist_ok=True)
+        for name in files:
+            if name == MANIFEST_NAME:
+                continue
+            if Path(target / name).exists():
+                Path(target / name).unlink()
+            if name not in COPIED_FILES:
+                try:
+                    os.link(Path(directory) / name, target / name)
+                    continue
+                except OSError:
+                    # Different volume, or filesystem without hardlinks
+                    pass
+            shutil.copy2(Path(directory) / name, target / name)
+
+
+def extract_opencore(zip_source: Path, destination: Path, cache_root: Path) -> bool:
+    """
+    Equivalent of ZipFile(zip_source).extractall(destination), served from the cache
+
+    Files in the resulting tree may be shared with the cache, so they should be
+    replaced (unlink, then copy) rather than written to in place. Any in-place
+    write is caught on the next build and the cache is rebuilt.
+
+    Parameters:
+        zip_source  (Path): OpenCore-DEBUG.zip or OpenCore-RELEASE.zip
+        destination (Path): Folder to extract into
+        cache_root  (Path): Folder holding the cached trees
+
+    Returns:
+        bool: True if the cache was used, False if the zip had to be extracted
+    """
+
+    cache = Path(cache_root) / f"{Path(zip_source).stem}-{file_digest(zip_source)[:16]}"
+    try:
+        hit = _is_intact(cache)
+        if not hit:
+            Path(cache_root).mkdir(parents=True, exist_ok=True)
+            _populate(zip_source, cache)
+        _link_tree(cache, destination)
+        return hit
+    except OSError as e:
+        logging.info(f"- Unable to use OpenCore template cache, extracting directly: {e}")
+        with zipfile.ZipFile(zip_source) as zip_file:
+            zip_file.extractall(destination)
+        return False
+
+
+def load_config_template(plist_template: Path) -> dict:
+    """
+    Parsed copy of the config.plist template, safe for the caller to mutate
+
+    Parameters:
+        plist_template (Path): Template config.plist
+
+    Returns:
+        dict: Deep copy of the template, re-read if the file changed on disk
+    """
+
+    key = _stat_key(plist_template)
+    with _lock:
+        if key not in _templates:
+            _templates.clear()
+            _templates[key] = plistlib.load(Path(plist_template).open("rb"))
+        return copy.deepcopy(_templates[key])
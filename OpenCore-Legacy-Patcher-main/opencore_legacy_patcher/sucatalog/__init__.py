@@ -109,4 +109,5 @@ By default, `CatalogProducts` will only return InstallAssistants. To get all pro
 from .url       import CatalogURL
 from .constants import CatalogVersion, SeedType
 from .products  import CatalogProducts
+from .index     import CatalogIndex
 from .products_appledb import AppleDBProducts
\ No newline at end of file
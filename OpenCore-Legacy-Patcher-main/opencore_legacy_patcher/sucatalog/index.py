@@ -0,0 +1,311 @@
+"""
+index.py: Persisted, incrementally updated index of InstallAssistant products
+
+The Software Update Catalog is several MB of XML, of which only a handful of
+products are macOS installers. Rather than loading and parsing the whole plist
+on every launch, the catalog is streamed through ElementTree.iterparse one
+product at a time, and only InstallAssistant products are kept, in compact
+form, in an index keyed by catalog URL and ETag.
+
+Usage:
+>>> index = CatalogIndex(CatalogURL().url)
+>>> if index.refresh():
+>>>     products = CatalogProducts(index.catalog, index=index).products
+"""
+
+import os
+import json
+import base64
+import logging
+import datetime
+import tempfile
+import threading
+
+import xml.etree.ElementTree as ET
+
+from pathlib import Path
+
+from ..support import network_handler, http_cache
+
+
+INDEX_PATH:    Path = http_cache.CACHE_PATH.parent / "sucatalog_index.json"
+INDEX_VERSION: int  = 1
+
+PLIST_DATE_FORMAT: str = "%Y-%m-%dT%H:%M:%SZ"
+
+# Packages CatalogProducts looks at, everything else is dropped from the index
+INDEXED_PACKAGES:    tuple = ("InstallAssistant.pkg", "Info.plist", "com_apple_MobileAsset_MacSoftwareUpdate.plist")
+INDEXED_PACKAGE_KEYS: tuple = ("URL", "Size", "IntegrityDataURL", "IntegrityDataSize")
+
+
+def _plist_value(element: ET.Element):
+    """
+    Convert a plist XML element to the value plistlib would produce
+    """
+
+    tag = element.tag
+    if tag == "dict":
+        children = list(element)
+        return {children[i].text: _plist_value(children[i + 1]) for i in range(0, len(children) - 1, 2)}
+    if tag == "array":
+        return [_plist_value(child) for child in element]
+    if tag == "string":
+        return element.text or ""
+    if tag == "integer":
+        return int(element.text)
+    if tag == "real":
+        return float(element.text)
+    if tag == "true":
+        return True
+    if tag == "false":
+        return False
+    if tag == "date":
+        return datetime.datetime.strptime(element.text, PLIST_DATE_FORMAT)
+    if tag == "data":
+        return base64.b64decode(element.text or "")
+    return None
+
+
+def _dict_lookup(element: ET.Element, key: str) -> ET.Element:
+    """
+    Value element for a key in a plist <dict> element, without converting the rest
+    """
+
+    children = list(element)
+    for i in range(0, len(children) - 1, 2):
+        if children[i].text == key:
+            return children[i + 1]
+    return None
+
+
+def _compact_product(product: dict) -> dict:
+    """
+    Reduce a catalog product to the keys CatalogProducts reads
+
+    Returns:
+        dict: Compact product, or None if the product is not an InstallAssistant
+    """
+
+    identifiers = product.get("ExtendedMetaInfo", {}).get("InstallAssistantPackageIdentifiers")
+    if not identifiers or "SharedSupport" not in identifiers:
+        return None
+
+    compact = {
+        "PostDate":         product["PostDate"].strftime(PLIST_DATE_FORMAT),
+        "ExtendedMetaInfo": {"InstallAssistantPackageIdentifiers": identifiers},
+        "Packages": [
+            {key: package[key] for key in INDEXED_PACKAGE_KEYS if key in package}
+            for package in product.get("Packages", [])
+            if Path(package.get("URL", "")).name in INDEXED_PACKAGES
+        ],
+    }
+    distributions = {language: url for language, url in product.get("Distributions", {}).items() if language in ["English", "en"]}
+    if distributions:
+        compact["Distributions"] = distributions
+    if "ServerMetadataURL" in product:
+        compact["ServerMetadataURL"] = product["ServerMetadataURL"]
+    return compact
+
+
+class CatalogIndex:
+    """
+    Compact index of a catalog's InstallAssistant products, persisted between launches
+
+    Args:
+        url  (str):  Software Update Catalog URL
+        path (Path): Index file, shared by all catalog URLs
+    """
+
+    def __init__(self, url: str, path: Path = INDEX_PATH) -> None:
+        self.url:  str  = url
+        self.path: Path = Path(path)
+
+        self.etag:     str  = None
+        self.products: dict = {}  # ProductID -> {"product": compact product, "resolved": {vmm_only: product map}}
+
+        self.stats: dict = {"reused": 0, "parsed": 0, "removed": 0}
+
+        self._lock: threading.Lock = threading.Lock()
+
+        self._load()
+
+
+    def _read_index(self) -> dict:
+        try:
+            index = json.loads(self.path.read_text())
+            if index.get("version") == INDEX_VERSION:
+                return index
+        except Exception:
+            pass
+        return {"version": INDEX_VERSION, "catalogs": {}}
+
+
+    def _load(self) -> None:
+        entry = self._read_index()["catalogs"].get(self.url, {})
+        self.etag = entry.get("etag")
+        self.products = entry.get("products", {})
+
+
+    def save(self) -> None:
+        """
+        Write this catalog's entry back, keeping other catalogs' entries
+        """
+
+        with self._lock:
+            index = self._read_index()
+            index["catalogs"][self.url] = {"etag": self.etag, "products": self.products}
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".sucatalog-index-")
+                with os.fdopen(fd, "w") as file:
+                    json.dump(index, file, default=str)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                logging.warning(f"Unable to save catalog index: {e}")
+
+
+    def refresh(self) -> bool:
+        """
+        Bring the index up to date with the catalog
+
+        An unchanged catalog (same ETag) costs a 304 and no parsing. Otherwise
+        the catalog is streamed, products whose PostDate hasn't changed are
+        kept as-is and only new or re-posted InstallAssistants are converted.
+
+        Returns:
+            bool: True if the index holds products for this catalog
+        """
+
+        headers = {"If-None-Match": self.etag} if self.etag and self.products else {}
+        response = network_handler.NetworkUtilities().get(self.url, headers=headers, stream=True, timeout=10)
+
+        if response.status_code == 304:
+            logging.info(f"Catalog unchanged, using index with {len(self.products)} products")
+            return True
+        if response.status_code != 200:
+            logging.error(f"Failed to fetch catalog: {response.status_code}")
+            return bool(self.products)
+
+        try:
+            response.raw.decode_content = True
+            products = self._parse(response.raw)
+        except Exception as e:
+            logging.error(f"Failed to parse catalog: {e}")
+            return bool(self.products)
+
+        self.stats["removed"] = len(self.products.keys() - products.keys())
+        self.products = products
+        self.etag = response.headers.get("ETag")
+        logging.info(f"Catalog index: {self.stats['parsed']} new or changed, {self.stats['reused']} unchanged, {self.stats['removed']} removed")
+        self.save()
+        return True
+
+
+    def _parse(self, stream) -> dict:
+        """
+        Stream the catalog plist, handling one product at a time
+
+        Each product's elements are discarded as soon as it's been looked at,
+        so memory stays flat regardless of catalog size
+        """
+
+        products = {}
+        depth = 0
+        root_key = None
+        product_id = None
+        products_element = None
+
+        for event, element in ET.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 3 and element.tag == "dict" and root_key == "Products":
+                    products_element = element
+                continue
+
+            depth -= 1
+            if depth == 2 and element.tag == "key":
+                root_key = element.text
+            elif depth == 3 and products_element is not None:
+                if element.tag == "key":
+                    product_id = element.text
+                    continue
+                self._index_product(product_id, element, products)
+                products_element.clear()
+            elif depth == 2 and element is products_element:
+                products_element = None
+
+        return products
+
+
+    def _index_product(self, product_id: str, element: ET.Element, products: dict) -> None:
+        """
+        Keep an unchanged product's entry, convert a new or re-posted one
+        """
+
+        post_date = _dict_lookup(element, "PostDate")
+        post_date = post_date.text if post_date is not None else None
+
+        existing = self.products.get(product_id)
+        if existing and existing["product"]["PostDate"] == post_date:
+            products[product_id] = existing
+            self.stats["reused"] += 1
+            return
+
+        # Cheap check before converting the whole product
+        meta = _dict_lookup(element, "ExtendedMetaInfo")
+        if meta is None or _dict_lookup(meta, "InstallAssistantPackageIdentifiers") is None:
+            return
+
+        compact = _compact_product(_plist_value(element))
+        if compact is None:
+            return
+        products[product_id] = {"product": compact, "resolved": {}}
+        self.stats["parsed"] += 1
+
+
+    @property
+    def catalog(self) -> dict:
+        """
+        The index as a catalog dict, in the shape CatalogProducts expects
+        """
+
+        catalog = {"Products": {}}
+        for product_id, entry in self.products.items():
+            product = dict(entry["product"])
+            product["PostDate"] = datetime.datetime.strptime(product["PostDate"], PLIST_DATE_FORMAT)
+            catalog["Products"][product_id] = product
+        return catalog
+
+
+    def resolved(self, product_id: str, vmm_only: bool) -> tuple:
+        """
+        Product map resolved on an earlier launch
+
+        Returns:
+            tuple: (found, product map). The map may be None for products that aren't listed
+        """
+
+        with self._lock:
+            entry = self.products.get(product_id)
+            if entry is None or str(vmm_only) not in entry["resolved"]:
+                return False, None
+            result = entry["resolved"][str(vmm_only)]
+
+        if result is not None:
+            result = json.loads(json.dumps(result))
+            result["PostDate"] = datetime.datetime.strptime(entry["product"]["PostDate"], PLIST_DATE_FORMAT)
+        return True, result
+
+
+    def store_resolved(self, product_id: str, vmm_only: bool, result: dict) -> None:
+        """
+        Remember a resolved product map until the product is re-posted
+        """
+
+        with self._lock:
+            entry = self.products.get(product_id)
+            if entry is None:
+                return
+            if result is not None:
+                result = {key: value for key, value in result.items() if key != "PostDate"}
+            entry["resolved"][str(vmm_only)] = result
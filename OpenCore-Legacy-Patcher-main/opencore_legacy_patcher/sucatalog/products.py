@@ -3,20 +3,31 @@ products.py: Parse products from Software Update Catalog
 """
 
 import re
+import copy
 import plistlib
+import threading
 
 import packaging.version
 import xml.etree.ElementTree as ET
 
 from pathlib   import Path
 from functools import cached_property
+from concurrent.futures import ThreadPoolExecutor
 
 from .url       import CatalogURL
+from .index     import CatalogIndex
 from .constants import CatalogVersion, SeedType
 
 from ..support import network_handler
 
 
+PRODUCT_WORKERS: int = 8  # Concurrent product metadata fetches
+
+# Resolved products by (ProductID, PostDate, ...), shared by every CatalogProducts in the process
+_PRODUCT_CACHE:      dict = {}
+_PRODUCT_CACHE_LOCK: threading.Lock = threading.Lock()
+
+
 class CatalogProducts:
     """
     Args:
@@ -24,14 +35,18 @@ class CatalogProducts:
         install_assistants_only       (bool): Only list InstallAssistant products
         only_vmm_install_assistants   (bool): Only list VMM-x86_64-compatible InstallAssistant products
         max_install_assistant_version (CatalogVersion): Maximum InstallAssistant version to list
+        index                         (CatalogIndex): Persisted index the catalog came from, resolved
+                                                      products are kept in it between launches
     """
     def __init__(self,
                  catalog: dict,
                  install_assistants_only: bool = True,
                  only_vmm_install_assistants: bool = True,
-                 max_install_assistant_version: CatalogVersion = CatalogVersion.SEQUOIA
+                 max_install_assistant_version: CatalogVersion = CatalogVersion.SEQUOIA,
+                 index: CatalogIndex = None
                 ) -> None:
         self.catalog:             dict = catalog
+        self.index:       CatalogIndex = index if install_assistants_only else None
         self.ia_only:             bool = install_assistants_only
         self.vmm_only:            bool = only_vmm_install_assistants
         self.max_ia_version: packaging = packaging.version.parse(f"{max_install_assistant_version.value}.99.99")
@@ -261,133 +276,199 @@ class CatalogProducts:
         return products_copy
 
 
-    @cached_property
-    def products(self) -> None:
+    def _resolve_product(self, product_id: str, product: dict) -> dict:
         """
-        Returns a list of products from the sucatalog
+        Resolve a single catalog product's installer details
+
+        Fetches the product's Info.plist / MobileAsset plist, falling back to the
+        English distribution and server metadata when no version is found
+
+        Returns:
+            dict: Product map, or None if the product is not listed
         """
 
-        catalog = self.catalog
+        # InstallAssistants.pkgs (macOS Installers) will have the following keys:
+        if self.ia_only:
+            if "ExtendedMetaInfo" not in product:
+                return None
+            if "InstallAssistantPackageIdentifiers" not in product["ExtendedMetaInfo"]:
+                return None
+            if "SharedSupport" not in product["ExtendedMetaInfo"]["InstallAssistantPackageIdentifiers"]:
+                return None
 
-        _products = []
+        _product_map = {
+            "ProductID": product_id,
+            "PostDate":  product["PostDate"],
+            "Title":     None,
+            "Build":     None,
+            "Version":   None,
+            "Catalog":   None,
+
+            # Optional keys if not InstallAssistant only:
+            # "Packages": None,
+
+            # Optional keys if InstallAssistant found:
+            # "InstallAssistant": {
+            #     "URL":       None,
+            #     "Size":      None,
+            #     "XNUMajor":  None,
+            #     "IntegrityDataURL":  None,
+            #     "IntegrityDataSize": None
+            # },
+        }
 
-        for product in catalog["Products"]:
+        # InstallAssistant logic
+        if "Packages" in product:
+            # Add packages to product map if not InstallAssistant only
+            if self.ia_only is False:
+                _product_map["Packages"] = product["Packages"]
+            for package in product["Packages"]:
+                if "URL" in package:
+                    if Path(package["URL"]).name == "InstallAssistant.pkg":
+                        _product_map["InstallAssistant"] = {
+                            "URL":               package["URL"],
+                            "Size":              package["Size"],
+                            "IntegrityDataURL":  package["IntegrityDataURL"],
+                            "IntegrityDataSize": package["IntegrityDataSize"]
+                        }
+
+                    if Path(package["URL"]).name not in ["Info.plist", "com_apple_MobileAsset_MacSoftwareUpdate.plist"]:
+                        continue
+
+                    net_obj = network_handler.NetworkUtilities().get(package["URL"])
+                    if net_obj is None:
+                        continue
+
+                    contents = net_obj.content
+                    try:
+                        plist_contents = plistlib.loads(contents)
+                    except plistlib.InvalidFileException:
+                        continue
 
-            # InstallAssistants.pkgs (macOS Installers) will have the following keys:
-            if self.ia_only:
-                if "ExtendedMetaInfo" not in catalog["Products"][product]:
-                    continue
-                if "InstallAssistantPackageIdentifiers" not in catalog["Products"][product]["ExtendedMetaInfo"]:
-                    continue
-                if "SharedSupport" not in catalog["Products"][product]["ExtendedMetaInfo"]["InstallAssistantPackageIdentifiers"]:
-                    continue
+                    if plist_contents:
+                        if Path(package["URL"]).name == "Info.plist":
+                            result = self._legacy_parse_info_plist(plist_contents)
+                        else:
+                            result = self._parse_mobile_asset_plist(plist_contents)
 
-            _product_map = {
-                "ProductID": product,
-                "PostDate":  catalog["Products"][product]["PostDate"],
-                "Title":     None,
-                "Build":     None,
-                "Version":   None,
-                "Catalog":   None,
-
-                # Optional keys if not InstallAssistant only:
-                # "Packages": None,
-
-                # Optional keys if InstallAssistant found:
-                # "InstallAssistant": {
-                #     "URL":       None,
-                #     "Size":      None,
-                #     "XNUMajor":  None,
-                #     "IntegrityDataURL":  None,
-                #     "IntegrityDataSize": None
-                # },
-            }
+                        if result == {"Missing VMM Support": True}:
+                            _product_map = {}
+                            break
 
-            # InstallAssistant logic
-            if "Packages" in catalog["Products"][product]:
-                # Add packages to product map if not InstallAssistant only
-                if self.ia_only is False:
-                    _product_map["Packages"] = catalog["Products"][product]["Packages"]
-                for package in catalog["Products"][product]["Packages"]:
-                    if "URL" in package:
-                        if Path(package["URL"]).name == "InstallAssistant.pkg":
-                            _product_map["InstallAssistant"] = {
-                                "URL":               package["URL"],
-                                "Size":              package["Size"],
-                                "IntegrityDataURL":  package["IntegrityDataURL"],
-                                "IntegrityDataSize": package["IntegrityDataSize"]
-                            }
-
-                        if Path(package["URL"]).name not in ["Info.plist", "com_apple_MobileAsset_MacSoftwareUpdate.plist"]:
-                            continue
+                        _product_map.update(result)
 
-                        net_obj = network_handler.NetworkUtilities().get(package["URL"])
-                        if net_obj is None:
-                            continue
+        if _product_map == {}:
+            return None
 
-                        contents = net_obj.content
-                        try:
-                            plist_contents = plistlib.loads(contents)
-                        except plistlib.InvalidFileException:
-                            continue
+        if _product_map["Version"] is not None:
+            _product_map["Title"] = self._build_installer_name(_product_map["Version"], _product_map["Catalog"])
 
-                        if plist_contents:
-                            if Path(package["URL"]).name == "Info.plist":
-                                result = self._legacy_parse_info_plist(plist_contents)
-                            else:
-                                result = self._parse_mobile_asset_plist(plist_contents)
+        # Fall back to English distribution if no version is found
+        if _product_map["Version"] is None:
+            url = None
+            if "Distributions" in product:
+                if "English" in product["Distributions"]:
+                    url = product["Distributions"]["English"]
+                elif "en" in product["Distributions"]:
+                    url = product["Distributions"]["en"]
 
-                            if result == {"Missing VMM Support": True}:
-                                _product_map = {}
-                                break
+            if url is None:
+                return None
 
-                            _product_map.update(result)
+            net_obj = network_handler.NetworkUtilities().get(url)
+            if net_obj is None:
+                return None
 
-            if _product_map == {}:
-                continue
+            contents = net_obj.content
 
-            if _product_map["Version"] is not None:
-                _product_map["Title"] = self._build_installer_name(_product_map["Version"], _product_map["Catalog"])
+            _product_map.update(self._parse_english_distributions(contents))
 
-            # Fall back to English distribution if no version is found
             if _product_map["Version"] is None:
-                url = None
-                if "Distributions" in catalog["Products"][product]:
-                    if "English" in catalog["Products"][product]["Distributions"]:
-                        url = catalog["Products"][product]["Distributions"]["English"]
-                    elif "en" in catalog["Products"][product]["Distributions"]:
-                        url = catalog["Products"][product]["Distributions"]["en"]
-
-                if url is None:
-                    continue
+                if "ServerMetadataURL" in product:
+                    server_metadata_url = product["ServerMetadataURL"]
 
-                net_obj = network_handler.NetworkUtilities().get(url)
-                if net_obj is None:
-                    continue
+                    net_obj = network_handler.NetworkUtilities().get(server_metadata_url)
+                    if net_obj is None:
+                        return None
 
-                contents = net_obj.content
+                    server_metadata_contents = net_obj.content
 
-                _product_map.update(self._parse_english_distributions(contents))
+                    try:
+                        server_metadata_plist = plistlib.loads(server_metadata_contents)
+                    except plistlib.InvalidFileException:
+                        pass
 
-                if _product_map["Version"] is None:
-                    if "ServerMetadataURL" in catalog["Products"][product]:
-                        server_metadata_url = catalog["Products"][product]["ServerMetadataURL"]
+                    if "CFBundleShortVersionString" in server_metadata_plist:
+                        _product_map["Version"] = server_metadata_plist["CFBundleShortVersionString"]
 
-                        net_obj = network_handler.NetworkUtilities().get(server_metadata_url)
-                        if net_obj is None:
-                            continue
+        if _product_map["Build"] is not None:
+            if "InstallAssistant" in _product_map:
+                try:
+                    # Grab first 2 characters of build
+                    _product_map["InstallAssistant"]["XNUMajor"] = int(_product_map["Build"][:2])
+                except ValueError:
+                    pass
+
+        # If version is still None, set to 0.0.0
+        if _product_map["Version"] is None:
+            _product_map["Version"] = "0.0.0"
 
-                        server_metadata_contents = net_obj.content
+        return _product_map
+
+
+    def _resolve_product_cached(self, product_id: str, product: dict) -> dict:
+        """
+        _resolve_product(), memoized by product ID and PostDate
+
+        Apple re-posts a product when its packages change, so an unchanged
+        PostDate means the remote metadata is unchanged as well
+        """
+
+        key = (product_id, str(product.get("PostDate")), self.ia_only, self.vmm_only)
+        with _PRODUCT_CACHE_LOCK:
+            if key in _PRODUCT_CACHE:
+                return copy.deepcopy(_PRODUCT_CACHE[key])
+
+        found = False
+        if self.index:
+            found, result = self.index.resolved(product_id, self.vmm_only)
+            if result is not None and result["Catalog"] is not None:
+                result["Catalog"] = SeedType(result["Catalog"])
+        if not found:
+            result = self._resolve_product(product_id, product)
+            if self.index:
+                self.index.store_resolved(product_id, self.vmm_only, result)
+
+        with _PRODUCT_CACHE_LOCK:
+            _PRODUCT_CACHE[key] = copy.deepcopy(result)
+        return result
+
+
+    @cached_property
+    def products(self) -> None:
+        """
+        Returns a list of products from the sucatalog
 
-                        try:
-                            server_metadata_plist = plistlib.loads(server_metadata_contents)
-                        except plistlib.InvalidFileException:
-                            pass
+        Products are resolved concurrently, as each one may need several
+        metadata round trips
+        """
+
+        catalog = self.catalog
 
-                        if "CFBundleShortVersionString" in server_metadata_plist:
-                            _product_map["Version"] = server_metadata_plist["CFBundleShortVersionString"]
+        with ThreadPoolExecutor(max_workers=PRODUCT_WORKERS) as executor:
+            results = executor.map(
+                lambda item: self._resolve_product_cached(*item),
+                catalog["Products"].items()
+            )
+            results = list(results)
 
+        if self.index:
+            self.index.save()
 
+        _products = []
+        for _product_map in results:
+            if _product_map is None:
+                continue
             if _product_map["Version"] is not None:
                 # Check if version is newer than the max version
                 if self.ia_only:
@@ -397,18 +478,6 @@ class CatalogProducts:
                     except packaging.version.InvalidVersion:
                         pass
 
-            if _product_map["Build"] is not None:
-                if "InstallAssistant" in _product_map:
-                    try:
-                        # Grab first 2 characters of build
-                        _product_map["InstallAssistant"]["XNUMajor"] = int(_product_map["Build"][:2])
-                    except ValueError:
-                        pass
-
-            # If version is still None, set to 0.0.0
-            if _product_map["Version"] is None:
-                _product_map["Version"] = "0.0.0"
-
             _products.append(_product_map)
 
         _products = sorted(_products, key=lambda x: x["Version"])
@@ -421,4 +490,15 @@ class CatalogProducts:
         """
         Returns a list of the latest products from the sucatalog
         """
-        return self._list_latest_installers_only(self.products)
\ No newline at end of file
+        return self._list_latest_installers_only(self.products)
+
+
+    def checksum_for_product(self, product: dict) -> tuple:
+        """
+        The catalog carries no installer checksums, see AppleDBProducts.checksum_for_product
+        The installer's chunklist (IntegrityDataURL) is verified instead
+
+        Returns:
+            tuple: (None, None)
+        """
+        return None, None
@@ -18,6 +18,7 @@ from ..support import network_handler
 
 
 APPLEDB_API_URL = "https://api.appledb.dev/ios/macOS/main.json"
+APPLEDB_API_TTL = 60 * 60  # Seconds the on-disk copy is used before revalidating
 
 
 class AppleDBProducts:
@@ -35,7 +36,7 @@ class AppleDBProducts:
         try:
             self.data = (
                 network_handler.NetworkUtilities()
-                .get(APPLEDB_API_URL, headers={"User-Agent": f"OCLP/{self.constants.patcher_version}"})
+                .get(APPLEDB_API_URL, cache_ttl=APPLEDB_API_TTL, headers={"User-Agent": f"OCLP/{self.constants.patcher_version}"})
                 .json()
             )
         except Exception as e:
@@ -19,6 +19,10 @@ from .constants import (
 from ..support import network_handler
 
 
+# Always revalidate, an unchanged catalog then costs a 304 instead of a full download
+CATALOG_CACHE_TTL: int = 0
+
+
 class CatalogURL:
     """
     Provides URL generation for Software Update Catalog
@@ -169,7 +173,7 @@ class CatalogURL:
         Return URL contents
         """
         try:
-            return plistlib.loads(network_handler.NetworkUtilities().get(self.url).content)
+            return plistlib.loads(network_handler.NetworkUtilities().get(self.url, cache_ttl=CATALOG_CACHE_TTL).content)
         except Exception as e:
             logging.error(f"Failed to fetch URL contents: {e}")
             return None
@@ -15,10 +15,8 @@ from . import subprocess_wrapper
 
 from .. import constants
 
-from ..wx_gui import gui_entry
 from ..efi_builder import build
 from ..sys_patch import sys_patch
-from ..sys_patch.auto_patcher import StartAutomaticPatching
 
 from ..datasets import (
     model_array,
@@ -116,6 +114,8 @@ class arguments:
         Start root volume auto patching
         """
 
+        from ..sys_patch.auto_patcher import StartAutomaticPatching
+
         logging.info("Set Auto patching")
         StartAutomaticPatching(self.constants).start_auto_patch()
 
@@ -148,6 +148,7 @@ class arguments:
             logging.info("Another instance of OS caching is running, exiting")
             return
 
+        from ..wx_gui import gui_entry
         gui_entry.EntryPoint(self.constants).start(entry=gui_entry.SupportedEntryPoints.OS_CACHE)
 
 
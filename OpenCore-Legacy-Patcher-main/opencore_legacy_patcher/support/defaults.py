@@ -127,7 +127,8 @@ class GenerateDefaults:
                 self.constants.allow_nvme_fixing = True
 
         # Check if running in RecoveryOS
-        self.constants.recovery_status = utilities.check_recovery()
+        if self.constants.hardware_profile is None:
+            self.constants.recovery_status = utilities.check_recovery()
 
         if global_settings.GlobalEnviromentSettings().read_property("Force_Web_Drivers") is True:
             self.constants.force_nv_web = True
@@ -178,6 +179,9 @@ class GenerateDefaults:
 
         if not self.host_is_target:
             return
+        if self.constants.hardware_profile is not None:
+            # The profile's machine, not this one, holds the NVRAM
+            return
 
         if "-v" in (utilities.get_nvram("boot-args") or ""):
             self.constants.verbose_debug = True
@@ -370,6 +374,10 @@ class GenerateDefaults:
                     # Only disable AMFI if we officially support Ventura
                     self.constants.disable_amfi = True
 
+                if self.constants.hardware_profile is not None:
+                    # Not this machine's preferences to change
+                    continue
+
                 for key in ["Moraea_BlurBeta"]:
                     # Enable BetaBlur if user hasn't disabled it
                     is_key_enabled = subprocess.run(["/usr/bin/defaults", "read", "-globalDomain", key], stdout=subprocess.PIPE).stdout.decode("utf-8").strip()
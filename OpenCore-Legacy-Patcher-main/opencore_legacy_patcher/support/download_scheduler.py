@@ -0,0 +1,330 @@
+"""
+download_scheduler.py: Process-wide coordination of DownloadObject transfers
+
+Downloads wait for a slot in priority order, subject to global and per-host
+concurrency limits, and share a token bucket when a bandwidth cap is set
+"""
+
+import enum
+import time
+import heapq
+import logging
+import itertools
+import threading
+import contextlib
+
+from urllib.parse import urlparse
+
+from . import global_settings
+
+
+class DownloadPriority(enum.IntEnum):
+    """
+    Enum for download priority, lower values are scheduled first
+    """
+
+    INTERACTIVE: int = 0  # User is watching the progress bar, ex. macOS installers
+    NORMAL:      int = 1
+    BACKGROUND:  int = 2  # Prefetching, ex. KDKs and metallibs ahead of patching
+
+
+class TokenBucket:
+    """
+    Token bucket shared by every transfer in the process
+
+    Tokens are bytes. Consumers may overdraw the bucket by one chunk and then
+    sleep off the debt, so chunk sizes don't need to fit inside the burst.
+
+    Parameters:
+        rate  (float): Bytes per second, 0 for unlimited
+        burst (float): Bucket capacity in bytes, defaults to one second of traffic
+    """
+
+    def __init__(self, rate: float = 0, burst: float = None) -> None:
+        self._lock:    threading.Lock = threading.Lock()
+        self.rate:     float = 0
+        self.burst:    float = 0
+        self._tokens:  float = 0
+        self._updated: float = time.monotonic()
+
+        self.set_rate(rate, burst)
+
+
+    def set_rate(self, rate: float, burst: float = None) -> None:
+        """
+        Change the rate, takes effect for the next chunk
+        """
+
+        with self._lock:
+            self.rate = max(0, rate or 0)
+            self.burst = burst or self.rate
+            self._tokens = min(self._tokens, self.burst)
+            self._updated = time.monotonic()
+
+
+    def consume(self, amount: int, rate: float = None) -> float:
+        """
+        Take tokens for a chunk, sleeping while the bucket is in debt
+
+        Parameters:
+            amount (int): Bytes transferred
+            rate (float): Override the configured rate for this chunk, 0 for unlimited
+
+        Returns:
+            float: Seconds slept
+        """
+
+        rate = self.rate if rate is None else rate
+        if rate <= 0:
+            return 0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst or rate, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            self._tokens -= amount
+            delay = -self._tokens / rate if self._tokens < 0 else 0
+
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class DownloadScheduler:
+    """
+    Hands out download slots and throttles transfers
+
+    Usage:
+        >>> with SCHEDULER.slot(download_object, DownloadPriority.BACKGROUND):
+        >>>     for chunk in response.iter_content(...):
+        >>>         SCHEDULER.throttle(len(chunk))
+
+        >>> for entry in SCHEDULER.queue():
+        >>>     print(entry["name"], entry["state"])
+
+    Parameters:
+        max_active      (int): Downloads allowed to run at once
+        max_per_host    (int): Downloads allowed to run at once against a single host
+        bandwidth_limit (int): Bytes per second shared by all downloads, 0 for unlimited
+        limit_hours   (tuple): (start, end) hours in local time during which the cap
+                               applies, None for always. Wraps past midnight if end < start
+    """
+
+    def __init__(self, max_active: int = 4, max_per_host: int = 2, bandwidth_limit: int = 0, limit_hours: tuple = None) -> None:
+        self._condition: threading.Condition = threading.Condition()
+        self._counter:   itertools.count = itertools.count()
+        self._waiting:   list = []  # Heap of (priority, sequence, entry)
+        self._active:    list = []
+        self._bucket:    TokenBucket = TokenBucket()
+
+        self.max_active:      int = max_active
+        self.max_per_host:    int = max_per_host
+        self.bandwidth_limit: int = bandwidth_limit
+        self.limit_hours:     tuple = limit_hours
+
+        self._settings_loaded: bool = False
+
+        self.configure(bandwidth_limit=bandwidth_limit)
+
+
+    def configure(self, max_active: int = None, max_per_host: int = None, bandwidth_limit: int = None, limit_hours: tuple = None) -> None:
+        """
+        Change limits, arguments left as None keep their current value
+
+        Queued downloads are re-evaluated right away, running ones pick up
+        the new bandwidth cap with their next chunk
+        """
+
+        with self._condition:
+            if max_active is not None:
+                self.max_active = max(1, max_active)
+            if max_per_host is not None:
+                self.max_per_host = max(1, max_per_host)
+            if bandwidth_limit is not None:
+                self.bandwidth_limit = max(0, bandwidth_limit)
+                self._bucket.set_rate(self.bandwidth_limit)
+            if limit_hours is not None:
+                self.limit_hours = limit_hours or None
+            self._condition.notify_all()
+
+
+    def load_settings(self) -> None:
+        """
+        Apply limits from the global settings plist, once per process
+
+        Properties:
+            Download_Max_Active            (int): Concurrent downloads
+            Download_Max_Per_Host          (int): Concurrent downloads per host
+            Download_Bandwidth_Limit       (int): Bytes per second, 0 for unlimited
+            Download_Bandwidth_Limit_Hours (str): Hours the cap applies, ex. "9-17"
+        """
+
+        if self._settings_loaded:
+            return
+        self._settings_loaded = True
+
+        try:
+            settings = global_settings.GlobalEnviromentSettings()
+            limit_hours = settings.read_property("Download_Bandwidth_Limit_Hours")
+            if limit_hours:
+                start, end = (int(hour) for hour in str(limit_hours).split("-"))
+                limit_hours = (start, end)
+            self.configure(
+                max_active=settings.read_property("Download_Max_Active"),
+                max_per_host=settings.read_property("Download_Max_Per_Host"),
+                bandwidth_limit=settings.read_property("Download_Bandwidth_Limit"),
+                limit_hours=limit_hours or None,
+            )
+        except Exception as e:
+            logging.error(f"Unable to load download scheduler settings: {str(e)}")
+
+
+    def current_rate(self) -> float:
+        """
+        Bandwidth cap in effect right now
+
+        Returns:
+            float: Bytes per second, 0 if uncapped at this hour
+        """
+
+        if not self.bandwidth_limit:
+            return 0
+        if self.limit_hours is None:
+            return self.bandwidth_limit
+        start, end = self.limit_hours
+        hour = time.localtime().tm_hour
+        in_window = start <= hour < end if start <= end else hour >= start or hour < end
+        return self.bandwidth_limit if in_window else 0
+
+
+    def throttle(self, amount: int) -> float:
+        """
+        Account for transferred bytes, sleeping if over the bandwidth cap
+
+        Returns:
+            float: Seconds slept
+        """
+
+        return self._bucket.consume(amount, self.current_rate())
+
+
+    def _host_count(self, host: str) -> int:
+        return sum(1 for entry in self._active if entry["host"] == host)
+
+
+    def _next_eligible(self) -> dict:
+        """
+        Highest priority waiter whose host has a free connection
+
+        A waiter held back by its host limit doesn't block lower priority
+        downloads from other hosts
+        """
+
+        if len(self._active) >= self.max_active:
+            return None
+        for _, _, entry in sorted(self._waiting):
+            if self._host_count(entry["host"]) < self.max_per_host:
+                return entry
+        return None
+
+
+    def acquire(self, download_object, priority: int = DownloadPriority.NORMAL) -> dict:
+        """
+        Wait for a download slot
+
+        Parameters:
+            download_object (DownloadObject): Download requesting the slot, its
+                                              should_stop flag cancels the wait
+            priority (int): DownloadPriority
+
+        Returns:
+            dict: Scheduler entry, to be passed to release()
+        """
+
+        self.load_settings()
+
+        entry = {
+            "name":            download_object.filename,
+            "host":            urlparse(download_object.url).netloc,
+            "priority":        DownloadPriority(priority),
+            "state":           "queued",
+            "queued_at":       time.time(),
+            "started_at":      None,
+            "download_object": download_object,
+        }
+        item = (entry["priority"], next(self._counter), entry)
+
+        with self._condition:
+            heapq.heappush(self._waiting, item)
+            if self._next_eligible() is not entry:
+                logging.info(f"Queued download: {entry['name']} ({entry['priority'].name.lower()} priority, {len(self._active)} active)")
+            while self._next_eligible() is not entry:
+                if download_object.should_stop:
+                    self._waiting.remove(item)
+                    heapq.heapify(self._waiting)
+                    self._condition.notify_all()
+                    raise Exception("Download stopped")
+                self._condition.wait(0.5)
+
+            self._waiting.remove(item)
+            heapq.heapify(self._waiting)
+            entry["state"] = "active"
+            entry["started_at"] = time.time()
+            self._active.append(entry)
+            self._condition.notify_all()
+
+        return entry
+
+
+    def release(self, entry: dict) -> None:
+        """
+        Return a slot taken by acquire()
+        """
+
+        with self._condition:
+            if entry in self._active:
+                self._active.remove(entry)
+            entry["state"] = "finished"
+            self._condition.notify_all()
+
+
+    @contextlib.contextmanager
+    def slot(self, download_object, priority: int = DownloadPriority.NORMAL):
+        """
+        Hold a download slot for the duration of the with block
+        """
+
+        entry = self.acquire(download_object, priority)
+        try:
+            yield entry
+        finally:
+            self.release(entry)
+
+
+    def queue(self) -> list:
+        """
+        Snapshot of running and waiting downloads, running first, then in scheduling order
+
+        Returns:
+            list: dicts with name, host, priority, state, waited (seconds),
+                  downloaded and total (bytes)
+        """
+
+        with self._condition:
+            entries = self._active + [entry for _, _, entry in sorted(self._waiting)]
+            now = time.time()
+            return [
+                {
+                    "name":       entry["name"],
+                    "host":       entry["host"],
+                    "priority":   entry["priority"].name.lower(),
+                    "state":      entry["state"],
+                    "waited":     (entry["started_at"] or now) - entry["queued_at"],
+                    "downloaded": entry["download_object"].downloaded_file_size,
+                    "total":      entry["download_object"].total_file_size,
+                }
+                for entry in entries
+            ]
+
+
+SCHEDULER = DownloadScheduler()
@@ -89,6 +89,9 @@ class GlobalEnviromentSettings:
             plistlib.dump({"Developed by Dortania": True,}, Path(self.global_settings_plist).open("wb"))
         except PermissionError:
             logging.info("Permission error: Unable to write to global settings file")
+        except FileNotFoundError:
+            # No /Users/Shared, ie. building for a saved profile on Linux; settings read as unset
+            logging.info(f"Unable to create global settings file, {self.global_settings_folder} missing")
 
 
     def _convert_defaults_to_global_settings(self) -> None:
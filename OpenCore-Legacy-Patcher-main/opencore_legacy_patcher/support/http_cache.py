@@ -0,0 +1,235 @@
+"""
+http_cache.py: On-disk cache for small HTTP GET responses (catalogs, API lookups)
+
+Fresh entries are served without touching the network, stale ones are
+revalidated with If-None-Match/If-Modified-Since so an unchanged resource
+costs a 304 instead of a full download
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import requests
+import tempfile
+import threading
+
+from pathlib import Path
+from typing  import Callable
+
+from requests.structures import CaseInsensitiveDict
+
+
+CACHE_PATH:     Path = Path.home() / "Library/Caches/com.dortania.opencore-legacy-patcher/http"
+CACHE_MAX_SIZE: int  = 1024 * 1024 * 256
+CACHE_VERSION:  int  = 1
+
+# Response headers kept with the body, enough for .json(), .text and revalidation
+STORED_HEADERS: tuple = ("Content-Type", "ETag", "Last-Modified", "Date")
+
+
+class HTTPCache:
+    """
+    Size-bounded, least-recently-used cache of GET responses
+
+    Usage:
+        >>> response = CACHE.get(url, ttl=3600, fetch=requests.get, headers={...})
+
+    Parameters:
+        path     (Path): Cache directory, created on first store
+        max_size  (int): Total body size in bytes before least recently used entries are evicted
+    """
+
+    def __init__(self, path: Path = CACHE_PATH, max_size: int = CACHE_MAX_SIZE) -> None:
+        self.path:     Path = Path(path)
+        self.max_size: int  = max_size
+
+        self._lock:    threading.Lock = threading.Lock()
+        self._entries: dict = None
+
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()
+
+
+    def _load(self) -> dict:
+        """
+        Read the index once per process, an unreadable index starts an empty cache
+        """
+
+        if self._entries is None:
+            self._entries = {}
+            try:
+                index = json.loads((self.path / "index.json").read_text())
+                if index.get("version") == CACHE_VERSION:
+                    self._entries = index["entries"]
+            except Exception:
+                pass
+        return self._entries
+
+
+    def _save(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.path, prefix=".index-")
+        with os.fdopen(fd, "w") as file:
+            json.dump({"version": CACHE_VERSION, "entries": self._entries}, file)
+        os.replace(temp_path, self.path / "index.json")
+
+
+    def _read_body(self, key: str) -> bytes:
+        try:
+            return (self.path / key).read_bytes()
+        except OSError:
+            return None
+
+
+    def _response(self, url: str, entry: dict, body: bytes) -> requests.Response:
+        """
+        Rebuild a requests.Response from a cache entry
+        """
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = body
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+
+    def _lookup(self, url: str) -> tuple:
+        """
+        Returns:
+            tuple: (entry, body), (None, None) on a miss
+        """
+
+        with self._lock:
+            key = self._key(url)
+            entry = self._load().get(key)
+            if entry is None:
+                return None, None
+            body = self._read_body(key)
+            if body is None or len(body) != entry["size"]:
+                del self._entries[key]
+                return None, None
+            entry["accessed"] = time.time()
+            return entry, body
+
+
+    def _store(self, url: str, response: requests.Response) -> None:
+        """
+        Save a 200 response and evict least recently used entries past max_size
+        """
+
+        body = response.content
+        if len(body) > self.max_size:
+            return
+
+        with self._lock:
+            key = self._key(url)
+            entries = self._load()
+            self.path.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.path, prefix=".body-")
+            with os.fdopen(fd, "wb") as file:
+                file.write(body)
+            os.replace(temp_path, self.path / key)
+
+            now = time.time()
+            entries[key] = {
+                "url":      url,
+                "size":     len(body),
+                "stored":   now,
+                "accessed": now,
+                "headers":  {name: response.headers[name] for name in STORED_HEADERS if name in response.headers},
+            }
+
+            total = sum(entry["size"] for entry in entries.values())
+            for old_key in sorted(entries, key=lambda k: entries[k]["accessed"]):
+                if total <= self.max_size:
+                    break
+                if old_key == key:
+                    continue
+                total -= entries[old_key]["size"]
+                del entries[old_key]
+                (self.path / old_key).unlink(missing_ok=True)
+
+            self._save()
+
+
+    def _touch(self, url: str, response: requests.Response = None) -> None:
+        """
+        Mark an entry fresh again after a 304, taking any updated validators
+        """
+
+        with self._lock:
+            entry = self._load().get(self._key(url))
+            if entry is None:
+                return
+            entry["stored"] = time.time()
+            if response is not None:
+                for name in ("ETag", "Last-Modified"):
+                    if name in response.headers:
+                        entry["headers"][name] = response.headers[name]
+            self._save()
+
+
+    def get(self, url: str, ttl: int, fetch: Callable, **kwargs) -> requests.Response:
+        """
+        Serve a GET from the cache, revalidating or fetching as needed
+
+        Parameters:
+            url      (str): URL to get
+            ttl      (int): Seconds an entry is used without asking the server, 0 to always revalidate
+            fetch (Callable): Performs the request, called as fetch(url, headers=..., **kwargs)
+            **kwargs: Passed through to fetch
+
+        Returns:
+            requests.Response: Live or rebuilt response. If the server can't be
+                               reached, a stale entry is returned rather than nothing
+        """
+
+        entry, body = self._lookup(url)
+        if entry is not None and time.time() - entry["stored"] < ttl:
+            logging.info(f"Using cached response for {url}")
+            return self._response(url, entry, body)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry is not None:
+            if "ETag" in entry["headers"]:
+                headers["If-None-Match"] = entry["headers"]["ETag"]
+            if "Last-Modified" in entry["headers"]:
+                headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+
+        response = fetch(url, headers=headers, **kwargs)
+
+        if entry is not None and response.status_code == 304:
+            logging.info(f"Cached response for {url} is still current")
+            self._touch(url, response)
+            return self._response(url, entry, body)
+        if response.status_code == 200:
+            try:
+                self._store(url, response)
+            except OSError as e:
+                logging.warning(f"Unable to cache response for {url}: {str(e)}")
+            return response
+        if entry is not None and response.status_code is None:
+            logging.warning(f"Unable to reach {url}, using cached response from {time.ctime(entry['stored'])}")
+            return self._response(url, entry, body)
+        return response
+
+
+    def clear(self) -> None:
+        """
+        Remove every cached response
+        """
+
+        with self._lock:
+            for key in self._load():
+                (self.path / key).unlink(missing_ok=True)
+            self._entries = {}
+            self._save()
+
+
+CACHE = HTTPCache()
@@ -6,6 +6,8 @@ import logging
 import plistlib
 import subprocess
 import re
+import shutil
+import filecmp
 
 from pathlib import Path
 
@@ -13,6 +15,8 @@ from . import utilities, subprocess_wrapper
 
 from .. import constants
 
+from ..efi_builder import config_diff
+
 
 class tui_disk_installation:
     def __init__(self, versions):
@@ -93,6 +97,69 @@ class tui_disk_installation:
         return False
 
 
+    def update_efi_folder(self, source: Path, destination: Path) -> None:
+        """
+        Make an installed EFI/OC folder match a new build, writing only the delta
+
+        Files are replaced when their contents differ and removed when no longer
+        part of the build. config.plist is updated by applying a config_diff patch
+        from the installed config to the new one, which is also logged.
+
+        Parameters:
+            source      (Path): EFI/OC folder of the new build
+            destination (Path): EFI/OC folder on the mounted ESP
+        """
+
+        source = Path(source)
+        destination = Path(destination)
+        source_paths = {path.relative_to(source) for path in source.rglob("*")}
+
+        removed = 0
+        # Deepest first, and case-insensitively gone on FAT before the new name is written
+        for relative in sorted((path.relative_to(destination) for path in destination.rglob("*")), key=lambda x: len(x.parts), reverse=True):
+            path = destination / relative
+            if relative in source_paths and path.is_dir() == (source / relative).is_dir():
+                continue
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            elif path.exists():
+                path.unlink()
+            removed += 1
+
+        written = 0
+        for relative in sorted(source_paths, key=lambda x: len(x.parts)):
+            path = destination / relative
+            if (source / relative).is_dir():
+                path.mkdir(parents=True, exist_ok=True)
+                continue
+            if not path.exists():
+                shutil.copyfile(source / relative, path)
+                written += 1
+                continue
+            if relative == Path("config.plist"):
+                try:
+                    installed_config = plistlib.load(path.open("rb"))
+                    patch = config_diff.diff(installed_config, plistlib.load((source / relative).open("rb")))
+                except Exception as e:
+                    logging.info(f"- Unable to diff installed config.plist, replacing it: {e}")
+                    shutil.copyfile(source / relative, path)
+                    written += 1
+                    continue
+                if patch:
+                    logging.info(f"- Applying {len(patch)} changes to config.plist")
+                    for line in config_diff.describe(patch):
+                        logging.info(f"  - {line}")
+                    plistlib.dump(config_diff.apply(installed_config, patch), path.open("wb"), sort_keys=True)
+                    written += 1
+                continue
+            if filecmp.cmp(source / relative, path, shallow=False):
+                continue
+            shutil.copyfile(source / relative, path)
+            written += 1
+
+        logging.info(f"- Wrote {written} files, removed {removed}, {len([x for x in source_paths if not (source / x).is_dir()]) - written} unchanged")
+
+
     def install_opencore(self, full_disk_identifier: str):
         # TODO: Apple Script fails in Yosemite(?) and older
         logging.info(f"Mounting partition: {full_disk_identifier}")
@@ -117,7 +184,9 @@ class tui_disk_installation:
             logging.info("EFI failed to mount!")
             return False
 
-        if (mount_path / Path("EFI/OC")).exists():
+        # Existing OpenCore installs are updated in place, only writing what changed
+        update_in_place = (mount_path / Path("EFI/OC/config.plist")).exists()
+        if (mount_path / Path("EFI/OC")).exists() and not update_in_place:
             logging.info("Removing preexisting EFI/OC folder")
             subprocess.run(["/bin/rm", "-rf", mount_path / Path("EFI/OC")], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
@@ -131,7 +200,10 @@ class tui_disk_installation:
 
         logging.info("Copying OpenCore onto EFI partition")
         subprocess.run(["/bin/mkdir", "-p", mount_path / Path("EFI")], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        subprocess.run(["/bin/cp", "-r", self.constants.opencore_release_folder / Path("EFI/OC"), mount_path / Path("EFI/OC")], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if update_in_place:
+            self.update_efi_folder(self.constants.opencore_release_folder / Path("EFI/OC"), mount_path / Path("EFI/OC"))
+        else:
+            subprocess.run(["/bin/cp", "-r", self.constants.opencore_release_folder / Path("EFI/OC"), mount_path / Path("EFI/OC")], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         subprocess.run(["/bin/cp", "-r", self.constants.opencore_release_folder / Path("System"), mount_path / Path("System")], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
         if Path(self.constants.opencore_release_folder / Path("boot.efi")).exists():
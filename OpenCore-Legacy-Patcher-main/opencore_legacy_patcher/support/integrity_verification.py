@@ -5,17 +5,25 @@ Based off of chunklist.py:
 - https://gist.github.com/dhinakg/cbe30edf31ddc153fd0b0c0570c9b041
 """
 
+import os
 import enum
+import mmap
 import hashlib
 import logging
 import binascii
+import itertools
 import threading
 
-from typing import Union
-from pathlib import Path
+from typing      import Union
+from pathlib     import Path
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 CHUNK_LENGTH = 4 + 32
 
+# hashlib releases the GIL while hashing, so threads scale with cores
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
 
 class ChunklistStatus(enum.Enum):
     """
@@ -35,6 +43,7 @@ class ChunklistVerification:
     Parameters:
         file_path      (Path): Path to the file to validate
         chunklist_path (Path): Path to the chunklist file
+        max_workers     (int): Threads hashing chunks of the memory-mapped file, 1 for serial reads
 
     Usage:
         >>> chunk_obj = ChunklistVerification("InstallAssistant.pkg", "InstallAssistant.pkg.integrityDataV1")
@@ -44,22 +53,38 @@ class ChunklistVerification:
 
         >>> if chunk_obj.status == ChunklistStatus.FAILURE:
         ...     print(chunk_obj.error_msg)
+
+    Streaming usage (verify while the file is being written):
+        >>> chunk_obj = ChunklistVerification("InstallAssistant.pkg", chunklist_bytes)
+        >>> for data in response.iter_content(...):
+        ...     if not chunk_obj.update(data):
+        ...         break
+        >>> chunk_obj.finalize()
     """
 
-    def __init__(self, file_path: Path, chunklist_path: Union[Path, bytes]) -> None:
+    def __init__(self, file_path: Path, chunklist_path: Union[Path, bytes], max_workers: int = DEFAULT_WORKERS) -> None:
         if isinstance(chunklist_path, bytes):
             self.chunklist_path: bytes = chunklist_path
         else:
             self.chunklist_path: Path = Path(chunklist_path)
         self.file_path:          Path = Path(file_path)
+        self.max_workers:         int = max(1, max_workers)
 
         self.chunks: dict = self._generate_chunks(self.chunklist_path)
 
         self.error_msg:     str = ""
         self.current_chunk: int = 0
-        self.total_chunks:  int = len(self.chunks)
+        self.total_chunks:  int = len(self.chunks) if self.chunks is not None else 0
 
         self.status: ChunklistStatus = ChunklistStatus.IN_PROGRESS
+        if self.chunks is None:
+            self.error_msg = "Invalid chunklist"
+            self.status = ChunklistStatus.FAILURE
+            logging.info(self.error_msg)
+
+        # Streaming state, see update()
+        self._stream_hash = hashlib.sha256()
+        self._stream_fill: int = 0
 
 
     def _generate_chunks(self, chunklist: Union[Path, bytes]) -> dict:
@@ -72,6 +97,9 @@ class ChunklistVerification:
 
         chunklist: bytes = chunklist if isinstance(chunklist, bytes) else chunklist.read_bytes()
 
+        if len(chunklist) < 36:
+            return None
+
         # Ref: https://github.com/apple-oss-distributions/xnu/blob/xnu-8020.101.4/bsd/kern/chunklist.h#L59-L69
         header: dict = {
             "magic":       chunklist[:4],
@@ -114,19 +142,154 @@ class ChunklistVerification:
             logging.info(self.error_msg)
             return
 
+        # Can't mmap an empty file, and a single worker gains nothing from it
+        if self.max_workers > 1 and self.file_path.stat().st_size > 0:
+            self._validate_parallel()
+        else:
+            self._validate_serial()
+
+
+    def _chunk_failed(self, index: int, calculated: bytes) -> None:
+        """
+        Record a checksum mismatch
+        """
+
+        chunk = self.chunks[index]
+        self.error_msg = f"Chunk {index + 1} checksum status FAIL: chunk sum {binascii.hexlify(chunk['checksum']).decode()}, calculated sum {binascii.hexlify(calculated).decode()}"
+        self.status = ChunklistStatus.FAILURE
+        logging.info(self.error_msg)
+
+
+    def _validate_serial(self) -> None:
+        """
+        Read and hash chunks one after another
+        """
+
         with self.file_path.open("rb") as f:
-            for chunk in self.chunks:
+            for index, chunk in enumerate(self.chunks):
                 self.current_chunk += 1
                 status = hashlib.sha256(f.read(chunk["length"])).digest()
                 if status != chunk["checksum"]:
-                    self.error_msg = f"Chunk {self.current_chunk} checksum status FAIL: chunk sum {binascii.hexlify(chunk['checksum']).decode()}, calculated sum {binascii.hexlify(status).decode()}"
-                    self.status = ChunklistStatus.FAILURE
-                    logging.info(self.error_msg)
+                    self._chunk_failed(index, status)
                     return
 
         self.status = ChunklistStatus.SUCCESS
 
 
+    def _validate_parallel(self) -> None:
+        """
+        Memory-map the file and hash chunks across a thread pool
+
+        Offsets come from the chunk lengths up front, so every chunk can be
+        hashed independently. Results are consumed in order to keep
+        current_chunk meaningful, and a mismatch in any worker stops new
+        chunks from being scheduled.
+        """
+
+        offsets = list(itertools.accumulate((chunk["length"] for chunk in self.chunks), initial=0))
+        failed  = threading.Event()
+        window  = self.max_workers * 4
+
+        with self.file_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+
+            def _hash_chunk(index: int) -> bytes:
+                if failed.is_set():
+                    return None
+                # Slicing past the end yields a short chunk, same as f.read() would
+                digest = hashlib.sha256(view[offsets[index]:offsets[index + 1]]).digest()
+                if digest != self.chunks[index]["checksum"]:
+                    failed.set()
+                return digest
+
+            try:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    pending = deque()
+                    next_index = 0
+                    while next_index < self.total_chunks or pending:
+                        while next_index < self.total_chunks and len(pending) < window and not failed.is_set():
+                            pending.append((next_index, executor.submit(_hash_chunk, next_index)))
+                            next_index += 1
+                        if not pending:
+                            break
+
+                        index, future = pending.popleft()
+                        digest = future.result()
+                        if digest is None:
+                            # Skipped because another chunk already failed
+                            continue
+
+                        self.current_chunk = index + 1
+                        if digest != self.chunks[index]["checksum"]:
+                            for _, other in pending:
+                                other.cancel()
+                            self._chunk_failed(index, digest)
+                            return
+            finally:
+                view.release()
+
+        self.status = ChunklistStatus.SUCCESS
+
+
+    def update(self, data: bytes) -> bool:
+        """
+        Feed the next bytes of the file, checking each chunk as soon as it is complete
+
+        Parameters:
+            data (bytes): Next bytes of the file, any size
+
+        Returns:
+            bool: False once a chunk has failed (stop feeding data)
+        """
+
+        if self.chunks is None:
+            self.status = ChunklistStatus.FAILURE
+            return False
+        if self.status == ChunklistStatus.FAILURE:
+            return False
+
+        data = memoryview(data)
+        while len(data) and self.current_chunk < self.total_chunks:
+            chunk = self.chunks[self.current_chunk]
+            take = min(chunk["length"] - self._stream_fill, len(data))
+            self._stream_hash.update(data[:take])
+            self._stream_fill += take
+            data = data[take:]
+
+            if self._stream_fill == chunk["length"]:
+                digest = self._stream_hash.digest()
+                self.current_chunk += 1
+                self._stream_hash = hashlib.sha256()
+                self._stream_fill = 0
+                if digest != chunk["checksum"]:
+                    self._chunk_failed(self.current_chunk - 1, digest)
+                    return False
+
+        # Bytes past the last chunk are not covered by the chunklist, same as _validate()
+        return True
+
+
+    def finalize(self) -> bool:
+        """
+        Finish a streamed verification, a file shorter than the chunklist fails
+
+        Returns:
+            bool: True if every chunk matched
+        """
+
+        if self.chunks is None or self.status == ChunklistStatus.FAILURE:
+            self.status = ChunklistStatus.FAILURE
+            return False
+
+        if self.current_chunk < self.total_chunks:
+            self.current_chunk += 1
+            self._chunk_failed(self.current_chunk - 1, self._stream_hash.digest())
+            return False
+
+        self.status = ChunklistStatus.SUCCESS
+        return True
+
+
     def validate(self) -> None:
         """
         Spawns _validate() thread
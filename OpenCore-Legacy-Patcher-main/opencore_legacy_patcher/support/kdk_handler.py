@@ -25,6 +25,7 @@ from . import (
 KDK_INSTALL_PATH: str  = "/Library/Developer/KDKs"
 KDK_INFO_PLIST:   str  = "KDKInfo.plist"
 KDK_API_LINK:     str  = "https://dortania.github.io/KdkSupportPkg/manifest.json"
+KDK_API_TTL:      int  = 60 * 60  # Seconds the on-disk copy of the KDK list is used before revalidating
 
 KDK_ASSET_LIST:   list = None
 
@@ -111,6 +112,7 @@ class KernelDebugKitObject:
         try:
             results = network_handler.NetworkUtilities().get(
                 KDK_API_LINK,
+                cache_ttl=KDK_API_TTL,
                 headers={
                     "User-Agent": f"OCLP/{self.constants.patcher_version}"
                 },
@@ -282,7 +284,7 @@ class KernelDebugKitObject:
         kdk_plist_path = Path(f"{kdk_download_path.parent}/{KDK_INFO_PLIST}") if override_path == "" else Path(f"{Path(override_path).parent}/{KDK_INFO_PLIST}")
 
         self._generate_kdk_info_plist(kdk_plist_path)
-        return network_handler.DownloadObject(self.kdk_url, kdk_download_path)
+        return network_handler.DownloadObject(self.kdk_url, kdk_download_path, segments=4)
 
 
     def _generate_kdk_info_plist(self, plist_path: str) -> None:
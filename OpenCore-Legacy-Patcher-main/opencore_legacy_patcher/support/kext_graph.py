@@ -0,0 +1,356 @@
+"""
+kext_graph.py: Kext dependency resolution based on OSBundleLibraries
+
+Only depends on the standard library, so MultiBoot's BootScripts can load
+this file by path and share the resolver with the EFI builder.
+"""
+
+import re
+import logging
+import zipfile
+import plistlib
+
+from pathlib import Path
+from collections import deque
+
+
+# Bundle IDs provided by macOS itself, never by a kext in the EFI
+SYSTEM_BUNDLE_PREFIXES = ("com.apple.",)
+
+PLUGIN_SEPARATOR = "/Contents/PlugIns/"
+
+
+def parse_kernel_version(version: str, upper: bool = False) -> tuple:
+    """
+    Convert an OpenCore kernel version string to a comparable tuple
+
+    Parameters:
+        version (str): Darwin version, ex. "20.4.0" or "21". Empty for no bound
+        upper  (bool): Pad missing components with 99 instead of 0 (for MaxKernel)
+
+    Returns:
+        tuple: (major, minor, patch), or None if the bound is empty
+    """
+
+    if not version:
+        return None
+    parts = [int(x) for x in re.findall(r"\d+", version)[:3]]
+    while len(parts) < 3:
+        parts.append(99 if upper else 0)
+    return tuple(parts)
+
+
+def kernel_in_range(kernel: str, min_kernel: str = "", max_kernel: str = "") -> bool:
+    """
+    Check whether a Darwin version falls within a kext's MinKernel/MaxKernel
+
+    Parameters:
+        kernel     (str): Target Darwin version
+        min_kernel (str): MinKernel, empty for no lower bound
+        max_kernel (str): MaxKernel, empty for no upper bound
+    """
+
+    target = parse_kernel_version(kernel)
+    if target is None:
+        return True
+    lower = parse_kernel_version(min_kernel)
+    upper = parse_kernel_version(max_kernel, upper=True)
+    if lower is not None and target < lower:
+        return False
+    if upper is not None and target > upper:
+        return False
+    return True
+
+
+def read_info_plist(name: str, path: Path) -> dict:
+    """
+    Read a kext's Info.plist from a bundle directory or a release zip
+
+    Parameters:
+        name  (str): Bundle name, ex. "Lilu.kext" (last component is used inside zips)
+        path (Path): Path to the .kext bundle or to a zip containing it
+
+    Returns:
+        dict: Parsed Info.plist, None if not found
+    """
+
+    path = Path(path)
+    if path.suffix == ".zip":
+        suffix = f"{Path(name).name}/Contents/Info.plist"
+        with zipfile.ZipFile(path) as zip_file:
+            members = sorted((m for m in zip_file.namelist() if m.endswith(suffix) and "__MACOSX" not in m), key=len)
+            if not members:
+                return None
+            return plistlib.loads(zip_file.read(members[0]))
+
+    info_plist = path / "Contents/Info.plist"
+    if not info_plist.exists():
+        return None
+    with info_plist.open("rb") as f:
+        return plistlib.load(f)
+
+
+class KextGraph:
+    """
+    Dependency graph between kexts, keyed by BundlePath
+
+    Edges come from OSBundleLibraries (resolved through CFBundleIdentifier)
+    and from plugins, which OpenCore must load after their parent bundle.
+    """
+
+    def __init__(self) -> None:
+        self.kexts:     dict = {}
+        self.providers: dict = {}
+
+
+    def add(self, name: str, bundle_id: str, libraries: dict, min_kernel: str = "", max_kernel: str = "") -> None:
+        """
+        Add or replace a kext
+
+        Parameters:
+            name       (str): BundlePath, ex. "Lilu.kext" or "Parent.kext/Contents/PlugIns/Child.kext"
+            bundle_id  (str): CFBundleIdentifier
+            libraries (dict): OSBundleLibraries
+            min_kernel (str): MinKernel
+            max_kernel (str): MaxKernel
+        """
+
+        self.kexts[name] = {
+            "bundle_id":  bundle_id,
+            "libraries":  dict(libraries or {}),
+            "min_kernel": min_kernel or "",
+            "max_kernel": max_kernel or "",
+        }
+        if bundle_id:
+            self.providers[bundle_id] = name
+
+
+    def add_info_plist(self, name: str, plist: dict, min_kernel: str = "", max_kernel: str = "") -> None:
+        """
+        Add a kext from its parsed Info.plist
+        """
+
+        libraries = plist.get("OSBundleLibraries_x86_64") or plist.get("OSBundleLibraries") or {}
+        self.add(name, plist.get("CFBundleIdentifier", ""), libraries, min_kernel, max_kernel)
+
+
+    def add_from_path(self, name: str, path: Path, min_kernel: str = "", max_kernel: str = "") -> bool:
+        """
+        Add a kext by reading its Info.plist from disk
+
+        Returns:
+            bool: False if the Info.plist could not be read
+        """
+
+        try:
+            plist = read_info_plist(name, path)
+        except Exception:
+            plist = None
+        if plist is None:
+            return False
+        self.add_info_plist(name, plist, min_kernel, max_kernel)
+        return True
+
+
+    def dependencies(self, name: str) -> list:
+        """
+        Kexts the given kext needs loaded before it
+
+        Kexts without a readable Info.plist only depend on their plugin parent
+
+        Returns:
+            list: BundlePaths of in-graph dependencies, plugin parent first
+        """
+
+        deps = []
+        if PLUGIN_SEPARATOR in name:
+            parent = name.rsplit(PLUGIN_SEPARATOR, 1)[0]
+            if parent in self.kexts:
+                deps.append(parent)
+        libraries = self.kexts[name]["libraries"] if name in self.kexts else {}
+        for bundle_id in libraries:
+            provider = self.providers.get(bundle_id)
+            if provider and provider != name and provider not in deps:
+                deps.append(provider)
+        return deps
+
+
+    def missing(self, names: list = None) -> dict:
+        """
+        Non-system libraries no kext in the graph provides
+
+        Returns:
+            dict: BundlePath -> list of unresolved bundle IDs
+        """
+
+        result = {}
+        for name in (names if names is not None else self.kexts):
+            if name not in self.kexts:
+                continue
+            unresolved = [
+                bundle_id for bundle_id in self.kexts[name]["libraries"]
+                if bundle_id not in self.providers and not bundle_id.startswith(SYSTEM_BUNDLE_PREFIXES)
+            ]
+            if unresolved:
+                result[name] = unresolved
+        return result
+
+
+    def prune(self, kernel: str, names: list = None) -> dict:
+        """
+        Kexts that cannot load on the target kernel, directly or through a dependency
+
+        Parameters:
+            kernel (str): Target Darwin version
+            names (list): Kexts to consider, defaults to the whole graph
+
+        Returns:
+            dict: BundlePath -> reason
+        """
+
+        names = list(names if names is not None else self.kexts)
+        pruned = {}
+        for name in names:
+            kext = self.kexts.get(name)
+            if kext and not kernel_in_range(kernel, kext["min_kernel"], kext["max_kernel"]):
+                pruned[name] = f"needs kernel {kext['min_kernel'] or '*'} - {kext['max_kernel'] or '*'}"
+
+        # Anything depending on a pruned kext can't load either
+        dependents = self._dependents(names)
+        queue = deque(pruned)
+        while queue:
+            name = queue.popleft()
+            for dependent in dependents.get(name, ()):
+                if dependent not in pruned:
+                    pruned[dependent] = f"depends on {name}"
+                    queue.append(dependent)
+        return pruned
+
+
+    def _dependents(self, names: list) -> dict:
+        included = set(names)
+        dependents = {}
+        for name in names:
+            for dep in self.dependencies(name):
+                if dep in included:
+                    dependents.setdefault(dep, []).append(name)
+        return dependents
+
+
+    def order(self, names: list = None) -> tuple:
+        """
+        Topological load order (Kahn's algorithm, O(kexts + dependencies))
+
+        Independent kexts keep their relative input order, so the result is
+        deterministic and stays close to the order the caller asked for.
+        A dependency cycle is broken at its first kext in input order, so cycle
+        members keep their input order and kexts depending on them still
+        follow. The result always holds every kext.
+
+        Parameters:
+            names (list): Kexts to order, defaults to the whole graph in insertion order
+
+        Returns:
+            tuple: (ordered BundlePaths, list of cycles as BundlePath lists)
+        """
+
+        names = list(names if names is not None else self.kexts)
+        position = {name: i for i, name in enumerate(names)}
+        dependents = self._dependents(names)
+        pending = {name: sum(1 for dep in self.dependencies(name) if dep in position) for name in names}
+
+        ordered = []
+        cycles = []
+        in_cycle = set()
+        queue = deque(name for name in names if pending[name] == 0)
+        while True:
+            while queue:
+                name = queue.popleft()
+                ordered.append(name)
+                for dependent in dependents.get(name, ()):
+                    pending[dependent] -= 1
+                    if pending[dependent] == 0:
+                        queue.append(dependent)
+
+            if len(ordered) == len(names):
+                break
+
+            remaining = [name for name in names if pending[name] > 0]
+            if not cycles:
+                cycles = self._find_cycles(remaining, position)
+                for cycle in cycles:
+                    logging.warning(f"- Kext dependency cycle: {' -> '.join(cycle + cycle[:1])}, keeping config order")
+                in_cycle = {name for cycle in cycles for name in cycle}
+
+            # Load the earliest cycle member as if its dependencies were met
+            name = next((name for name in remaining if name in in_cycle), remaining[0])
+            pending[name] = 0
+            queue.append(name)
+
+        return ordered, cycles
+
+
+    def _find_cycles(self, remaining: list, position: dict) -> list:
+        """
+        Walk dependency edges among the unordered kexts until a kext repeats
+        """
+
+        left = set(remaining)
+        seen = set()
+        cycles = []
+        for start in remaining:
+            if start in seen:
+                continue
+            path = []
+            index = {}
+            name = start
+            while name is not None and name not in seen:
+                seen.add(name)
+                index[name] = len(path)
+                path.append(name)
+                name = next((dep for dep in self.dependencies(name) if dep in left), None)
+            if name is not None and name in index:
+                cycles.append(path[index[name]:])
+        return cycles
+
+
+    def resolve(self, names: list = None, kernel: str = None) -> dict:
+        """
+        Prune for the target kernel, then order what's left
+
+        Returns:
+            dict: "order", "pruned", "missing" and "cycles"
+        """
+
+        names = list(names if names is not None else self.kexts)
+        pruned = self.prune(kernel, names) if kernel else {}
+        remaining = [name for name in names if name not in pruned]
+        ordered, cycles = self.order(remaining)
+        return {
+            "order":   ordered,
+            "pruned":  pruned,
+            "missing": self.missing(remaining),
+            "cycles":  cycles,
+        }
+
+
+    def check_order(self, names: list) -> list:
+        """
+        Find kexts listed before one of their dependencies
+
+        Parameters:
+            names (list): BundlePaths in config.plist order
+
+        Returns:
+            list: (kext, dependency) pairs that are out of order
+        """
+
+        position = {name: i for i, name in enumerate(names)}
+        violations = []
+        for name in names:
+            if name not in self.kexts:
+                continue
+            for dep in self.dependencies(name):
+                if dep in position and position[dep] > position[name]:
+                    violations.append((name, dep))
+        return violations
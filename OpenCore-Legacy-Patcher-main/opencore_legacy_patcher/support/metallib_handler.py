@@ -18,6 +18,7 @@ from ..datasets import os_data
 
 METALLIB_INSTALL_PATH: str  = "/Library/Application Support/Dortania/MetallibSupportPkg"
 METALLIB_API_LINK:     str  = "https://dortania.github.io/MetallibSupportPkg/manifest.json"
+METALLIB_API_TTL:      int  = 60 * 60  # Seconds the on-disk copy of the metallib list is used before revalidating
 
 METALLIB_ASSET_LIST:   list = None
 
@@ -72,6 +73,7 @@ class MetalLibraryObject:
         try:
             results = network_handler.NetworkUtilities().get(
                 METALLIB_API_LINK,
+                cache_ttl=METALLIB_API_TTL,
                 headers={
                     "User-Agent": f"OCLP/{self.constants.patcher_version}"
                 },
@@ -5,6 +5,9 @@ Primarily based around the DownloadObject class, which provides a simple
 object for libraries to query download progress and status
 """
 
+import os
+import json
+import math
 import time
 import requests
 import threading
@@ -16,10 +19,14 @@ import atexit
 from typing import Optional, Union
 from pathlib import Path
 
-from . import utilities
+from . import utilities, integrity_verification, download_scheduler, http_cache
 
 SESSION = requests.Session()
 
+SEGMENT_SIZE:    int = 1024 * 1024 * 32  # Bytes per Range request in segmented mode
+SEGMENT_RETRIES: int = 3
+SEGMENT_STATE:   str = ".segments"       # Sidecar suffix recording completed segments
+
 
 class DownloadStatus(enum.Enum):
     """
@@ -83,19 +90,32 @@ class NetworkUtilities:
             return False
 
 
-    def get(self, url: str, **kwargs) -> requests.Response:
+    def get(self, url: str, cache_ttl: int = None, **kwargs) -> requests.Response:
         """
         Wrapper for requests's get method
         Implement additional error handling
 
         Parameters:
             url (str): URL to get
+            cache_ttl (int): Go through the on-disk HTTP cache, using a cached response for
+                             this many seconds before revalidating it with the server.
+                             None (default) always fetches, streamed requests are never cached
             **kwargs: Additional parameters for requests.get
 
         Returns:
             requests.Response: Response object from requests.get
         """
 
+        if cache_ttl is not None and not kwargs.get("stream"):
+            return http_cache.CACHE.get(url, cache_ttl, self._get, **kwargs)
+        return self._get(url, **kwargs)
+
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Uncached get(), see above
+        """
+
         result: requests.Response = None
 
         try:
@@ -158,9 +178,22 @@ class DownloadObject:
 
         >>> print("Download complete"")
 
+    Parameters:
+        url            (str): URL to download
+        path           (str): Destination path
+        checksum_algo (hashlib._Hash): Hash the download as it streams in, result in .checksum
+        chunklist     (Path | bytes): Apple chunklist / integrityDataV1 to verify against while
+                                      downloading, a bad chunk aborts the download right away
+        segments      (int): Parallel Range connections. Above 1, the file is preallocated and
+                             completed segments are recorded next to it, so an interrupted
+                             download resumes instead of starting over. Servers without
+                             Range support fall back to a single stream
+        priority      (int): download_scheduler.DownloadPriority, orders this download against
+                             others waiting for a slot in the process-wide scheduler
+
     """
 
-    def __init__(self, url: str, path: str, checksum_algo: Optional["hashlib._Hash"] = None) -> None:
+    def __init__(self, url: str, path: str, checksum_algo: Optional["hashlib._Hash"] = None, chunklist: Optional[Union[Path, bytes]] = None, segments: int = 1, priority: int = download_scheduler.DownloadPriority.NORMAL) -> None:
         self.url:       str = url
         self.status:    str = DownloadStatus.INACTIVE
         self.error_msg: str = ""
@@ -170,8 +203,18 @@ class DownloadObject:
 
         self.total_file_size:      float = 0.0
         self.downloaded_file_size: float = 0.0
+        self.resumed_file_size:    float = 0.0
         self.start_time:           float = time.time()
 
+        self.priority:        int = priority
+        self.segments:        int = max(1, segments)
+        self._accepts_ranges: bool = False
+        self._validator:      Optional[str] = None
+        self._file_changed:   bool = False
+        self._segment_lock:   threading.Lock = threading.Lock()
+        self._segment_error:  str = ""
+        self._segment_event:  threading.Event = threading.Event()
+
         self.error:             bool = False
         self.should_stop:       bool = False
         self.download_complete: bool = False
@@ -182,6 +225,12 @@ class DownloadObject:
         self.checksum = None
         self._checksum_storage: Optional[hashlib._Hash] = checksum_algo
 
+        self.chunklist_verified: bool = False
+        self._chunklist: Optional[integrity_verification.ChunklistVerification] = None
+        self._chunklist_source: Optional[Union[Path, bytes]] = chunklist
+        if chunklist is not None:
+            self._chunklist = integrity_verification.ChunklistVerification(self.filepath, chunklist)
+
         if self.has_network:
             self._populate_file_size()
 
@@ -261,6 +310,8 @@ class DownloadObject:
             result = SESSION.head(self.url, allow_redirects=True, timeout=5)
             if 'Content-Length' in result.headers:
                 self.total_file_size = float(result.headers['Content-Length'])
+                self._accepts_ranges = result.headers.get('Accept-Ranges', '').lower() == 'bytes'
+                self._validator = self._response_validator(result.headers)
             else:
                 raise Exception("Content-Length missing from headers")
         except Exception as e:
@@ -269,6 +320,19 @@ class DownloadObject:
             self.total_file_size = 0.0
 
 
+    def _response_validator(self, headers: dict) -> Optional[str]:
+        """
+        Validator identifying this version of the file, usable in If-Range
+
+        Weak ETags aren't allowed in If-Range, Last-Modified is used instead
+        """
+
+        etag = headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            return etag
+        return headers.get('Last-Modified')
+
+
     def _update_checksum(self, chunk: bytes) -> None:
         """
         Update checksum with new chunk
@@ -334,37 +398,32 @@ class DownloadObject:
             if not self.has_network:
                 raise Exception("No network connection")
 
-            if self._prepare_working_directory(self.filepath) is False:
-                raise Exception(self.error_msg)
-
-            response = NetworkUtilities().get(self.url, stream=True, timeout=10)
-
-            with open(self.filepath, 'wb') as file:
-                atexit.register(self.stop)
-                for i, chunk in enumerate(response.iter_content(1024 * 1024 * 4)):
-                    if self.should_stop:
-                        raise Exception("Download stopped")
-                    if chunk:
-                        file.write(chunk)
-                        self.downloaded_file_size += len(chunk)
-                        if self._checksum_storage:
-                            self._update_checksum(chunk)
-                        if display_progress and i % 100:
-                            # Don't use logging here, as we'll be spamming the log file
-                            if self.total_file_size == 0.0:
-                                print(f"Downloaded {utilities.human_fmt(self.downloaded_file_size)} of {self.filename}")
-                            else:
-                                print(f"Downloaded {self.get_percent():.2f}% of {self.filename} ({utilities.human_fmt(self.get_speed())}/s) ({self.get_time_remaining():.2f} seconds remaining)")
-                self.download_complete = True
-                logging.info(f"Download complete: {self.filename}")
-                logging.info("Stats:")
-                logging.info(f"- Downloaded size: {utilities.human_fmt(self.downloaded_file_size)}")
-                logging.info(f"- Time elapsed: {(time.time() - self.start_time):.2f} seconds")
-                logging.info(f"- Speed: {utilities.human_fmt(self.downloaded_file_size / (time.time() - self.start_time))}/s")
-                logging.info(f"- Location: {self.filepath}")
-                if self._checksum_storage:
-                    self.checksum = self._checksum_storage.hexdigest()
-                    logging.info(f"Checksum: {self.checksum}")
+            atexit.register(self.stop)
+            with download_scheduler.SCHEDULER.slot(self, self.priority):
+                # Time spent queued for a slot doesn't count against the speed
+                self.start_time = time.time()
+                if self._use_segments():
+                    self._download_segmented(display_progress)
+                else:
+                    self._download_stream(display_progress)
+
+            if self._chunklist:
+                if not self._chunklist.finalize():
+                    raise Exception(f"Integrity check failed: {self._chunklist.error_msg or 'invalid chunklist'}")
+                self.chunklist_verified = True
+                logging.info(f"Verified {self._chunklist.total_chunks} chunks while downloading")
+            self.download_complete = True
+            logging.info(f"Download complete: {self.filename}")
+            logging.info("Stats:")
+            logging.info(f"- Downloaded size: {utilities.human_fmt(self.downloaded_file_size)}")
+            if self.resumed_file_size:
+                logging.info(f"- Resumed from: {utilities.human_fmt(self.resumed_file_size)}")
+            logging.info(f"- Time elapsed: {(time.time() - self.start_time):.2f} seconds")
+            logging.info(f"- Speed: {utilities.human_fmt(self.get_speed())}/s")
+            logging.info(f"- Location: {self.filepath}")
+            if self._checksum_storage:
+                self.checksum = self._checksum_storage.hexdigest()
+                logging.info(f"Checksum: {self.checksum}")
         except Exception as e:
             self.error = True
             self.error_msg = str(e)
@@ -375,6 +434,317 @@ class DownloadObject:
         utilities.enable_sleep_after_running()
 
 
+    def _display_progress(self) -> None:
+        # Don't use logging here, as we'll be spamming the log file
+        if self.total_file_size == 0.0:
+            print(f"Downloaded {utilities.human_fmt(self.downloaded_file_size)} of {self.filename}")
+        else:
+            print(f"Downloaded {self.get_percent():.2f}% of {self.filename} ({utilities.human_fmt(self.get_speed())}/s) ({self.get_time_remaining():.2f} seconds remaining)")
+
+
+    def _download_stream(self, display_progress: bool = False) -> None:
+        """
+        Download the file over a single connection, from the start
+        """
+
+        if self._prepare_working_directory(self.filepath) is False:
+            raise Exception(self.error_msg)
+
+        response = NetworkUtilities().get(self.url, stream=True, timeout=10)
+
+        with open(self.filepath, 'wb') as file:
+            for i, chunk in enumerate(response.iter_content(1024 * 1024 * 4)):
+                if self.should_stop:
+                    raise Exception("Download stopped")
+                if chunk:
+                    file.write(chunk)
+                    self.downloaded_file_size += len(chunk)
+                    self._verify_chunk(chunk)
+                    download_scheduler.SCHEDULER.throttle(len(chunk))
+                    if display_progress and i % 100:
+                        self._display_progress()
+
+
+    def _verify_chunk(self, chunk: bytes) -> None:
+        """
+        Feed the next in-order bytes of the file to the checksum and chunklist
+        """
+
+        if self._checksum_storage:
+            self._update_checksum(chunk)
+        if self._chunklist and not self._chunklist.update(chunk):
+            raise Exception(f"Integrity check failed: {self._chunklist.error_msg or 'invalid chunklist'}")
+
+
+    def _use_segments(self) -> bool:
+        """
+        Whether to download with parallel Range requests
+
+        Requires a known size and Range support, small files aren't worth it
+        """
+
+        if self.segments <= 1:
+            return False
+        if not self._accepts_ranges:
+            logging.info(f"Server does not advertise Range support, downloading {self.filename} over a single connection")
+            return False
+        return self.total_file_size > SEGMENT_SIZE
+
+
+    def _segment_state_path(self) -> Path:
+        return self.filepath.with_name(self.filepath.name + SEGMENT_STATE)
+
+
+    def _segment_bounds(self, index: int) -> tuple:
+        """
+        Inclusive byte range of a segment, as used in the Range header
+        """
+
+        start = index * SEGMENT_SIZE
+        return start, min(int(self.total_file_size), start + SEGMENT_SIZE) - 1
+
+
+    def _load_segment_state(self, count: int) -> set:
+        """
+        Segments completed by an earlier, interrupted download of the same file
+
+        The sidecar only counts if it describes this URL and size, the server
+        still reports the same ETag or Last-Modified, and the preallocated file
+        is still there
+        """
+
+        state_path = self._segment_state_path()
+        try:
+            state = json.loads(state_path.read_text())
+            if state["url"] != self.url or state["size"] != int(self.total_file_size) or state["segment_size"] != SEGMENT_SIZE:
+                return set()
+            if self._validator is None or state.get("validator") != self._validator:
+                logging.info(f"Not resuming {self.filename}: unable to confirm the file is unchanged on the server")
+                return set()
+            if self.filepath.stat().st_size != int(self.total_file_size):
+                return set()
+            return {index for index in state["completed"] if 0 <= index < count}
+        except Exception:
+            return set()
+
+
+    def _save_segment_state(self, completed: set) -> None:
+        """
+        Record completed segments, written through a temp file so the sidecar is never truncated
+        """
+
+        state_path = self._segment_state_path()
+        temp_path = state_path.with_name(state_path.name + ".tmp")
+        temp_path.write_text(json.dumps({
+            "url":          self.url,
+            "size":         int(self.total_file_size),
+            "segment_size": SEGMENT_SIZE,
+            "validator":    self._validator,
+            "completed":    sorted(completed),
+        }))
+        os.replace(temp_path, state_path)
+
+
+    def _download_segmented(self, display_progress: bool = False, allow_restart: bool = True) -> None:
+        """
+        Download the file with parallel Range requests into a preallocated file
+
+        Workers pull segments off a shared queue and record each finished one in
+        the sidecar state file. Since segments finish out of order, the checksum
+        and chunklist are fed by reading finished segments back in file order
+        while the download continues (from the page cache, in practice).
+
+        Every Range request carries If-Range, so if the file changes on the
+        server mid-download the segments on disk are discarded and the download
+        restarts once from scratch.
+        """
+
+        count = math.ceil(self.total_file_size / SEGMENT_SIZE)
+        completed = self._load_segment_state(count)
+
+        if completed:
+            logging.info(f"Resuming {self.filename}: {len(completed)} of {count} segments already downloaded")
+        else:
+            if self._prepare_working_directory(self.filepath) is False:
+                raise Exception(self.error_msg)
+            with open(self.filepath, 'wb') as file:
+                file.truncate(int(self.total_file_size))
+            self._save_segment_state(completed)
+
+        for index in completed:
+            start, end = self._segment_bounds(index)
+            self.downloaded_file_size += end - start + 1
+        self.resumed_file_size = self.downloaded_file_size
+
+        pending = [index for index in range(count) if index not in completed]
+        pending.reverse()
+        workers = [
+            threading.Thread(target=self._segment_worker, args=(pending, completed), daemon=True)
+            for _ in range(min(self.segments, len(pending)))
+        ]
+        logging.info(f"Downloading {len(pending)} segments of {utilities.human_fmt(SEGMENT_SIZE)} over {len(workers)} connections")
+        for worker in workers:
+            worker.start()
+
+        verify = self._checksum_storage or self._chunklist
+        next_segment = 0
+        last_progress = time.time()
+        # Unbuffered, read-ahead would hold on to bytes of segments not yet written
+        with open(self.filepath, 'rb', buffering=0) as reader:
+            while True:
+                running = any(worker.is_alive() for worker in workers)
+                while verify and next_segment < count and not self._segment_error:
+                    with self._segment_lock:
+                        if next_segment not in completed:
+                            break
+                    start, end = self._segment_bounds(next_segment)
+                    reader.seek(start)
+                    try:
+                        self._verify_chunk(reader.read(end - start + 1))
+                    except Exception as e:
+                        # Don't resume on top of data that failed verification
+                        self._segment_error = str(e)
+                        self._segment_state_path().unlink(missing_ok=True)
+                        break
+                    next_segment += 1
+                if not running or self._segment_error:
+                    break
+                if display_progress and time.time() - last_progress > 5:
+                    self._display_progress()
+                    last_progress = time.time()
+                # Woken early whenever a segment completes or a worker exits
+                self._segment_event.wait(0.5)
+                self._segment_event.clear()
+
+        for worker in workers:
+            worker.join()
+
+        if self._file_changed:
+            # Segments already on disk belong to the old version of the file
+            self._segment_state_path().unlink(missing_ok=True)
+            if allow_restart and not self.should_stop:
+                logging.warning(f"{self.filename} changed on the server, restarting download")
+                self._reset_segmented()
+                if self._use_segments():
+                    return self._download_segmented(display_progress, allow_restart=False)
+                return self._download_stream(display_progress)
+
+        if self._segment_error:
+            raise Exception(self._segment_error)
+        if self.should_stop:
+            raise Exception("Download stopped")
+        if len(completed) != count:
+            raise Exception(f"Download incomplete, {count - len(completed)} segments missing")
+
+        self._segment_state_path().unlink(missing_ok=True)
+
+
+    def _reset_segmented(self) -> None:
+        """
+        Forget progress and verification state, then query the file again
+        """
+
+        self.downloaded_file_size = 0.0
+        self.resumed_file_size    = 0.0
+        self._segment_error       = ""
+        self._file_changed        = False
+        if self._checksum_storage:
+            self._checksum_storage = hashlib.new(self._checksum_storage.name)
+        if self._chunklist_source is not None:
+            self._chunklist = integrity_verification.ChunklistVerification(self.filepath, self._chunklist_source)
+        self._populate_file_size()
+
+
+    def _segment_worker(self, pending: list, completed: set) -> None:
+        """
+        Worker thread entry, wakes the verifying thread when the worker exits
+        """
+
+        try:
+            self._download_segments(pending, completed)
+        finally:
+            self._segment_event.set()
+
+
+    def _download_segments(self, pending: list, completed: set) -> None:
+        """
+        Download segments until the queue is empty, one connection per worker
+        """
+
+        session = requests.Session()
+        with open(self.filepath, 'r+b') as file:
+            while not self.should_stop and not self._segment_error:
+                with self._segment_lock:
+                    if not pending:
+                        return
+                    index = pending.pop()
+
+                for attempt in range(1, SEGMENT_RETRIES + 1):
+                    try:
+                        self._fetch_segment(session, file, index)
+                        break
+                    except Exception as e:
+                        if self.should_stop or self._segment_error:
+                            return
+                        logging.warning(f"Segment {index} of {self.filename} failed (attempt {attempt}/{SEGMENT_RETRIES}): {str(e)}")
+                        if attempt == SEGMENT_RETRIES:
+                            self._segment_error = f"Segment {index} failed: {str(e)}"
+                            return
+
+                with self._segment_lock:
+                    completed.add(index)
+                    self._save_segment_state(completed)
+                self._segment_event.set()
+
+
+    def _fetch_segment(self, session: requests.Session, file, index: int) -> None:
+        """
+        Download one segment into its place in the file
+
+        Bytes from a failed attempt are taken back off the progress counter,
+        and the segment is flushed to disk before it can be marked complete
+        """
+
+        start, end = self._segment_bounds(index)
+        headers = {"Range": f"bytes={start}-{end}"}
+        if self._validator:
+            headers["If-Range"] = self._validator
+        received = 0
+        try:
+            response = session.get(self.url, headers=headers, stream=True, timeout=10)
+            if self._validator and (response.status_code == 200 or self._response_validator(response.headers) not in (None, self._validator)):
+                # If-Range didn't match, the server is sending a different version of the file
+                response.close()
+                with self._segment_lock:
+                    self._file_changed = True
+                    self._segment_error = f"{self.filename} changed on the server during download"
+                self._segment_event.set()
+                raise Exception(self._segment_error)
+            if response.status_code != 206:
+                raise Exception(f"Expected 206 Partial Content, got {response.status_code}")
+
+            file.seek(start)
+            for chunk in response.iter_content(1024 * 1024):
+                if self.should_stop:
+                    raise Exception("Download stopped")
+                if received + len(chunk) > end - start + 1:
+                    raise Exception("Server sent more data than requested")
+                file.write(chunk)
+                received += len(chunk)
+                with self._segment_lock:
+                    self.downloaded_file_size += len(chunk)
+                download_scheduler.SCHEDULER.throttle(len(chunk))
+
+            if received != end - start + 1:
+                raise Exception(f"Short read, got {received} of {end - start + 1} bytes")
+            file.flush()
+            os.fsync(file.fileno())
+        except Exception:
+            with self._segment_lock:
+                self.downloaded_file_size -= received
+            raise
+
+
     def get_percent(self) -> float:
         """
         Query the download percent
@@ -396,7 +766,8 @@ class DownloadObject:
             float: The download speed in bytes per second
         """
 
-        return self.downloaded_file_size / (time.time() - self.start_time)
+        # Segments restored from a previous session weren't downloaded at this speed
+        return (self.downloaded_file_size - self.resumed_file_size) / (time.time() - self.start_time)
 
 
     def get_time_remaining(self) -> float:
@@ -16,6 +16,7 @@ from .. import constants
 
 
 REPO_LATEST_RELEASE_URL: str = "https://api.github.com/repos/dortania/OpenCore-Legacy-Patcher/releases/latest"
+REPO_LATEST_RELEASE_TTL: int = 0  # Always revalidate, GitHub doesn't count 304s against the rate limit
 
 
 class CheckBinaryUpdates:
@@ -98,7 +99,7 @@ class CheckBinaryUpdates:
         if not network_handler.NetworkUtilities(REPO_LATEST_RELEASE_URL).verify_network_connection():
             return None
 
-        response = network_handler.NetworkUtilities().get(REPO_LATEST_RELEASE_URL)
+        response = network_handler.NetworkUtilities().get(REPO_LATEST_RELEASE_URL, cache_ttl=REPO_LATEST_RELEASE_TTL)
         data_set = response.json()
 
         if "tag_name" not in data_set:
@@ -597,6 +597,7 @@ def check_cli_args():
     parser.add_argument("--model", action="store", help="Set custom model", required=False)
     parser.add_argument("--disk", action="store", help="Specifies disk to install to", required=False)
     parser.add_argument("--smbios_spoof", action="store", help="Set SMBIOS patching mode", required=False)
+    parser.add_argument("--profile", action="store", help="Build for a saved hardware profile (Linux sysfs tree or MultiBoot profile JSON) instead of this machine, skips host probes so it also runs on Linux", required=False)
 
     # sys_patch args
     parser.add_argument("--patch_sys_vol", help="Patches root volume", action="store_true", required=False)
@@ -2,11 +2,20 @@
 validation.py: Validation class for the patcher
 """
 
+import os
+import copy
+import time
 import atexit
+import pickle
+import shutil
 import logging
+import tempfile
+import threading
 import subprocess
+import multiprocessing
 
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 
 from . import network_handler
 
@@ -28,6 +37,45 @@ from ..sys_patch.patchsets import (
 )
 
 
+# Builds run in parallel, each in its own build folder. 1 builds in-process, one after another
+BUILD_FARM_WORKERS: int = os.cpu_count() or 1
+
+
+def _farm_build(job: dict) -> dict:
+    """
+    Build and validate a single EFI, runs in a build farm worker process
+
+    Parameters:
+        job (dict): name, model, custom_model, computer, settings, constants and directory
+
+    Returns:
+        dict: name, settings, returncode, output and seconds
+    """
+
+    global_constants: constants.Constants = job["constants"]
+    global_constants.current_path = Path(job["directory"])
+    global_constants.custom_model = job["custom_model"]
+    global_constants.computer = job["computer"]
+
+    start = time.perf_counter()
+    try:
+        build.BuildOpenCore(job["model"], global_constants)
+        result = subprocess.run([global_constants.ocvalidate_path, global_constants.plist_path], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        returncode, output = result.returncode, result.stdout.decode(errors="replace")
+    except Exception as e:
+        returncode, output = -1, f"{type(e).__name__}: {e}"
+    finally:
+        shutil.rmtree(job["directory"], ignore_errors=True)
+
+    return {
+        "name":       job["name"],
+        "settings":   job["settings"],
+        "returncode": returncode,
+        "output":     output,
+        "seconds":    time.perf_counter() - start,
+    }
+
+
 class PatcherValidation:
     """
     Validation class for the patcher
@@ -35,10 +83,11 @@ class PatcherValidation:
     Primarily for Continuous Integration
     """
 
-    def __init__(self, global_constants: constants.Constants, verify_unused_files: bool = False) -> None:
+    def __init__(self, global_constants: constants.Constants, verify_unused_files: bool = False, build_workers: int = BUILD_FARM_WORKERS) -> None:
         self.constants: constants.Constants = global_constants
         self.verify_unused_files = verify_unused_files
         self.active_patchset_files = []
+        self.build_workers: int = build_workers
 
         self.constants.validate = True
 
@@ -115,6 +164,93 @@ class PatcherValidation:
                 logging.info(f"Validation succeeded for predefined model: {self.constants.computer.real_model}")
 
 
+    def _farm_constants(self) -> constants.Constants:
+        """
+        Snapshot of the current constants that can be sent to a worker process
+
+        Attributes that can't be pickled (ex. the payload unpack thread) are dropped
+        """
+
+        snapshot = copy.copy(self.constants)
+        for name, value in vars(snapshot).items():
+            if isinstance(value, threading.Thread):
+                setattr(snapshot, name, None)
+                continue
+            try:
+                pickle.dumps(value)
+            except Exception:
+                setattr(snapshot, name, None)
+        return snapshot
+
+
+    def _farm_jobs(self, settings: str, directory: str) -> list:
+        """
+        Build farm jobs for every predefined model and dump, with the current settings
+
+        Parameters:
+            settings  (str): Label for this settings pass, used in the summary
+            directory (str): Parent of the per-build folders
+        """
+
+        snapshot = self._farm_constants()
+
+        jobs = []
+        for model in model_array.SupportedSMBIOS:
+            jobs.append({"name": model, "model": model, "custom_model": model, "computer": snapshot.computer})
+        for i, dump in enumerate(self.valid_dumps):
+            # Several dumps share a model, number them to keep the summary rows apart
+            jobs.append({"name": f"Dump {i + 1}: {dump.real_model}", "model": dump.real_model, "custom_model": "", "computer": dump})
+
+        for job in jobs:
+            job["settings"] = settings
+            job["constants"] = snapshot
+            job["directory"] = tempfile.mkdtemp(prefix=f"{settings}-", dir=directory)
+        return jobs
+
+
+    def _run_build_farm(self, jobs: list) -> None:
+        """
+        Build and validate jobs across a process pool, then log a summary matrix
+
+        Raises on any failed build, after every build has finished
+        """
+
+        logging.info(f"Building {len(jobs)} configurations with {self.build_workers} workers")
+        start = time.perf_counter()
+
+        # Spawn rather than fork: macOS frameworks aren't fork safe
+        with ProcessPoolExecutor(max_workers=self.build_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            results = list(executor.map(_farm_build, jobs))
+
+        wall_time = time.perf_counter() - start
+        build_time = sum(result["seconds"] for result in results)
+
+        settings = list(dict.fromkeys(result["settings"] for result in results))
+        names = list(dict.fromkeys(result["name"] for result in results))
+        matrix = {(result["name"], result["settings"]): result for result in results}
+        width = max(len(name) for name in names)
+
+        logging.info("")
+        logging.info(f"{'Configuration':<{width}}  " + "  ".join(f"{label:<12}" for label in settings))
+        for name in names:
+            cells = []
+            for label in settings:
+                result = matrix.get((name, label))
+                cells.append(f"{'-':<12}" if result is None else f"{'PASS' if result['returncode'] == 0 else 'FAIL'} {result['seconds']:5.1f}s ")
+            logging.info(f"{name:<{width}}  " + "  ".join(cells))
+        logging.info("")
+
+        failures = [result for result in results if result["returncode"] != 0]
+        logging.info(f"{len(results) - len(failures)}/{len(results)} passed in {wall_time:.1f}s ({build_time:.1f}s of builds, {build_time / wall_time:.1f}x)")
+
+        for result in failures:
+            logging.info(f"Validation failed for {result['name']} ({result['settings']} settings):")
+            for line in result["output"].splitlines():
+                logging.info(f"  {line}")
+        if failures:
+            raise Exception(f"Validation failed for: {', '.join(sorted(set(result['name'] for result in failures)))}")
+
+
     def _validate_root_patch_files(self, major_kernel: int, minor_kernel: int) -> None:
         """
         Validate that all files in the patchset are present in the payload
@@ -316,11 +452,40 @@ class PatcherValidation:
         Validates build modules
         """
 
+        if self.build_workers > 1:
+            self._validate_configs_farm()
+            return
+
         # First run is with default settings
         self._build_prebuilt()
         self._build_dumps()
 
         # Second run, flip all settings
+        self._flip_settings()
+
+        self._build_prebuilt()
+        self._build_dumps()
+
+        subprocess.run(["/bin/rm", "-rf", self.constants.build_path], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+
+    def _validate_configs_farm(self) -> None:
+        """
+        Validates build modules, both settings passes queued into one build farm
+        """
+
+        with tempfile.TemporaryDirectory(prefix="oclp-build-farm-") as directory:
+            jobs = self._farm_jobs("default", directory)
+            self._flip_settings()
+            jobs += self._farm_jobs("flipped", directory)
+            self._run_build_farm(jobs)
+
+
+    def _flip_settings(self) -> None:
+        """
+        Flip all settings from their defaults, for the second validation pass
+        """
+
         self.constants.verbose_debug = True
         self.constants.opencore_debug = True
         self.constants.kext_debug = True
@@ -335,9 +500,4 @@ class PatcherValidation:
         self.constants.disable_tb = True
         self.constants.force_surplus = True
         self.constants.software_demux = True
-        self.constants.serial_settings = "Minimal"
-
-        self._build_prebuilt()
-        self._build_dumps()
-
-        subprocess.run(["/bin/rm", "-rf", self.constants.build_path], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
\ No newline at end of file
+        self.constants.serial_settings = "Minimal"
\ No newline at end of file
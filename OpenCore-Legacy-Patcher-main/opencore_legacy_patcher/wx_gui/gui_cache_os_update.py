@@ -12,7 +12,7 @@ import threading
 from pathlib import Path
 
 from .. import constants
-from ..support import kdk_handler, utilities, metallib_handler
+from ..support import kdk_handler, utilities, metallib_handler, download_scheduler
 from ..wx_gui import gui_support, gui_download
 
 from ..sys_patch.patchsets import HardwarePatchsetDetection, HardwarePatchsetSettings
@@ -92,11 +92,13 @@ class OSUpdateFrame(wx.Frame):
             if self.kdk_obj.success is True:
                 result = self.kdk_obj.retrieve_download()
                 if result is not None:
+                    result.priority = download_scheduler.DownloadPriority.BACKGROUND
                     download_objects[f"KDK Build {self.kdk_obj.kdk_url_build}"] = result
         if self.metallib_obj:
             if self.metallib_obj.success is True:
                 result = self.metallib_obj.retrieve_download()
                 if result is not None:
+                    result.priority = download_scheduler.DownloadPriority.BACKGROUND
                     download_objects[f"Metallib Build {self.metallib_obj.metallib_url_build}"] = result
 
         if len(download_objects) == 0:
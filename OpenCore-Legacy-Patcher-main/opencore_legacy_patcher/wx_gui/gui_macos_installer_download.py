@@ -30,7 +30,8 @@ from ..support import (
     macos_installer_handler,
     utilities,
     network_handler,
-    integrity_verification
+    integrity_verification,
+    download_scheduler
 )
 
 
@@ -140,8 +141,14 @@ class macOSInstallerDownloadFrame(wx.Frame):
 
             self.catalog_products = sucatalog.AppleDBProducts(self.constants)
             if self.catalog_products.data is None:
-                logging.error("Failed to fetch installers from AppleDB")
-                return
+                logging.error("Failed to fetch installers from AppleDB, falling back to the Software Update Catalog")
+
+                # Only new or re-posted products get parsed, the rest comes from the on-disk index
+                index = sucatalog.CatalogIndex(sucatalog.CatalogURL(seed=self.catalog_seed).url)
+                if not index.refresh():
+                    logging.error("Failed to fetch installers from the Software Update Catalog")
+                    return
+                self.catalog_products = sucatalog.CatalogProducts(index.catalog, index=index)
 
             self.available_installers        = self.catalog_products.products
             self.available_installers_latest = self.catalog_products.latest_products
@@ -322,8 +329,18 @@ class macOSInstallerDownloadFrame(wx.Frame):
 
             expected_checksum, checksum_algo = self.catalog_products.checksum_for_product(selected_installer)
 
+            # Verify chunks as they stream in, instead of re-reading the installer afterwards
+            chunklist = None
+            if selected_installer["InstallAssistant"].get("IntegrityDataURL"):
+                result = network_handler.NetworkUtilities().get(selected_installer["InstallAssistant"]["IntegrityDataURL"], timeout=10)
+                if result.status_code == 200 and result.content[:4] == b"CNKL":
+                    chunklist = result.content
+                else:
+                    logging.warning(f"Unable to fetch chunklist (status {result.status_code}), downloading without integrity verification")
+
             download_obj = network_handler.DownloadObject(
-                selected_installer["InstallAssistant"]["URL"], self.constants.payload_path / "InstallAssistant.pkg", checksum_algo=checksum_algo
+                selected_installer["InstallAssistant"]["URL"], self.constants.payload_path / "InstallAssistant.pkg", checksum_algo=checksum_algo, chunklist=chunklist, segments=4,
+                priority=download_scheduler.DownloadPriority.INTERACTIVE
             )
 
             gui_download.DownloadFrame(
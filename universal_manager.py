@@ -10,6 +10,8 @@ import subprocess
 from pathlib import Path
 import argparse
 
+sys.path.insert(0, str(Path(__file__).parent / "BootScripts"))
+
 class UniversalMultiBootManager:
     def __init__(self):
         self.base_dir = Path(__file__).parent
@@ -53,7 +55,7 @@ class UniversalMultiBootManager:
         print("STEP 3: Building Kext Archive")
         print("=" * 60)
         
-        script = self.boot_scripts_dir / "build_kext_archive.py"
+        script = self.boot_scripts_dir / "build_driver_archive.py"
         result = subprocess.run([sys.executable, str(script)])
         
         if result.returncode != 0:
@@ -62,25 +64,26 @@ class UniversalMultiBootManager:
         
         return True
     
-    def generate_efi(self, target_os="all"):
+    def generate_efi(self, target_os="all", hardware=None, manifest=None):
         """Generate EFI configuration for target OS"""
         print("\n" + "=" * 60)
         print(f"STEP 4: Generating EFI for {target_os.upper()}")
         print("=" * 60)
         
-        # Load hardware profile
-        profile_path = self.hardware_profiles_dir / "current.json"
-        manifest_path = self.hardware_profiles_dir / "current_manifest.json"
-        
-        if not profile_path.exists():
-            print("❌ No hardware profile found! Run detection first.")
-            return False
-        
-        with open(profile_path, 'r') as f:
-            hardware = json.load(f)
-        
-        with open(manifest_path, 'r') as f:
-            manifest = json.load(f)
+        if hardware is None or manifest is None:
+            # Load hardware profile
+            profile_path = self.hardware_profiles_dir / "current.json"
+            manifest_path = self.hardware_profiles_dir / "current_manifest.json"
+            
+            if not profile_path.exists():
+                print("❌ No hardware profile found! Run detection first.")
+                return False
+            
+            with open(profile_path, 'r') as f:
+                hardware = json.load(f)
+            
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
         
         if target_os == "macos" or target_os == "all":
             print("\n📱 macOS Configuration:")
@@ -160,21 +163,128 @@ class UniversalMultiBootManager:
             print(f"  GPUs: {len(hardware.get('gpu', []))}")
             print(f"  Network Devices: {len(hardware.get('network', []))}")
     
-    def full_setup(self):
+    def load_cached_profile(self):
+        """Activate the cached profile for this machine if it is still valid, returns the cache entry"""
+        from detect_hardware import quick_fingerprint
+        from profile_cache import ProfileCache
+        
+        fingerprint = quick_fingerprint()
+        cache = ProfileCache(self.base_dir)
+        entry = cache.lookup(fingerprint)
+        if not entry:
+            return None
+        
+        cache.activate(entry)
+        print(f"⚡ Known machine ({fingerprint}), using cached profile from {entry['dir']}")
+        return entry
+    
+    def cache_current_profile(self):
+        """Store current.json/current_manifest.json under the machine's fingerprint"""
+        from profile_cache import ProfileCache
+        
+        try:
+            with open(self.hardware_profiles_dir / "current.json", 'r') as f:
+                hardware = json.load(f)
+            with open(self.hardware_profiles_dir / "current_manifest.json", 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+        
+        return ProfileCache(self.base_dir).store(hardware, manifest) is not None
+    
+    def run_pipeline(self):
+        """Run setup in-process: profile and manifest stay in memory, independent stages overlap"""
+        from archive_index import ArchiveIndex
+        from build_driver_archive import DriverArchiveBuilder
+        from detect_hardware import detect_all
+        from driver_mapper import generate_manifest
+        from pipeline import StageFailed, run_stages, print_timing_report
+        from profile_cache import ProfileCache
+        
+        def verify_archive():
+            return ArchiveIndex.load(self.driver_archive_dir)
+        
+        def save_profile(profile, manifest, kexts):
+            # Other boot scripts still read current*.json, write them once at the end
+            cache = ProfileCache(self.base_dir)
+            cache.store(profile, manifest)
+            cache.activate({'profile': profile, 'manifest': manifest})
+            return True
+        
+        def build_kexts(manifest, archive):
+            # Same archives build_driver_archive.py builds, but failures stop the pipeline
+            builder = DriverArchiveBuilder()
+            if not builder.build_macos_archive(manifest):
+                raise RuntimeError("macOS kext archive build failed")
+            if not builder.build_windows_archive():
+                raise RuntimeError("Windows driver archive build failed")
+            if not builder.build_linux_archive():
+                raise RuntimeError("Linux module archive build failed")
+            builder.show_archive_status()
+            return True
+        
+        def efi(profile, manifest, kexts):
+            if not self.generate_efi("all", profile, manifest):
+                raise RuntimeError("EFI generation failed")
+            return True
+        
+        stages = [
+            ("profile", detect_all, ()),
+            ("archive", verify_archive, ()),
+            ("manifest", lambda profile: generate_manifest(profile), ("profile",)),
+            ("kexts", build_kexts, ("manifest", "archive")),
+            # The cache records the archive hash, take it once the kexts are in
+            ("saved", save_profile, ("profile", "manifest", "kexts")),
+            ("efi", efi, ("profile", "manifest", "kexts"))
+        ]
+        
+        print("=" * 60)
+        print("In-Process Pipeline: Detection + Archive Verification → Mapping → Kexts → EFI")
+        print("=" * 60)
+        
+        try:
+            results, timings = run_stages(stages)
+        except StageFailed as e:
+            print(f"\n❌ Setup failed at: {e.stage} ({e.error})")
+            return False
+        
+        print_timing_report(timings)
+        return True
+    
+    def full_setup(self, use_cache=True, in_process=False):
         """Run complete setup process"""
         print("🚀 Starting Universal MultiBoot Full Setup...\n")
         
-        steps = [
-            ("Hardware Detection", self.detect_hardware),
-            ("Driver Mapping", self.map_drivers),
-            ("Kext Archive Build", self.build_kext_archive),
-            ("EFI Generation", lambda: self.generate_efi("all"))
-        ]
+        entry = self.load_cached_profile() if use_cache else None
+        if entry:
+            if entry['config']:
+                # Write the cached config.plist and kexts back to the EFI, nothing is regenerated
+                from opencore_injector import OpenCoreInjector
+                injector = OpenCoreInjector()
+                if not injector.generate_opencore_config(injector.computer_type()):
+                    return False
+            elif not self.generate_efi("all"):
+                return False
+            self.show_status()
+            return True
         
-        for step_name, step_func in steps:
-            if not step_func():
-                print(f"\n❌ Setup failed at: {step_name}")
+        if in_process:
+            if not self.run_pipeline():
                 return False
+        else:
+            steps = [
+                ("Hardware Detection", self.detect_hardware),
+                ("Driver Mapping", self.map_drivers),
+                ("Kext Archive Build", self.build_kext_archive),
+                ("EFI Generation", lambda: self.generate_efi("all"))
+            ]
+            
+            for step_name, step_func in steps:
+                if not step_func():
+                    print(f"\n❌ Setup failed at: {step_name}")
+                    return False
+            
+            self.cache_current_profile()
         
         print("\n" + "=" * 60)
         print("✅ Universal MultiBoot Setup Complete!")
@@ -202,6 +312,18 @@ def main():
         help="Target OS for EFI generation"
     )
     
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the cached profile for this machine and re-run detection"
+    )
+    
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Run full-setup stages in-process, overlapping independent stages"
+    )
+    
     args = parser.parse_args()
     
     manager = UniversalMultiBootManager()
@@ -217,7 +339,7 @@ def main():
     elif args.action == "status":
         manager.show_status()
     elif args.action == "full-setup":
-        manager.full_setup()
+        manager.full_setup(use_cache=not args.no_cache, in_process=args.pipeline)
 
 if __name__ == "__main__":
     main()